@@ -2,10 +2,10 @@ from pydantic_settings import BaseSettings
 from functools import lru_cache
 
 class Settings(BaseSettings):
-    # Supabase
-    supabase_url: str
-    supabase_key: str
-    supabase_service_key: str
+    # Supabase (não usados com banco_backend = "sqlite")
+    supabase_url: str = ""
+    supabase_key: str = ""
+    supabase_service_key: str = ""
     
     # JWT
     secret_key: str
@@ -15,7 +15,61 @@ class Settings(BaseSettings):
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
-    
+    # E-mails com acesso às rotas administrativas (setores, tipos de processo), separados por vírgula
+    administradores: str = ""
+
+    # Acesso ao banco (threads dedicadas às chamadas ao Supabase)
+    db_executor_workers: int = 16
+    banco_backend: str = "supabase"  # supabase ou sqlite
+    banco_sqlite_caminho: str = ":memory:"  # arquivo do banco local (sqlite)
+
+    # Pool HTTP compartilhado pelos clientes do PostgREST e do Storage (por processo)
+    http_max_conexoes: int = 32
+    http_max_conexoes_ociosas: int = 16  # mantidas abertas (keep-alive)
+    http_keepalive_segundos: float = 30.0
+    http2: bool = True
+    http_timeout_conexao: float = 5.0
+    http_timeout_postgrest: float = 120.0
+    http_timeout_storage: float = 20.0
+
+    # Logs estruturados (JSON em stdout, escritos por uma thread via fila)
+    log_nivel: str = "INFO"
+    # Por módulo; o httpx loga cada round trip ao PostgREST em INFO
+    log_niveis: str = "httpx=WARNING,httpcore=WARNING"  # ex.: "app.utils.auth=DEBUG"
+    log_fila_max: int = 10000  # acima disso registros são descartados (nunca bloqueia)
+
+    # Detector de N+1: X-Consultas-Banco e aviso no log (estrito: levanta erro, para testes)
+    rastreamento_consultas: bool = False
+    rastreamento_orcamento: int = 10  # round trips por requisição
+    rastreamento_estrito: bool = False
+
+    # Cache de usuários autenticados (get_current_user). Alterações pela API
+    # invalidam na hora; feitas direto no banco valem após o TTL (ou
+    # DELETE /api/usuarios/{id}/cache)
+    usuario_cache_ttl: int = 60  # segundos
+    usuario_cache_maxsize: int = 1000
+
+    # Cache de setores e tipos de processo
+    referencia_cache_ttl: int = 300  # segundos
+
+    # Hash de senhas (bcrypt)
+    bcrypt_rounds: int = 12
+    hash_executor_workers: int = 4
+    hash_fila_max: int = 32  # acima disso o login responde 503
+
+    # Uploads de documentos
+    upload_tamanho_max: int = 1024 * 1024 * 1024  # bytes (1 GB)
+    armazenamento_backend: str = "supabase"  # supabase ou local (disco do servidor, opt-in)
+    armazenamento_dir: str = "/tmp/cbb_documentos"
+    armazenamento_bucket: str = "documentos"
+
+    # Protocolos reservados por round trip (1 = numeração sem lacunas)
+    protocolo_bloco: int = 1
+
+    # Importação em lote de processos
+    importacao_max_linhas: int = 20000
+    importacao_lote: int = 500  # linhas por INSERT
+
     class Config:
         env_file = ".env"
         case_sensitive = False
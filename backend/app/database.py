@@ -1,16 +1,149 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+import httpx
 from supabase import create_client, Client
 from app.config import get_settings
+from app.utils.metricas import MedidorColetado, metricas, registrar_consulta
+from app.utils import rastreamento
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
-# Cliente Supabase
-supabase: Client = create_client(settings.supabase_url, settings.supabase_key)
+# Pool HTTP único do processo: os dois clientes (anon e service role), o
+# PostgREST e o Storage reutilizam as mesmas conexões keep-alive (HTTP/2
+# multiplexa as chamadas em voo). Com N workers do uvicorn são N pools.
+transporte_http: Optional[httpx.HTTPTransport] = None
 
-# Cliente com service role (para operações admin)
-supabase_admin: Client = create_client(settings.supabase_url, settings.supabase_service_key)
+def _criar_transporte() -> httpx.HTTPTransport:
+    return httpx.HTTPTransport(
+        http2=settings.http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_conexoes,
+            max_keepalive_connections=settings.http_max_conexoes_ociosas,
+            keepalive_expiry=settings.http_keepalive_segundos
+        )
+    )
+
+def _sessao(anterior: httpx.Client, timeout: float) -> httpx.Client:
+    """Mesma sessão que o cliente criou (URL e cabeçalhos), sobre o pool compartilhado"""
+    anterior.close()
+    return httpx.Client(
+        base_url=anterior.base_url,
+        headers=anterior.headers,
+        timeout=httpx.Timeout(timeout, connect=settings.http_timeout_conexao),
+        follow_redirects=True,
+        transport=transporte_http
+    )
+
+def _usar_pool(cliente: Client) -> Client:
+    """Troca as sessões httpx do PostgREST e do Storage pelas do pool compartilhado"""
+    postgrest = cliente.postgrest
+    postgrest.session = _sessao(postgrest.session, settings.http_timeout_postgrest)
+    storage = cliente.storage
+    storage.session = storage._client = _sessao(storage.session, settings.http_timeout_storage)
+    return cliente
+
+_pool_sem_estatisticas = False  # aviso no log só na primeira falha
+
+def estatisticas_pool() -> dict:
+    """Ocupação do pool HTTP (lida sem trava: é só para monitoramento).
+
+    Lê atributos internos do httpx/httpcore (versões fixadas em
+    requirements.txt); se mudarem, devolve {} em vez de derrubar o /metrics.
+    """
+    global _pool_sem_estatisticas
+    if transporte_http is None:
+        return {}
+    try:
+        pool = transporte_http._pool
+        conexoes = list(pool.connections)
+        requisicoes = list(pool._requests)
+        ociosas = sum(1 for c in conexoes if c.is_idle())
+        aguardando = sum(1 for r in requisicoes if r.is_queued())
+    except Exception:
+        if not _pool_sem_estatisticas:
+            _pool_sem_estatisticas = True
+            logger.warning("Estatísticas do pool HTTP indisponíveis nesta versão do httpcore", exc_info=True)
+        return {}
+    return {
+        "conexoes_ativas": len(conexoes) - ociosas,
+        "conexoes_ociosas": ociosas,
+        "conexoes_max": settings.http_max_conexoes,
+        "requisicoes_em_voo": len(requisicoes) - aguardando,
+        "requisicoes_aguardando": aguardando,
+    }
+
+if settings.banco_backend == "sqlite":
+    # Banco local: mesma interface do cliente Supabase (table/rpc), sem
+    # projeto remoto. Um único cliente atende os dois papéis abaixo.
+    from app.database_sqlite import ClienteSQLite
+
+    if settings.armazenamento_backend != "local":
+        raise RuntimeError("banco_backend = 'sqlite' requer armazenamento_backend = 'local'")
+
+    supabase = supabase_admin = ClienteSQLite(settings.banco_sqlite_caminho)
+elif settings.banco_backend == "supabase":
+    transporte_http = _criar_transporte()
+
+    # Cliente Supabase
+    supabase: Client = _usar_pool(create_client(settings.supabase_url, settings.supabase_key))
+
+    # Cliente com service role (para operações admin)
+    supabase_admin: Client = _usar_pool(create_client(settings.supabase_url, settings.supabase_service_key))
+else:
+    raise RuntimeError(f"banco_backend inválido: {settings.banco_backend} (use supabase ou sqlite)")
+
+def _metricas_pool(*campos):
+    def coletar():
+        estatisticas = estatisticas_pool()
+        return {(campo.split("_", 1)[1],): estatisticas[campo] for campo in campos if campo in estatisticas}
+    return coletar
+
+metricas.registrar(MedidorColetado(
+    "cbb_http_pool_conexoes", "Conexões do pool HTTP do Supabase", ("estado",),
+    _metricas_pool("conexoes_ativas", "conexoes_ociosas")
+))
+metricas.registrar(MedidorColetado(
+    "cbb_http_pool_conexoes_max", "Limite de conexões do pool HTTP do Supabase", (),
+    lambda: {(): settings.http_max_conexoes} if transporte_http is not None else {}
+))
+metricas.registrar(MedidorColetado(
+    "cbb_http_pool_requisicoes", "Requisições HTTP ao Supabase no pool", ("estado",),
+    _metricas_pool("requisicoes_em_voo", "requisicoes_aguardando")
+))
+
+# Executor dedicado às chamadas ao Supabase. O cliente é síncrono, então cada
+# round trip roda fora do event loop; o número de workers limita quantas
+# chamadas ficam em voo ao mesmo tempo (as demais aguardam na fila).
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.db_executor_workers,
+    thread_name_prefix="supabase"
+)
 
 def get_supabase() -> Client:
     return supabase
 
 def get_supabase_admin() -> Client:
     return supabase_admin
+
+async def executar_em_thread(func, *args, **kwargs):
+    """Executa uma chamada bloqueante no executor do banco sem travar o event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(func, *args, **kwargs))
+
+async def executar(query):
+    """Executa uma query do PostgREST (table/rpc) de forma assíncrona"""
+    inicio = time.perf_counter()
+    try:
+        resultado = await executar_em_thread(query.execute)
+    except Exception:
+        registrar_consulta(query, time.perf_counter() - inicio, erro=True)
+        raise
+    duracao = time.perf_counter() - inicio
+    registrar_consulta(query, duracao, getattr(resultado, "data", None))
+    rastreamento.registrar(query, duracao)
+    return resultado
@@ -0,0 +1,714 @@
+import html
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from postgrest.exceptions import APIError
+
+# Backend local do banco (Settings.banco_backend = "sqlite").
+#
+# Implementa sobre SQLite a mesma interface que os serviços usam do cliente
+# Supabase: table(...) com o builder do PostgREST (select com embeds, filtros,
+# order/limit/range, single, count, insert/update/delete) e rpc(...) com as
+# funções do schema. Serviços e rotas rodam sem alteração, sem um projeto
+# Supabase, com o schema de database/schema_sqlite.sql. O substituto dos
+# benchmarks emula as mesmas RPCs; benchmarks/paridade_rpc.py compara os dois.
+
+SCHEMA = os.path.join(os.path.dirname(__file__), "..", "..", "database", "schema_sqlite.sql")
+
+# Embeds do select: (tabela, relação) -> (coluna na tabela, coluna na relação)
+RELACOES = {
+    ("processos", "tramitacoes"): ("id", "processo_id"),
+    ("processos", "documentos"): ("id", "processo_id"),
+}
+
+# Tabelas com o trigger atualizar_data_modificacao no Postgres
+TABELAS_COM_ATUALIZADO_EM = ("processos", "documentos")
+
+OPERADORES = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+ORDENACOES_RELEVANTES = ("criado_em", "atualizado_em", "data_autuacao")
+
+_IDENTIFICADOR = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+def destacar(marcar: "re.Pattern", texto: Optional[str]) -> str:
+    """Trechos de texto que casam com marcar entre <mark>; o resto é escapado (HTML seguro)"""
+    texto = texto or ""
+    partes, inicio = [], 0
+    for achado in marcar.finditer(texto):
+        partes.append(html.escape(texto[inicio:achado.start()]))
+        partes.append(f"<mark>{html.escape(achado.group(0))}</mark>")
+        inicio = achado.end()
+    partes.append(html.escape(texto[inicio:]))
+    return "".join(partes)
+
+def agora() -> str:
+    return datetime.now().isoformat()
+
+def _nome(identificador: str) -> str:
+    """Nome de tabela/coluna vindo do código; recusa qualquer coisa além de [a-z0-9_]"""
+    if not _IDENTIFICADOR.match(identificador):
+        raise APIError({"message": f"Identificador inválido: {identificador}", "code": "42601", "hint": None, "details": None})
+    return f'"{identificador}"'
+
+def _valor(valor: Any) -> Any:
+    """Converte o valor do Python para o que o SQLite guarda"""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (list, dict)):
+        return json.dumps(valor)
+    if valor == "now()":
+        return agora()
+    return valor
+
+def _dividir(texto: str) -> List[str]:
+    """Separa por vírgulas de nível zero (fora de parênteses e aspas)"""
+    partes, atual, nivel, aspas = [], [], 0, False
+    for caractere in texto:
+        if caractere == '"':
+            aspas = not aspas
+        elif not aspas and caractere == "(":
+            nivel += 1
+        elif not aspas and caractere == ")":
+            nivel -= 1
+        elif not aspas and caractere == "," and nivel == 0:
+            partes.append("".join(atual).strip())
+            atual = []
+            continue
+        atual.append(caractere)
+    if atual:
+        partes.append("".join(atual).strip())
+    return [p for p in partes if p]
+
+def _interpretar_logica(texto: str) -> List[tuple]:
+    """Converte a sintaxe do or=()/and() do PostgREST em filtros"""
+    filtros = []
+    for item in _dividir(texto):
+        if item.startswith(("and(", "or(")):
+            operador, corpo = item.split("(", 1)
+            filtros.append((operador, _interpretar_logica(corpo[:-1])))
+            continue
+        coluna, operador, valor = item.split(".", 2)
+        if operador == "in":
+            valor = [v.strip('"') for v in _dividir(valor[1:-1])]
+        elif operador == "is":
+            valor = {"null": None, "true": True, "false": False}[valor]
+        else:
+            valor = valor.strip('"')
+            valor = {"true": 1, "false": 0}.get(valor, valor)
+        filtros.append((coluna, operador, valor))
+    return filtros
+
+def _interpretar_select(texto: str) -> Tuple[List[str], List[Tuple[str, bool, List[str]]]]:
+    """Separa colunas e embeds (relacao(colunas) ou relacao!inner(colunas))"""
+    colunas, embeds = [], []
+    for item in _dividir(texto):
+        if "(" in item:
+            nome, corpo = item.split("(", 1)
+            embeds.append((nome.split("!")[0], nome.endswith("!inner"), _dividir(corpo[:-1])))
+        else:
+            colunas.append(item)
+    return colunas, embeds
+
+def _condicao(filtro: tuple, apelido: str) -> Tuple[str, list]:
+    """Filtro do builder -> (trecho SQL, parâmetros)"""
+    if filtro[0] in ("and", "or"):
+        partes = [_condicao(f, apelido) for f in filtro[1]]
+        sql = f" {filtro[0].upper()} ".join(p[0] for p in partes)
+        return f"({sql})", [v for p in partes for v in p[1]]
+
+    coluna, operador, valor = filtro
+    coluna = f"{apelido}.{_nome(coluna)}"
+    if operador == "in":
+        if not valor:
+            return "0", []
+        return f"{coluna} IN ({', '.join('?' * len(valor))})", [_valor(v) for v in valor]
+    if operador == "is":
+        return (f"{coluna} IS NULL", []) if valor is None else (f"{coluna} = ?", [int(valor)])
+    return f"{coluna} {OPERADORES[operador]} ?", [_valor(valor)]
+
+def _colunas_sql(colunas: List[str], apelido: str) -> str:
+    if "*" in colunas:
+        return f"{apelido}.*"
+    return ", ".join(f"{apelido}.{_nome(c)}" for c in colunas)
+
+class RespostaSQLite:
+    """Mesmos atributos do APIResponse do postgrest-py usados pela aplicação"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class ConsultaSQLite:
+    """Builder de table(...) traduzido para SQL"""
+
+    def __init__(self, cliente: "ClienteSQLite", tabela: str):
+        self.cliente = cliente
+        self.tabela = tabela
+        self.operacao = "select"
+        self.colunas = "*"
+        self.contagem = None
+        self.valores = None
+        self.filtros: list = []
+        self.ordem: List[Tuple[str, bool, bool]] = []
+        self.limite: Optional[int] = None
+        self.deslocamento = 0
+        self.unica = False
+        self.talvez_unica = False
+
+    def select(self, *colunas, count=None):
+        self.colunas = ",".join(colunas) or "*"
+        self.contagem = count
+        return self
+
+    def insert(self, valores, **_):
+        self.operacao, self.valores = "insert", valores
+        return self
+
+    def update(self, valores, **_):
+        self.operacao, self.valores = "update", valores
+        return self
+
+    def delete(self, **_):
+        self.operacao = "delete"
+        return self
+
+    def _filtro(self, coluna, operador, valor):
+        self.filtros.append((coluna, operador, valor))
+        return self
+
+    def eq(self, coluna, valor):
+        return self._filtro(coluna, "eq", valor)
+
+    def neq(self, coluna, valor):
+        return self._filtro(coluna, "neq", valor)
+
+    def gt(self, coluna, valor):
+        return self._filtro(coluna, "gt", valor)
+
+    def gte(self, coluna, valor):
+        return self._filtro(coluna, "gte", valor)
+
+    def lt(self, coluna, valor):
+        return self._filtro(coluna, "lt", valor)
+
+    def lte(self, coluna, valor):
+        return self._filtro(coluna, "lte", valor)
+
+    def like(self, coluna, padrao):
+        return self._filtro(coluna, "like", padrao)
+
+    def ilike(self, coluna, padrao):
+        # LIKE do SQLite já ignora maiúsculas/minúsculas (apenas ASCII)
+        return self._filtro(coluna, "ilike", padrao)
+
+    def in_(self, coluna, valores):
+        return self._filtro(coluna, "in", list(valores))
+
+    def is_(self, coluna, valor):
+        return self._filtro(coluna, "is", {"null": None, "true": True, "false": False}.get(valor, valor))
+
+    def or_(self, filtros, reference_table=None):
+        self.filtros.append(("or", _interpretar_logica(filtros)))
+        return self
+
+    def order(self, coluna, desc=False, nullsfirst=False, foreign_table=None):
+        self.ordem.append((coluna, desc, nullsfirst))
+        return self
+
+    def limit(self, quantidade, foreign_table=None):
+        self.limite = quantidade
+        return self
+
+    def range(self, inicio, fim, foreign_table=None):
+        self.deslocamento, self.limite = inicio, fim - inicio + 1
+        return self
+
+    def single(self):
+        self.unica = True
+        return self
+
+    def maybe_single(self):
+        self.talvez_unica = True
+        return self
+
+    def execute(self) -> RespostaSQLite:
+        return self.cliente.executar(self._resolver)
+
+    # -- resolução (com a conexão travada) --
+
+    def _onde(self, filtros: list, apelido: str = "t") -> Tuple[str, list]:
+        partes = [_condicao(f, apelido) for f in filtros]
+        if not partes:
+            return "", []
+        return " WHERE " + " AND ".join(p[0] for p in partes), [v for p in partes for v in p[1]]
+
+    def _selecionar(self, conexao: sqlite3.Connection) -> Tuple[List[dict], Optional[int]]:
+        colunas, embeds = _interpretar_select(self.colunas)
+
+        # Filtros com "relacao.coluna" valem para o embed, não para a tabela
+        proprios, de_embed = [], {}
+        for filtro in self.filtros:
+            if filtro[0] not in ("and", "or") and "." in filtro[0]:
+                relacao, coluna = filtro[0].split(".", 1)
+                de_embed.setdefault(relacao, []).append((coluna, filtro[1], filtro[2]))
+            else:
+                proprios.append(filtro)
+
+        onde, parametros = self._onde(proprios)
+        for relacao, interno, _ in embeds:
+            if interno:
+                local, remota = RELACOES[(self.tabela, relacao)]
+                condicao, valores = self._onde(de_embed.get(relacao, []), "r")
+                ligacao = f"r.{_nome(remota)} = t.{_nome(local)}"
+                condicao = f"{condicao} AND {ligacao}" if condicao else f" WHERE {ligacao}"
+                onde = f"{onde} AND" if onde else " WHERE"
+                onde += f" EXISTS (SELECT 1 FROM {_nome(relacao)} r{condicao})"
+                parametros += valores
+
+        # Colunas de ligação dos embeds entram como extras e saem depois
+        extras = [RELACOES[(self.tabela, r)][0] for r, _, _ in embeds]
+        extras = [c for c in dict.fromkeys(extras) if "*" not in colunas and c not in colunas]
+        selecao = _colunas_sql(colunas or ["*"], "t")
+        if extras:
+            selecao += ", " + ", ".join(f"t.{_nome(c)}" for c in extras)
+
+        sql = f"SELECT {selecao} FROM {_nome(self.tabela)} t{onde}"
+        if self.ordem:
+            sql += " ORDER BY " + ", ".join(
+                # Padrão do Postgres: nulos por último em ASC e primeiro em DESC
+                f"t.{_nome(c)} {'DESC' if desc else 'ASC'} NULLS {'FIRST' if nulos_primeiro or desc else 'LAST'}"
+                for c, desc, nulos_primeiro in self.ordem
+            )
+        if self.limite is not None or self.deslocamento:
+            sql += " LIMIT ? OFFSET ?"
+            parametros_pagina = [self.limite if self.limite is not None else -1, self.deslocamento]
+        else:
+            parametros_pagina = []
+
+        linhas = [self.cliente.converter(self.tabela, l) for l in conexao.execute(sql, parametros + parametros_pagina)]
+
+        total = None
+        if self.contagem:
+            total = conexao.execute(f"SELECT COUNT(*) FROM {_nome(self.tabela)} t{onde}", parametros).fetchone()[0]
+
+        for relacao, _, colunas_relacao in embeds:
+            self._embutir(conexao, linhas, relacao, colunas_relacao, de_embed.get(relacao, []))
+
+        for linha in linhas:
+            for coluna in extras:
+                linha.pop(coluna, None)
+        return linhas, total
+
+    def _embutir(self, conexao, linhas: List[dict], relacao: str, colunas: List[str], filtros: list) -> None:
+        """Carrega a relação de todas as linhas em uma consulta e agrupa por chave"""
+        local, remota = RELACOES[(self.tabela, relacao)]
+        chaves = list({linha[local] for linha in linhas})
+        grupos: Dict[Any, List[dict]] = {chave: [] for chave in chaves}
+
+        if chaves:
+            onde, parametros = self._onde(filtros + [(remota, "in", chaves)], "r")
+            sql = f"SELECT {_colunas_sql(colunas, 'r')}, r.{_nome(remota)} AS __chave FROM {_nome(relacao)} r{onde}"
+            for bruta in conexao.execute(sql, parametros):
+                filho = self.cliente.converter(relacao, bruta)
+                grupos[filho.pop("__chave")].append(filho)
+
+        for linha in linhas:
+            linha[relacao] = grupos[linha[local]]
+
+    def _resolver(self, conexao: sqlite3.Connection) -> Tuple[Any, Optional[int]]:
+        tabela = _nome(self.tabela)
+
+        if self.operacao == "insert":
+            valores = self.valores if isinstance(self.valores, list) else [self.valores]
+            inseridos = []
+            for registro in valores:
+                registro = self.cliente.antes_de_inserir(conexao, self.tabela, registro)
+                colunas = list(registro)
+                sql = (
+                    f"INSERT INTO {tabela} ({', '.join(_nome(c) for c in colunas)}) "
+                    f"VALUES ({', '.join('?' * len(colunas))}) RETURNING *"
+                )
+                linha = conexao.execute(sql, [_valor(registro[c]) for c in colunas]).fetchone()
+                inseridos.append(self.cliente.converter(self.tabela, linha))
+            return inseridos, None
+
+        if self.operacao in ("update", "delete"):
+            onde, parametros = self._onde(self.filtros)
+
+        if self.operacao == "update":
+            valores = dict(self.valores)
+            if self.tabela in TABELAS_COM_ATUALIZADO_EM:
+                valores["atualizado_em"] = agora()
+            atribuicoes = ", ".join(f"{_nome(c)} = ?" for c in valores)
+            sql = f"UPDATE {tabela} AS t SET {atribuicoes}{onde} RETURNING *"
+            linhas = conexao.execute(sql, [_valor(v) for v in valores.values()] + parametros)
+            return [self.cliente.converter(self.tabela, l) for l in linhas], None
+
+        if self.operacao == "delete":
+            linhas = conexao.execute(f"DELETE FROM {tabela} AS t{onde} RETURNING *", parametros)
+            return [self.cliente.converter(self.tabela, l) for l in linhas], None
+
+        dados, total = self._selecionar(conexao)
+        if self.unica or self.talvez_unica:
+            if self.talvez_unica and not dados:
+                return None, total
+            if len(dados) != 1:
+                raise APIError({
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "code": "PGRST116",
+                    "hint": None,
+                    "details": f"The result contains {len(dados)} rows"
+                })
+            return dados[0], total
+        return dados, total
+
+class ChamadaSQLite:
+    """Builder de rpc(...): a função roda em uma transação"""
+
+    def __init__(self, cliente: "ClienteSQLite", nome: str, funcao: Callable, parametros: dict):
+        self.cliente = cliente
+        self.nome = nome
+        self.funcao = funcao
+        self.parametros = parametros or {}
+
+    def execute(self) -> RespostaSQLite:
+        return self.cliente.executar(lambda conexao: (self.funcao(conexao, self.parametros), None), transacao=True)
+
+class ClienteSQLite:
+    """Substitui o supabase.Client quando banco_backend = "sqlite".
+
+    Uma conexão compartilhada protegida por trava (o executor do banco chama
+    execute() de várias threads); ":memory:" cria um banco vazio com as seeds
+    de schema_sqlite.sql.
+    """
+
+    def __init__(self, caminho: str = ":memory:"):
+        self.conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.create_function("agora", 0, agora)
+        self.conexao.execute("PRAGMA foreign_keys = ON")
+        if caminho != ":memory:":
+            self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.trava = threading.Lock()
+        self._booleanos: Dict[str, set] = {}
+        with open(SCHEMA, encoding="utf-8") as arquivo:
+            self.conexao.executescript(arquivo.read())
+        self.rpcs = {
+            "reservar_protocolos": self._reservar_protocolos,
+            "dashboard_stats": self._dashboard_stats,
+            "buscar_processos": self._buscar_processos,
+            "processos_relevantes": self._processos_relevantes,
+            "tramitar_processo": self._tramitar_processo,
+            "tramitar_processos": self._tramitar_processos,
+            "rejeitar_tramitacao": self._rejeitar_tramitacao,
+            "referenciar_blob": self._referenciar_blob,
+            "reservar_blob": self._reservar_blob,
+            "liberar_blob": self._liberar_blob,
+            "reordenar_documentos": self._reordenar_documentos,
+        }
+
+    def table(self, nome: str) -> ConsultaSQLite:
+        return ConsultaSQLite(self, nome)
+
+    def rpc(self, nome: str, parametros: Optional[dict] = None) -> ChamadaSQLite:
+        if nome not in self.rpcs:
+            raise APIError({"message": f"Função {nome} não existe no banco SQLite", "code": "PGRST202", "hint": None, "details": None})
+        return ChamadaSQLite(self, nome, self.rpcs[nome], parametros)
+
+    @property
+    def storage(self):
+        raise RuntimeError("banco_backend = 'sqlite' requer armazenamento_backend = 'local'")
+
+    def executar(self, resolver: Callable[[sqlite3.Connection], Tuple[Any, Optional[int]]], transacao: bool = False) -> RespostaSQLite:
+        with self.trava:
+            try:
+                if transacao:
+                    self.conexao.execute("BEGIN IMMEDIATE")
+                dados, total = resolver(self.conexao)
+                if transacao:
+                    self.conexao.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self.conexao.in_transaction:
+                    self.conexao.execute("ROLLBACK")
+                codigo = "23505" if isinstance(e, sqlite3.IntegrityError) else "XX000"
+                raise APIError({"message": str(e), "code": codigo, "hint": None, "details": None})
+            except BaseException:
+                if self.conexao.in_transaction:
+                    self.conexao.execute("ROLLBACK")
+                raise
+        return RespostaSQLite(dados, total)
+
+    def converter(self, tabela: str, linha: Optional[sqlite3.Row]) -> Optional[dict]:
+        """Row do SQLite -> dict como o PostgREST devolveria (BOOLEAN como bool)"""
+        if linha is None:
+            return None
+        if tabela not in self._booleanos:
+            self._booleanos[tabela] = {
+                coluna["name"]
+                for coluna in self.conexao.execute(f"SELECT name, type FROM pragma_table_info(?)", (tabela,))
+                if coluna["type"].upper() == "BOOLEAN"
+            }
+        dados = dict(linha)
+        for coluna in self._booleanos[tabela]:
+            if dados.get(coluna) is not None:
+                dados[coluna] = bool(dados[coluna])
+        return dados
+
+    def antes_de_inserir(self, conexao: sqlite3.Connection, tabela: str, registro: dict) -> dict:
+        """Papel do trigger gerar_numero_protocolo"""
+        if tabela == "processos" and not registro.get("numero_protocolo"):
+            from app.services.protocolo_service import formatar_protocolo
+
+            ano = datetime.now().year
+            sequencial = self._reservar_protocolos(conexao, {"p_ano": ano, "p_quantidade": 1})
+            registro = {**registro, "numero_protocolo": formatar_protocolo(ano, sequencial), "ano": ano}
+        return registro
+
+    # -- funções do schema (mesma semântica do SQL de schema.sql) --
+
+    def _reservar_protocolos(self, conexao, p: dict) -> int:
+        quantidade = p.get("p_quantidade", 1)
+        return conexao.execute(
+            """
+            INSERT INTO protocolo_sequencias (ano, ultimo_numero) VALUES (?, ?)
+            ON CONFLICT (ano) DO UPDATE SET ultimo_numero = ultimo_numero + excluded.ultimo_numero
+            RETURNING ultimo_numero - ? + 1
+            """,
+            (p["p_ano"], quantidade, quantidade)
+        ).fetchone()[0]
+
+    def _dashboard_stats(self, conexao, p: dict) -> List[dict]:
+        linha = conexao.execute(
+            """
+            SELECT
+                COUNT(*) AS total_processos,
+                COUNT(*) FILTER (WHERE status = 'aberto') AS processos_abertos,
+                COUNT(*) FILTER (WHERE status = 'em_tramite') AS processos_em_tramite,
+                COUNT(*) FILTER (WHERE status = 'concluido') AS processos_concluidos,
+                COUNT(*) FILTER (WHERE criado_por = :usuario) AS meus_processos,
+                COUNT(*) FILTER (WHERE setor_atual_id = :setor) AS processos_meu_setor,
+                (SELECT COUNT(*) FROM aprovacoes
+                 WHERE aprovador_id = :usuario AND status = 'pendente') AS pendentes_aprovacao,
+                (SELECT COUNT(*) FROM documentos d JOIN processos pr ON pr.id = d.processo_id
+                 WHERE pr.setor_atual_id = :setor AND d.requer_assinatura AND NOT d.assinado
+                   AND d.status = 'ativo') AS pendentes_assinatura
+            FROM processos
+            """,
+            {"usuario": p["p_usuario_id"], "setor": p.get("p_setor_id")}
+        ).fetchone()
+        return [dict(linha)]
+
+    def _buscar_processos(self, conexao, p: dict) -> List[dict]:
+        # Sem full-text/trigramas no SQLite: relevância = palavras do termo encontradas
+        palavras = [w for w in p["p_termo"].lower().split() if w][:10]
+        if not palavras:
+            return []
+        texto = "lower(numero_protocolo || ' ' || assunto || ' ' || COALESCE(interessado, '') || ' ' || COALESCE(especificacao, ''))"
+        relevancia = " + ".join(f"(instr({texto}, ?) > 0)" for _ in palavras)
+        linhas = conexao.execute(
+            f"""
+            SELECT * FROM (
+                SELECT id, numero_protocolo, assunto, interessado, status, prioridade,
+                       tipo_processo_id, setor_atual_id, data_autuacao,
+                       CAST({relevancia} AS REAL) AS relevancia
+                FROM processos
+            )
+            WHERE relevancia > 0
+            ORDER BY relevancia DESC, id DESC
+            LIMIT ? OFFSET ?
+            """,
+            palavras + [p.get("p_limite", 20), p.get("p_offset", 0)]
+        ).fetchall()
+
+        marcar = re.compile("|".join(re.escape(w) for w in palavras), re.IGNORECASE)
+        return [
+            {
+                **dict(l),
+                "destaque_assunto": destacar(marcar, l["assunto"]),
+                "destaque_interessado": destacar(marcar, l["interessado"]),
+            }
+            for l in linhas
+        ]
+
+    def _processos_relevantes(self, conexao, p: dict) -> List[dict]:
+        ordenar = p.get("p_ordenar") or "criado_em"
+        if ordenar not in ORDENACOES_RELEVANTES:
+            raise APIError({"message": f"Ordenação inválida: {ordenar}", "code": "P0001", "hint": None, "details": None})
+        direcao, comparador = ("ASC", ">") if p.get("p_crescente") else ("DESC", "<")
+
+        status = p.get("p_status")
+        filtro_status = f"AND p.status IN ({', '.join('?' * len(status))})" if status else ""
+        filtro_cursor = f"AND (p.{ordenar}, p.id) {comparador} (?, ?)" if p.get("p_cursor_valor") is not None else ""
+        filtros = list(status or [])
+        if filtro_cursor:
+            filtros += [p["p_cursor_valor"], p["p_cursor_id"]]
+        limite = p.get("p_limite", 20)
+
+        # Como no schema: cada ramo já ordenado e limitado antes do UNION
+        colunas = """p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.prioridade,
+                     p.setor_atual_id, p.data_autuacao, p.criado_em, p.atualizado_em"""
+        ordem = f"ORDER BY {ordenar} {direcao}, id {direcao}"
+        linhas = conexao.execute(
+            f"""
+            SELECT * FROM (
+                SELECT * FROM (
+                    SELECT {colunas} FROM processos p
+                    WHERE p.criado_por = ? {filtro_status} {filtro_cursor}
+                    {ordem} LIMIT ?
+                )
+                UNION
+                SELECT * FROM (
+                    SELECT {colunas} FROM processos p
+                    WHERE EXISTS (
+                        SELECT 1 FROM tramitacoes t WHERE t.processo_id = p.id AND t.setor_destino_id = ?
+                    ) {filtro_status} {filtro_cursor}
+                    {ordem} LIMIT ?
+                )
+            )
+            {ordem}
+            LIMIT ?
+            """,
+            [p["p_usuario_id"], *filtros, limite, p.get("p_setor_id"), *filtros, limite, limite]
+        ).fetchall()
+        return [dict(l) for l in linhas]
+
+    def _inserir_tramitacao(self, conexao, valores: dict) -> dict:
+        colunas = list(valores)
+        linha = conexao.execute(
+            f"INSERT INTO tramitacoes ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))}) RETURNING *",
+            [valores[c] for c in colunas]
+        ).fetchone()
+        return self.converter("tramitacoes", linha)
+
+    def _mover_processo(self, conexao, processo_id: int, setor_id: int) -> dict:
+        linha = conexao.execute(
+            "UPDATE processos SET setor_atual_id = ?, status = 'em_tramite', atualizado_em = ? WHERE id = ? RETURNING *",
+            (setor_id, agora(), processo_id)
+        ).fetchone()
+        return self.converter("processos", linha)
+
+    def _tramitar_processo(self, conexao, p: dict) -> dict:
+        processo = conexao.execute("SELECT bloqueado FROM processos WHERE id = ?", (p["p_processo_id"],)).fetchone()
+        if processo is None:
+            return {"erro": "processo_nao_encontrado"}
+        if processo["bloqueado"]:
+            return {"erro": "processo_bloqueado"}
+
+        tramitacao = self._inserir_tramitacao(conexao, {
+            "processo_id": p["p_processo_id"],
+            "setor_origem_id": p["p_setor_origem_id"],
+            "setor_destino_id": p["p_setor_destino_id"],
+            "observacao": p.get("p_observacao"),
+            "tipo_tramitacao": p.get("p_tipo_tramitacao") or "despacho",
+            "enviado_por": p["p_usuario_id"],
+        })
+        processo = self._mover_processo(conexao, p["p_processo_id"], p["p_setor_destino_id"])
+        return {"tramitacao": tramitacao, "processo": processo}
+
+    def _tramitar_processos(self, conexao, p: dict) -> List[dict]:
+        resultados, vistos = [], set()
+        for processo_id in p["p_processo_ids"]:
+            if processo_id in vistos:
+                continue
+            vistos.add(processo_id)
+            processo = conexao.execute("SELECT bloqueado FROM processos WHERE id = ?", (processo_id,)).fetchone()
+            if processo is None:
+                resultados.append({"processo_id": processo_id, "resultado": "nao_encontrado", "tramitacao_id": None})
+                continue
+            if processo["bloqueado"]:
+                resultados.append({"processo_id": processo_id, "resultado": "bloqueado", "tramitacao_id": None})
+                continue
+            tramitacao = self._inserir_tramitacao(conexao, {
+                "processo_id": processo_id,
+                "setor_origem_id": p["p_setor_origem_id"],
+                "setor_destino_id": p["p_setor_destino_id"],
+                "observacao": p.get("p_observacao"),
+                "tipo_tramitacao": p.get("p_tipo_tramitacao") or "despacho",
+                "enviado_por": p["p_usuario_id"],
+            })
+            self._mover_processo(conexao, processo_id, p["p_setor_destino_id"])
+            resultados.append({"processo_id": processo_id, "resultado": "tramitado", "tramitacao_id": tramitacao["id"]})
+        return resultados
+
+    def _rejeitar_tramitacao(self, conexao, p: dict) -> dict:
+        rejeitada = conexao.execute("SELECT * FROM tramitacoes WHERE id = ?", (p["p_tramitacao_id"],)).fetchone()
+        if rejeitada is None:
+            return {"erro": "tramitacao_nao_encontrada"}
+        if rejeitada["setor_destino_id"] != p.get("p_setor_id"):
+            return {"erro": "sem_permissao"}
+        if rejeitada["status_aprovacao"] == "rejeitado":
+            return {"erro": "tramitacao_ja_rejeitada"}
+
+        conexao.execute(
+            """
+            UPDATE tramitacoes SET status_aprovacao = 'rejeitado', aprovado_por = ?,
+                data_aprovacao = ?, motivo_rejeicao = ?
+            WHERE id = ?
+            """,
+            (p["p_usuario_id"], agora(), p["p_motivo"], p["p_tramitacao_id"])
+        )
+        devolucao = self._inserir_tramitacao(conexao, {
+            "processo_id": rejeitada["processo_id"],
+            "setor_origem_id": rejeitada["setor_destino_id"],
+            "setor_destino_id": rejeitada["setor_origem_id"],
+            "observacao": f"REJEITADO: {p['p_motivo']}",
+            "tipo_tramitacao": "despacho",
+            "enviado_por": p["p_usuario_id"],
+            "status_aprovacao": "pendente",
+        })
+        processo = self._mover_processo(conexao, rejeitada["processo_id"], rejeitada["setor_origem_id"])
+        return {"tramitacao": devolucao, "processo": processo}
+
+    def _referenciar_blob(self, conexao, p: dict) -> List[dict]:
+        linha = conexao.execute(
+            "UPDATE blobs SET referencias = referencias + 1 WHERE hash = ? RETURNING caminho, url",
+            (p["p_hash"],)
+        ).fetchone()
+        return [dict(linha)] if linha is not None else []
+
+    def _reservar_blob(self, conexao, p: dict) -> List[dict]:
+        linha = conexao.execute(
+            """
+            INSERT INTO blobs (hash, caminho, url, tamanho, tipo, referencias) VALUES (?, ?, ?, ?, ?, 1)
+            ON CONFLICT (hash) DO UPDATE SET referencias = referencias + 1
+            RETURNING caminho, url, referencias = 1 AS novo
+            """,
+            (p["p_hash"], p["p_caminho"], p["p_url"], p["p_tamanho"], p.get("p_tipo"))
+        ).fetchone()
+        return [{"caminho": linha["caminho"], "url": linha["url"], "novo": bool(linha["novo"])}]
+
+    def _liberar_blob(self, conexao, p: dict) -> Optional[str]:
+        linha = conexao.execute(
+            "UPDATE blobs SET referencias = referencias - 1 WHERE hash = ? AND url = ? RETURNING referencias, caminho",
+            (p["p_hash"], p["p_url"])
+        ).fetchone()
+        if linha is not None and linha["referencias"] <= 0:
+            conexao.execute("DELETE FROM blobs WHERE hash = ?", (p["p_hash"],))
+            return linha["caminho"]
+        return None
+
+    def _reordenar_documentos(self, conexao, p: dict) -> List[dict]:
+        ids = p["p_ids"]
+        existentes = {
+            l["id"] for l in conexao.execute(
+                f"SELECT id FROM documentos WHERE processo_id = ? AND id IN ({', '.join('?' * len(ids))})",
+                [p["p_processo_id"]] + ids
+            )
+        }
+        invalidos = [i for i in ids if i not in existentes]
+        if invalidos:
+            return [{"atualizados": 0, "invalidos": invalidos}]
+
+        conexao.executemany(
+            "UPDATE documentos SET ordem = ?, atualizado_em = ? WHERE id = ? AND processo_id = ?",
+            [(posicao, agora(), i, p["p_processo_id"]) for posicao, i in enumerate(ids)]
+        )
+        return [{"atualizados": len(ids), "invalidos": []}]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime, date
 from enum import Enum
 
@@ -83,6 +83,11 @@ class UsuarioUpdate(BaseModel):
     ativo: Optional[bool] = None
     senha: Optional[str] = None
 
+class UsuarioAcessoUpdate(BaseModel):
+    # Alterado só por administradores (PUT /api/usuarios/{id}/acesso)
+    ativo: Optional[bool] = None
+    setor_id: Optional[int] = None
+
 class UsuarioResponse(UsuarioBase):
     id: int
     criado_em: datetime
@@ -169,11 +174,14 @@ class DocumentoCreate(DocumentoBase):
     conteudo_html: Optional[str] = None
 
 class DocumentoUpdate(BaseModel):
+    # Sem status: cancelar/excluir passam pelo DocumentoService, que conta as referências ao arquivo
     nome: Optional[str] = None
     descricao: Optional[str] = None
     conteudo_html: Optional[str] = None
     nivel_acesso: Optional[NivelAcesso] = None
-    status: Optional[StatusDocumento] = None
+
+class DocumentoOrdem(BaseModel):
+    ids: List[int]  # ids na nova ordem da árvore
 
 class DocumentoResponse(DocumentoBase):
     id: int
@@ -181,6 +189,7 @@ class DocumentoResponse(DocumentoBase):
     arquivo_nome: Optional[str] = None
     arquivo_tamanho: Optional[int] = None
     arquivo_tipo: Optional[str] = None
+    arquivo_hash: Optional[str] = None
     conteudo_html: Optional[str] = None
     status: StatusDocumento
     assinado: bool = False
@@ -216,6 +225,20 @@ class TramitacaoResponse(TramitacaoBase):
     class Config:
         from_attributes = True
 
+class TramitacaoComProcesso(TramitacaoResponse):
+    processo: ProcessoResponse  # estado do processo após a tramitação
+
+class TramitacaoLote(BaseModel):
+    processo_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    setor_destino_id: int
+    observacao: Optional[str] = None
+    tipo_tramitacao: str = "despacho"
+
+class TramitacaoLoteItem(BaseModel):
+    processo_id: int
+    resultado: str  # tramitado, bloqueado, nao_encontrado
+    tramitacao_id: Optional[int] = None
+
 class AprovacaoBase(BaseModel):
     tipo_aprovacao: str
     documento_id: Optional[int] = None
@@ -264,6 +287,35 @@ class AssinaturaResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Detalhe do processo (uma requisição para a tela do processo)
+class UsuarioResumo(BaseModel):
+    id: int
+    nome: str
+    email: Optional[str] = None
+    setor_id: Optional[int] = None
+    cargo: Optional[str] = None
+
+class DocumentoItemResponse(DocumentoBase):
+    """Documento sem conteudo_html, para listagens"""
+    id: int
+    arquivo_nome: Optional[str] = None
+    arquivo_tamanho: Optional[int] = None
+    arquivo_tipo: Optional[str] = None
+    arquivo_hash: Optional[str] = None
+    status: StatusDocumento
+    assinado: bool = False
+    criado_por: int
+    criado_em: datetime
+    atualizado_em: datetime
+
+class ProcessoDetalheResponse(BaseModel):
+    processo: ProcessoResponse
+    tipo_processo: Optional[TipoProcessoResponse] = None
+    tramitacoes: List[TramitacaoResponse]
+    documentos: List[DocumentoItemResponse]  # apenas ativos
+    usuarios: Dict[int, UsuarioResumo]  # usuários citados, por id
+    setores: Dict[int, SetorResponse]  # setores citados, por id
+
 # Auth Models
 class Token(BaseModel):
     access_token: str
@@ -289,6 +341,62 @@ class DashboardStats(BaseModel):
     pendentes_aprovacao: int
     pendentes_assinatura: int
 
+# Busca
+class ProcessoBuscaResponse(BaseModel):
+    id: int
+    numero_protocolo: str
+    assunto: str
+    interessado: Optional[str] = None
+    status: StatusProcesso
+    prioridade: Prioridade
+    tipo_processo_id: int
+    setor_atual_id: Optional[int] = None
+    data_autuacao: datetime
+    relevancia: float
+    # HTML seguro: o texto vem escapado do banco e só as marcas <mark> são HTML
+    destaque_assunto: Optional[str] = Field(None, description="Assunto em HTML seguro (escapado), termos entre <mark>")
+    destaque_interessado: Optional[str] = Field(None, description="Interessado em HTML seguro (escapado), termos entre <mark>")
+
+# Caixa de entrada (processos relevantes)
+class ProcessoRelevanteResponse(BaseModel):
+    id: int
+    numero_protocolo: str
+    assunto: str
+    interessado: Optional[str] = None
+    status: StatusProcesso
+    prioridade: Prioridade
+    setor_atual_id: Optional[int] = None
+    data_autuacao: datetime
+    criado_em: datetime
+    atualizado_em: datetime
+
+# Resumo para listagens (tabela processos_resumo)
+class ProcessoResumoResponse(BaseModel):
+    id: int
+    numero_protocolo: str
+    assunto: str
+    interessado: Optional[str] = None
+    status: StatusProcesso
+    nivel_acesso: NivelAcesso
+    prioridade: Prioridade
+    data_autuacao: datetime
+    data_conclusao: Optional[datetime] = None
+    prazo_dias: Optional[int] = None
+    data_prazo: Optional[datetime] = None
+    tipo_processo_id: int
+    tipo_processo: Optional[str] = None
+    tipo_processo_cor: Optional[str] = None
+    setor_atual_id: Optional[int] = None
+    setor_atual: Optional[str] = None
+    setor_atual_sigla: Optional[str] = None
+    criado_por: int
+    criado_por_nome: Optional[str] = None
+    usuario_responsavel_id: Optional[int] = None
+    responsavel_nome: Optional[str] = None
+    total_documentos: int = 0
+    total_tramitacoes: int = 0
+    atualizado_em: Optional[datetime] = None
+
 # Filtros e Paginação
 class ProcessoFiltros(BaseModel):
     numero_protocolo: Optional[str] = None
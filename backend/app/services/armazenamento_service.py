@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import uuid
+from typing import NamedTuple, Optional
+from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from app.database import get_supabase_admin, executar, executar_em_thread
+from app.utils.upload import processar_upload, leitor_binario
+from app.config import get_settings
+
+settings = get_settings()
+
+class BlobArmazenado(NamedTuple):
+    hash: str
+    tamanho: int
+    url: str
+    reaproveitado: bool  # True quando o conteúdo já existia (blob de outro documento)
+
+class ArmazenamentoService:
+    """Armazenamento de arquivos endereçado por conteúdo (SHA-256).
+
+    Cada conteúdo distinto é armazenado uma única vez; a tabela blobs conta quantos
+    documentos o referenciam (referenciar_blob/reservar_blob/liberar_blob). O caminho leva um
+    sufixo aleatório por geração, então um blob recriado logo após ser coletado
+    nunca reaproveita o arquivo que está sendo apagado.
+
+    Backends: "local" (diretório armazenamento_dir) ou "supabase" (bucket
+    armazenamento_bucket do Supabase Storage).
+    """
+
+    def __init__(self):
+        self.supabase = get_supabase_admin()
+        self.backend = settings.armazenamento_backend
+        self.diretorio = settings.armazenamento_dir
+        self.bucket = settings.armazenamento_bucket
+
+    def _novo_caminho(self, arquivo_hash: str) -> str:
+        return f"blobs/{arquivo_hash[:2]}/{arquivo_hash}-{uuid.uuid4().hex[:8]}"
+
+    def _url(self, caminho: str) -> str:
+        if self.backend == "supabase":
+            return self.supabase.storage.from_(self.bucket).get_public_url(caminho)
+        return os.path.join(self.diretorio, caminho)
+
+    def _gravar_local(self, arquivo: UploadFile, caminho: str) -> None:
+        destino = os.path.join(self.diretorio, caminho)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+        # Grava em arquivo temporário e renomeia: leitores nunca veem um blob parcial
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".parcial")
+        try:
+            with os.fdopen(fd, "wb") as saida:
+                arquivo.file.seek(0)
+                shutil.copyfileobj(arquivo.file, saida, 1024 * 1024)
+            os.replace(temporario, destino)
+        except BaseException:
+            os.remove(temporario)
+            raise
+
+    async def _gravar(self, arquivo: UploadFile, caminho: str) -> None:
+        if self.backend == "supabase":
+            with leitor_binario(arquivo) as leitor:
+                await executar_em_thread(
+                    self.supabase.storage.from_(self.bucket).upload,
+                    caminho,
+                    leitor,
+                    {"content-type": arquivo.content_type or "application/octet-stream", "upsert": "true"}
+                )
+        else:
+            await run_in_threadpool(self._gravar_local, arquivo, caminho)
+
+    async def _remover(self, caminho: str) -> None:
+        if self.backend == "supabase":
+            await executar_em_thread(self.supabase.storage.from_(self.bucket).remove, [caminho])
+        else:
+            try:
+                await run_in_threadpool(os.remove, os.path.join(self.diretorio, caminho))
+            except FileNotFoundError:
+                pass
+
+    async def salvar(self, arquivo: UploadFile) -> BlobArmazenado:
+        """Armazena o upload, reaproveitando o blob se o conteúdo já existir.
+
+        O registro em blobs só é criado depois que o arquivo foi gravado:
+        quem encontra o blob pode confiar que o arquivo existe.
+        """
+        arquivo_hash, tamanho = await processar_upload(arquivo)
+
+        result = await executar(self.supabase.rpc("referenciar_blob", {"p_hash": arquivo_hash}))
+        if result.data:
+            return BlobArmazenado(arquivo_hash, tamanho, result.data[0]["url"], True)
+
+        caminho = self._novo_caminho(arquivo_hash)
+        try:
+            await self._gravar(arquivo, caminho)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Erro ao fazer upload do arquivo: {str(e)}"
+            )
+
+        try:
+            result = await executar(self.supabase.rpc("reservar_blob", {
+                "p_hash": arquivo_hash,
+                "p_caminho": caminho,
+                "p_url": self._url(caminho),
+                "p_tamanho": tamanho,
+                "p_tipo": arquivo.content_type
+            }))
+        except Exception:
+            await self._remover(caminho)
+            raise
+
+        if not result.data:
+            await self._remover(caminho)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erro ao registrar arquivo"
+            )
+
+        blob = result.data[0]
+
+        # Upload concorrente do mesmo conteúdo registrou o blob primeiro: a
+        # referência foi contada no dele e a cópia gravada aqui é descartada
+        if not blob["novo"]:
+            await self._remover(caminho)
+
+        return BlobArmazenado(arquivo_hash, tamanho, blob["url"], not blob["novo"])
+
+    async def liberar(self, arquivo_hash: str, arquivo_url: Optional[str]) -> None:
+        """Remove uma referência ao blob e apaga o arquivo quando não resta nenhuma"""
+        if not arquivo_hash or not arquivo_url:
+            return
+
+        result = await executar(self.supabase.rpc("liberar_blob", {
+            "p_hash": arquivo_hash,
+            "p_url": arquivo_url
+        }))
+
+        # Documentos anteriores ao armazenamento por conteúdo não têm blob: nada a fazer
+        if result.data:
+            await self._remover(result.data)
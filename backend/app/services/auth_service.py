@@ -1,11 +1,15 @@
+import logging
 from datetime import timedelta
 from fastapi import HTTPException, status
-from app.database import get_supabase_admin
-from app.models import LoginRequest, Token, UsuarioResponse
-from app.utils.auth import verify_password, create_access_token, get_password_hash
+from app.database import get_supabase_admin, executar
+from app.models import LoginRequest, Token, UsuarioAcessoUpdate, UsuarioResponse, UsuarioUpdate
+from app.utils.auth import verificar_senha, gerar_hash_senha, create_access_token, invalidar_usuario_cache
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CAMPOS_RESTRITOS_USUARIO = {"ativo", "setor_id"}
 
 class AuthService:
     def __init__(self):
@@ -13,35 +17,23 @@ class AuthService:
     
     async def login(self, login_data: LoginRequest) -> Token:
         """Autentica usuário e retorna token"""
-        print("=" * 60)
-        print("🔐 TENTATIVA DE LOGIN")
-        print(f"📧 Email recebido: {login_data.email}")
-        print(f"🔑 Senha recebida: {login_data.senha}")
-        
         # Buscar usuário por email
-        result = self.supabase.table("usuarios").select("*").eq("email", login_data.email).single().execute()
-        
-        print(f"👤 Usuário encontrado: {result.data is not None}")
+        result = await executar(self.supabase.table("usuarios").select("*").eq("email", login_data.email).single())
         
         if not result.data:
-            print("❌ ERRO: Usuário não encontrado no banco")
-            print("=" * 60)
+            logger.info("Login recusado: usuário não encontrado", extra={"email": login_data.email})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email ou senha incorretos"
             )
         
         usuario = result.data
-        print(f"✓ Email no banco: {usuario.get('email')}")
-        print(f"✓ Hash armazenado: {usuario.get('senha_hash')[:30]}...")
         
         # Verificar senha
-        senha_valida = verify_password(login_data.senha, usuario["senha_hash"])
-        print(f"🔐 Verificação de senha: {senha_valida}")
+        senha_valida, novo_hash = await verificar_senha(login_data.senha, usuario["senha_hash"])
         
         if not senha_valida:
-            print("❌ ERRO: Senha incorreta")
-            print("=" * 60)
+            logger.info("Login recusado: senha incorreta", extra={"usuario_id": usuario["id"]})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email ou senha incorretos"
@@ -49,15 +41,13 @@ class AuthService:
         
         # Verificar se usuário está ativo
         if not usuario.get("ativo"):
-            print("❌ ERRO: Usuário inativo")
-            print("=" * 60)
+            logger.info("Login recusado: usuário inativo", extra={"usuario_id": usuario["id"]})
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Usuário inativo"
             )
         
-        print("✅ LOGIN BEM-SUCEDIDO!")
-        print("=" * 60)
+        logger.info("Login bem-sucedido", extra={"usuario_id": usuario["id"]})
         
         # Criar token
         access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
@@ -66,10 +56,12 @@ class AuthService:
             expires_delta=access_token_expires
         )
         
-        # Atualizar último acesso
-        self.supabase.table("usuarios").update({
-            "ultimo_acesso": "now()"
-        }).eq("id", usuario["id"]).execute()
+        # Atualizar último acesso (e o hash, se o custo do bcrypt estiver obsoleto)
+        atualizacao = {"ultimo_acesso": "now()"}
+        if novo_hash:
+            atualizacao["senha_hash"] = novo_hash
+        
+        await executar(self.supabase.table("usuarios").update(atualizacao).eq("id", usuario["id"]))
         
         # Remover senha_hash antes de retornar
         usuario.pop("senha_hash", None)
@@ -82,7 +74,7 @@ class AuthService:
     async def register(self, usuario_data: dict) -> UsuarioResponse:
         """Registra novo usuário"""
         # Verificar se email já existe
-        existing = self.supabase.table("usuarios").select("id").eq("email", usuario_data["email"]).execute()
+        existing = await executar(self.supabase.table("usuarios").select("id").eq("email", usuario_data["email"]))
         
         if existing.data:
             raise HTTPException(
@@ -92,11 +84,11 @@ class AuthService:
         
         # Hash da senha
         senha = usuario_data.pop("senha")
-        senha_hash = get_password_hash(senha)
+        senha_hash = await gerar_hash_senha(senha)
         
         # Inserir usuário
         usuario_data["senha_hash"] = senha_hash
-        result = self.supabase.table("usuarios").insert(usuario_data).execute()
+        result = await executar(self.supabase.table("usuarios").insert(usuario_data))
         
         if not result.data:
             raise HTTPException(
@@ -108,3 +100,61 @@ class AuthService:
         usuario.pop("senha_hash", None)
         
         return UsuarioResponse(**usuario)
+    
+    async def atualizar_usuario(self, usuario_id: int, usuario_data: UsuarioUpdate, solicitante_id: int) -> UsuarioResponse:
+        """Atualiza os dados do próprio usuário (nome, contato, senha etc.)"""
+        if usuario_id != solicitante_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Sem permissão para alterar outro usuário"
+            )
+        
+        data = usuario_data.model_dump(exclude_unset=True)
+        
+        # Setor e ativação definem o acesso: só administradores (atualizar_acesso)
+        restritos = CAMPOS_RESTRITOS_USUARIO & data.keys()
+        if restritos:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Campos não podem ser alterados pelo usuário: {', '.join(sorted(restritos))}"
+            )
+        
+        if not data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nenhum campo para atualizar"
+            )
+        
+        if "senha" in data:
+            data["senha_hash"] = await gerar_hash_senha(data.pop("senha"))
+        
+        return await self._gravar_usuario(usuario_id, data)
+    
+    async def atualizar_acesso(self, usuario_id: int, acesso: UsuarioAcessoUpdate) -> UsuarioResponse:
+        """Ativa/desativa o usuário ou troca o setor (administradores)"""
+        data = acesso.model_dump(exclude_unset=True)
+        
+        if not data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nenhum campo para atualizar"
+            )
+        
+        return await self._gravar_usuario(usuario_id, data)
+    
+    async def _gravar_usuario(self, usuario_id: int, data: dict) -> UsuarioResponse:
+        result = await executar(self.supabase.table("usuarios").update(data).eq("id", usuario_id))
+        
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
+            )
+        
+        # Desativação e troca de setor precisam valer já na próxima requisição
+        invalidar_usuario_cache(usuario_id)
+        
+        usuario = result.data[0]
+        usuario.pop("senha_hash", None)
+        
+        return UsuarioResponse(**usuario)
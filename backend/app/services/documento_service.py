@@ -1,13 +1,15 @@
 from typing import List, Optional
 from fastapi import HTTPException, status, UploadFile
-from app.database import get_supabase_admin
+from app.database import get_supabase_admin, executar
 from app.models import DocumentoCreate, DocumentoUpdate, DocumentoResponse
 from app.utils.auth import calcular_hash_documento
-import uuid
+from app.utils.serializacao import construir
+from app.services.armazenamento_service import ArmazenamentoService
 
 class DocumentoService:
     def __init__(self):
         self.supabase = get_supabase_admin()
+        self.armazenamento = ArmazenamentoService()
     
     async def criar_documento(self, documento_data: DocumentoCreate, usuario_id: int) -> DocumentoResponse:
         """Cria um novo documento"""
@@ -20,7 +22,7 @@ class DocumentoService:
             data["arquivo_hash"] = calcular_hash_documento(data["conteudo_html"])
         
         # Inserir documento
-        result = self.supabase.table("documentos").insert(data).execute()
+        result = await executar(self.supabase.table("documentos").insert(data))
         
         if not result.data:
             raise HTTPException(
@@ -40,32 +42,8 @@ class DocumentoService:
         descricao: Optional[str] = None
     ) -> DocumentoResponse:
         """Faz upload de um arquivo como documento"""
-        # Ler conteúdo do arquivo
-        conteudo = await arquivo.read()
-        
-        # Gerar nome único para o arquivo
-        extensao = arquivo.filename.split(".")[-1] if "." in arquivo.filename else ""
-        nome_arquivo = f"{uuid.uuid4()}.{extensao}" if extensao else str(uuid.uuid4())
-        
-        # Upload para Supabase Storage
-        bucket = "documentos"  # Criar este bucket no Supabase Storage
-        caminho = f"{processo_id}/{nome_arquivo}"
-        
-        try:
-            # Upload do arquivo
-            self.supabase.storage.from_(bucket).upload(
-                caminho,
-                conteudo,
-                {"content-type": arquivo.content_type or "application/octet-stream"}
-            )
-            
-            # Obter URL pública
-            url_publica = self.supabase.storage.from_(bucket).get_public_url(caminho)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao fazer upload do arquivo: {str(e)}"
-            )
+        # Conteúdo repetido (mesmo SHA-256) reaproveita o arquivo já armazenado
+        blob = await self.armazenamento.salvar(arquivo)
         
         # Criar registro do documento
         documento_data = {
@@ -73,18 +51,23 @@ class DocumentoService:
             "tipo_documento": tipo_documento,
             "nome": nome or arquivo.filename,
             "descricao": descricao,
-            "arquivo_url": url_publica,
+            "arquivo_url": blob.url,
             "arquivo_nome": arquivo.filename,
-            "arquivo_tamanho": len(conteudo),
+            "arquivo_tamanho": blob.tamanho,
             "arquivo_tipo": arquivo.content_type,
-            "arquivo_hash": calcular_hash_documento(conteudo.decode('latin1') if isinstance(conteudo, bytes) else conteudo),
+            "arquivo_hash": blob.hash,
             "criado_por": usuario_id,
             "status": "ativo"
         }
         
-        result = self.supabase.table("documentos").insert(documento_data).execute()
+        try:
+            result = await executar(self.supabase.table("documentos").insert(documento_data))
+        except Exception:
+            await self.armazenamento.liberar(blob.hash, blob.url)
+            raise
         
         if not result.data:
+            await self.armazenamento.liberar(blob.hash, blob.url)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erro ao criar registro do documento"
@@ -94,7 +77,7 @@ class DocumentoService:
     
     async def buscar_documento(self, documento_id: int) -> DocumentoResponse:
         """Busca documento por ID"""
-        result = self.supabase.table("documentos").select("*").eq("id", documento_id).single().execute()
+        result = await executar(self.supabase.table("documentos").select("*").eq("id", documento_id).single())
         
         if not result.data:
             raise HTTPException(
@@ -106,9 +89,9 @@ class DocumentoService:
     
     async def listar_documentos(self, processo_id: int) -> List[DocumentoResponse]:
         """Lista documentos de um processo"""
-        result = self.supabase.table("documentos").select("*").eq("processo_id", processo_id).eq("status", "ativo").order("ordem").order("criado_em").execute()
+        result = await executar(self.supabase.table("documentos").select("*").eq("processo_id", processo_id).eq("status", "ativo").order("ordem").order("criado_em"))
         
-        return [DocumentoResponse(**d) for d in result.data]
+        return construir(DocumentoResponse, result.data)
     
     async def atualizar_documento(self, documento_id: int, documento_data: DocumentoUpdate, usuario_id: int) -> DocumentoResponse:
         """Atualiza documento"""
@@ -128,7 +111,7 @@ class DocumentoService:
         if "conteudo_html" in data:
             data["arquivo_hash"] = calcular_hash_documento(data["conteudo_html"])
         
-        result = self.supabase.table("documentos").update(data).eq("id", documento_id).execute()
+        result = await executar(self.supabase.table("documentos").update(data).eq("id", documento_id))
         
         if not result.data:
             raise HTTPException(
@@ -139,17 +122,23 @@ class DocumentoService:
         return DocumentoResponse(**result.data[0])
     
     async def cancelar_documento(self, documento_id: int, motivo: str, usuario_id: int) -> DocumentoResponse:
-        """Cancela um documento"""
-        await self.buscar_documento(documento_id)
-        
-        result = self.supabase.table("documentos").update({
+        """Cancela um documento e libera a referência ao arquivo"""
+        # Só a transição ativo -> cancelado libera o arquivo (evita liberar duas vezes)
+        result = await executar(self.supabase.table("documentos").update({
             "status": "cancelado",
             "motivo_cancelamento": motivo,
             "cancelado_por": usuario_id,
             "cancelado_em": "now()"
-        }).eq("id", documento_id).execute()
+        }).eq("id", documento_id).eq("status", "ativo"))
         
-        return DocumentoResponse(**result.data[0])
+        if not result.data:
+            # Inexistente (404) ou já cancelado anteriormente
+            return await self.buscar_documento(documento_id)
+        
+        documento = result.data[0]
+        await self.armazenamento.liberar(documento.get("arquivo_hash"), documento.get("arquivo_url"))
+        
+        return DocumentoResponse(**documento)
     
     async def excluir_documento(self, documento_id: int, usuario_id: int) -> bool:
         """Exclui documento (soft delete - apenas marca como cancelado)"""
@@ -157,11 +146,26 @@ class DocumentoService:
         return True
     
     async def reordenar_documentos(self, processo_id: int, ordem: List[int]) -> bool:
-        """Reordena documentos de um processo"""
-        # Atualizar ordem de cada documento
-        for idx, doc_id in enumerate(ordem):
-            self.supabase.table("documentos").update({
-                "ordem": idx
-            }).eq("id", doc_id).eq("processo_id", processo_id).execute()
+        """Reordena documentos de um processo (um único UPDATE atômico via RPC)"""
+        if len(set(ordem)) != len(ordem):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="A lista de documentos contém ids repetidos"
+            )
+        
+        if not ordem:
+            return True
+        
+        result = await executar(self.supabase.rpc("reordenar_documentos", {
+            "p_processo_id": processo_id,
+            "p_ids": ordem
+        }))
+        
+        invalidos = result.data[0]["invalidos"] if result.data else []
+        if invalidos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Documentos não pertencem ao processo: {invalidos}"
+            )
         
         return True
@@ -1,16 +1,46 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from datetime import datetime, timedelta
-from app.database import get_supabase_admin
+from app.database import get_supabase_admin, executar
 from app.models import (
     ProcessoCreate, ProcessoUpdate, ProcessoResponse,
-    TramitacaoCreate, TramitacaoResponse,
-    DashboardStats, ProcessoFiltros
+    TramitacaoCreate, TramitacaoResponse, TramitacaoComProcesso, TramitacaoLote, TramitacaoLoteItem,
+    DashboardStats, ProcessoFiltros, ProcessoBuscaResponse, ProcessoRelevanteResponse, ProcessoResumoResponse,
+    StatusProcesso, ProcessoDetalheResponse, DocumentoItemResponse, UsuarioResumo
 )
+from app.services.protocolo_service import ProtocoloService
+from app.services.referencia_service import ReferenciaService
+from app.utils.paginacao import paginar, metodo_contagem, codificar_cursor, decodificar_cursor
+from app.utils.serializacao import construir
+from app.config import get_settings
+
+settings = get_settings()
+
+# Colunas aceitas para ordenar a caixa de entrada (ver RPC processos_relevantes)
+ORDENACOES_RELEVANTES = ("criado_em", "atualizado_em", "data_autuacao")
+
+# Colunas de documentos na tela do processo (sem conteudo_html, que pode ser grande)
+COLUNAS_DOCUMENTO_ITEM = (
+    "id, processo_id, tipo_documento, nome, descricao, numero_documento, data_documento, "
+    "numero_externo, remetente, nivel_acesso, requer_assinatura, ordem, arquivo_nome, "
+    "arquivo_tamanho, arquivo_tipo, arquivo_hash, status, assinado, criado_por, criado_em, atualizado_em"
+)
+
+# Erros retornados pelas RPCs tramitar_processo e rejeitar_tramitacao
+ERROS_TRAMITACAO = {
+    "processo_nao_encontrado": (status.HTTP_404_NOT_FOUND, "Processo não encontrado"),
+    "processo_bloqueado": (status.HTTP_409_CONFLICT, "Processo bloqueado"),
+    "tramitacao_nao_encontrada": (status.HTTP_404_NOT_FOUND, "Tramitação não encontrada"),
+    "sem_permissao": (status.HTTP_403_FORBIDDEN, "Sem permissão"),
+    "tramitacao_ja_rejeitada": (status.HTTP_409_CONFLICT, "Tramitação já rejeitada"),
+}
 
 class ProcessoService:
-    def __init__(self):
+    def __init__(self, referencias: Optional[ReferenciaService] = None):
         self.supabase = get_supabase_admin()
+        self.protocolos = ProtocoloService()
+        self.referencias = referencias or ReferenciaService()
     
     async def criar_processo(self, processo_data: ProcessoCreate, usuario_id: int) -> ProcessoResponse:
         """Cria um novo processo"""
@@ -18,27 +48,15 @@ class ProcessoService:
         data["criado_por"] = usuario_id
         data["ano"] = datetime.now().year
         
-        # Buscar último número de protocolo do ano
-        result = self.supabase.table("processos").select("numero_protocolo").eq("ano", data["ano"]).order("id", desc=True).limit(1).execute()
-        
-        if result.data and result.data[0].get("numero_protocolo"):
-            # Extrair número do último protocolo
-            ultimo_protocolo = result.data[0]["numero_protocolo"]
-            numero = int(ultimo_protocolo.split(".")[2].split("-")[0])
-            proximo_numero = numero + 1
-        else:
-            proximo_numero = 1
-        
-        # Gerar protocolo: ANO.CBB.NNNNNN-DV
-        data["numero_protocolo"] = f'{data["ano"]}.CBB.{proximo_numero:06d}-1'
-        data["criado_por"] = usuario_id
+        # Gerar protocolo: ANO.CBB.NNNNNN-DV (contador anual atômico no banco)
+        data["numero_protocolo"] = await self.protocolos.proximo_protocolo(data["ano"])
         
         # Calcular data de prazo se prazo_dias foi informado
         if data.get("prazo_dias"):
             data["data_prazo"] = datetime.now() + timedelta(days=data["prazo_dias"])
         
         # Inserir processo
-        result = self.supabase.table("processos").insert(data).execute()
+        result = await executar(self.supabase.table("processos").insert(data))
         
         if not result.data:
             raise HTTPException(
@@ -49,9 +67,72 @@ class ProcessoService:
         processo = result.data[0]
         return ProcessoResponse(**processo)
     
+    async def importar_processos(self, linhas: List[Tuple[int, dict]], usuario_id: int) -> AsyncIterator[dict]:
+        """Cria processos em lote, gerando o resultado de cada linha.
+        
+        Valida tudo antes, reserva uma faixa contígua de protocolos em um único
+        round trip e insere em lotes de importacao_lote linhas por INSERT.
+        """
+        agora = datetime.now()
+        ano = agora.year
+        validos = []
+        erros = 0
+        
+        for linha, dados in linhas:
+            try:
+                processo = ProcessoCreate.model_validate(dados)
+            except ValidationError as e:
+                erros += 1
+                yield {
+                    "linha": linha,
+                    "ok": False,
+                    "erros": [f"{'.'.join(str(c) for c in erro['loc']) or 'registro'}: {erro['msg']}" for erro in e.errors()]
+                }
+                continue
+            
+            data = processo.model_dump(mode="json")
+            data["criado_por"] = usuario_id
+            data["ano"] = ano
+            if data.get("prazo_dias"):
+                data["data_prazo"] = (agora + timedelta(days=data["prazo_dias"])).isoformat()
+            validos.append((linha, data))
+        
+        protocolos = await self.protocolos.reservar_protocolos(ano, len(validos))
+        for (_, data), protocolo in zip(validos, protocolos):
+            data["numero_protocolo"] = protocolo
+        
+        criados = 0
+        for inicio in range(0, len(validos), settings.importacao_lote):
+            async for resultado in self._inserir_lote(validos[inicio:inicio + settings.importacao_lote]):
+                if resultado["ok"]:
+                    criados += 1
+                else:
+                    erros += 1
+                yield resultado
+        
+        yield {"resumo": {"total": len(linhas), "criados": criados, "erros": erros}}
+    
+    async def _inserir_lote(self, lote: List[Tuple[int, dict]]) -> AsyncIterator[dict]:
+        """Insere o lote em um único INSERT; se falhar, refaz linha a linha para isolar o erro"""
+        try:
+            result = await executar(self.supabase.table("processos").insert([data for _, data in lote]))
+        except Exception:
+            for linha, data in lote:
+                try:
+                    result = await executar(self.supabase.table("processos").insert(data))
+                    yield {"linha": linha, "ok": True, "id": result.data[0]["id"], "numero_protocolo": data["numero_protocolo"]}
+                except Exception as e:
+                    # O protocolo reservado para a linha fica como lacuna na numeração
+                    yield {"linha": linha, "ok": False, "erros": [getattr(e, "message", None) or str(e)]}
+            return
+        
+        ids = {p["numero_protocolo"]: p["id"] for p in result.data or []}
+        for linha, data in lote:
+            yield {"linha": linha, "ok": True, "id": ids.get(data["numero_protocolo"]), "numero_protocolo": data["numero_protocolo"]}
+    
     async def buscar_processo(self, processo_id: int) -> ProcessoResponse:
         """Busca processo por ID"""
-        result = self.supabase.table("processos").select("*").eq("id", processo_id).single().execute()
+        result = await executar(self.supabase.table("processos").select("*").eq("id", processo_id).single())
         
         if not result.data:
             raise HTTPException(
@@ -61,9 +142,59 @@ class ProcessoService:
         
         return ProcessoResponse(**result.data)
     
+    async def detalhar_processo(self, processo_id: int) -> ProcessoDetalheResponse:
+        """Processo com tramitações, documentos ativos e nomes citados (dois round trips)"""
+        # Processo, tramitações e documentos em um único select com embed do PostgREST
+        result = await executar(
+            self.supabase.table("processos")
+            .select(f"*, tramitacoes(*), documentos({COLUNAS_DOCUMENTO_ITEM})")
+            .eq("id", processo_id)
+            .eq("documentos.status", "ativo")
+        )
+        
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Processo não encontrado"
+            )
+        
+        dados = result.data[0]
+        tramitacoes = sorted(dados.pop("tramitacoes") or [], key=lambda t: t["data_envio"], reverse=True)
+        documentos = sorted(dados.pop("documentos") or [], key=lambda d: d["criado_em"], reverse=True)
+        documentos.sort(key=lambda d: d["ordem"] or 0)
+        
+        # Usuários citados em uma única consulta
+        usuario_ids = {dados["criado_por"], dados.get("usuario_responsavel_id")}
+        for t in tramitacoes:
+            usuario_ids.update((t.get("enviado_por"), t.get("recebido_por"), t.get("aprovado_por")))
+        usuario_ids.update(d["criado_por"] for d in documentos)
+        usuario_ids.discard(None)
+        
+        usuarios = await executar(
+            self.supabase.table("usuarios")
+            .select("id, nome, email, setor_id, cargo")
+            .in_("id", list(usuario_ids))
+        )
+        usuarios = {u["id"]: UsuarioResumo(**u) for u in usuarios.data or []}
+        
+        # Setores e tipo de processo vêm do cache de referências (sem ida ao banco)
+        setor_ids = {dados.get("setor_atual_id")}
+        for t in tramitacoes:
+            setor_ids.update((t["setor_origem_id"], t["setor_destino_id"]))
+        setor_ids.update(u.setor_id for u in usuarios.values())
+        
+        return ProcessoDetalheResponse(
+            processo=ProcessoResponse(**dados),
+            tipo_processo=await self.referencias.buscar_tipo_processo(dados["tipo_processo_id"]),
+            tramitacoes=[TramitacaoResponse(**t) for t in tramitacoes],
+            documentos=[DocumentoItemResponse(**d) for d in documentos],
+            usuarios=usuarios,
+            setores=await self.referencias.setores_por_id(setor_ids)
+        )
+    
     async def buscar_por_protocolo(self, numero_protocolo: str) -> ProcessoResponse:
         """Busca processo por número de protocolo"""
-        result = self.supabase.table("processos").select("*").eq("numero_protocolo", numero_protocolo).single().execute()
+        result = await executar(self.supabase.table("processos").select("*").eq("numero_protocolo", numero_protocolo).single())
         
         if not result.data:
             raise HTTPException(
@@ -73,18 +204,14 @@ class ProcessoService:
         
         return ProcessoResponse(**result.data)
     
-    async def listar_processos(
-        self, 
+    def _aplicar_filtros(
+        self,
+        query,
         filtros: Optional[ProcessoFiltros] = None,
         usuario_id: Optional[int] = None,
-        setor_id: Optional[int] = None,
-        limit: int = 20,
-        offset: int = 0
-    ) -> tuple[List[ProcessoResponse], int]:
-        """Lista processos com filtros"""
-        query = self.supabase.table("processos").select("*", count="exact")
-        
-        # Aplicar filtros
+        setor_id: Optional[int] = None
+    ):
+        """Filtros das listagens (valem para processos e processos_resumo)"""
         if filtros:
             if filtros.numero_protocolo:
                 query = query.ilike("numero_protocolo", f"%{filtros.numero_protocolo}%")
@@ -113,13 +240,102 @@ class ProcessoService:
         if setor_id:
             query = query.eq("setor_atual_id", setor_id)
         
-        # Ordenar e paginar
-        result = query.order("data_autuacao", desc=True).range(offset, offset + limit - 1).execute()
+        return query
+    
+    async def listar_processos(
+        self, 
+        filtros: Optional[ProcessoFiltros] = None,
+        usuario_id: Optional[int] = None,
+        setor_id: Optional[int] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        contagem: Optional[str] = None
+    ) -> tuple[List[ProcessoResponse], Optional[str], Optional[int]]:
+        """Lista processos com filtros (paginação por cursor)"""
+        query = self.supabase.table("processos").select("*", count=metodo_contagem(contagem))
+        query = self._aplicar_filtros(query, filtros, usuario_id, setor_id)
+        
+        # Ordenar e paginar por (data_autuacao, id)
+        linhas, proximo_cursor, total = await paginar(query, limit, cursor)
         
-        processos = [ProcessoResponse(**p) for p in result.data]
-        total = result.count if result.count else 0
+        # Linhas do banco: montadas sem revalidar (ver app/utils/serializacao.py)
+        processos = construir(ProcessoResponse, linhas)
         
-        return processos, total
+        return processos, proximo_cursor, total
+    
+    async def listar_resumo(
+        self,
+        filtros: Optional[ProcessoFiltros] = None,
+        usuario_id: Optional[int] = None,
+        setor_id: Optional[int] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        contagem: Optional[str] = None
+    ) -> tuple[List[ProcessoResumoResponse], Optional[str], Optional[int]]:
+        """Lista a partir de processos_resumo: nomes e contadores já prontos, sem joins"""
+        query = self.supabase.table("processos_resumo").select("*", count=metodo_contagem(contagem))
+        query = self._aplicar_filtros(query, filtros, usuario_id, setor_id)
+        
+        linhas, proximo_cursor, total = await paginar(query, limit, cursor)
+        
+        return construir(ProcessoResumoResponse, linhas), proximo_cursor, total
+    
+    async def buscar_texto(self, termo: str, limit: int = 20, offset: int = 0) -> List[ProcessoBuscaResponse]:
+        """Busca textual ranqueada (português, sem acentos, tolerante a erros de digitação)"""
+        termo = termo.strip()
+        
+        if len(termo) < 2:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe ao menos 2 caracteres para a busca"
+            )
+        
+        result = await executar(self.supabase.rpc("buscar_processos", {
+            "p_termo": termo,
+            "p_limite": limit,
+            "p_offset": offset
+        }))
+        
+        return construir(ProcessoBuscaResponse, result.data or [])
+    
+    async def listar_relevantes(
+        self,
+        usuario_id: int,
+        setor_id: Optional[int],
+        status_filtro: Optional[List[StatusProcesso]] = None,
+        ordenar: str = "criado_em",
+        crescente: bool = False,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> tuple[List[ProcessoRelevanteResponse], Optional[str]]:
+        """Caixa de entrada: criados pelo usuário ou tramitados para o setor dele (uma consulta)"""
+        if ordenar not in ORDENACOES_RELEVANTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Ordenação deve ser uma de: {', '.join(ORDENACOES_RELEVANTES)}"
+            )
+        
+        cursor_valor, cursor_id = decodificar_cursor(cursor) if cursor else (None, None)
+        
+        # Busca uma linha a mais só para saber se existe próxima página
+        result = await executar(self.supabase.rpc("processos_relevantes", {
+            "p_usuario_id": usuario_id,
+            "p_setor_id": setor_id,
+            "p_status": [s.value for s in status_filtro] if status_filtro else None,
+            "p_ordenar": ordenar,
+            "p_crescente": crescente,
+            "p_cursor_valor": cursor_valor,
+            "p_cursor_id": cursor_id,
+            "p_limite": limit + 1
+        }))
+        
+        linhas = result.data or []
+        proximo_cursor = None
+        if len(linhas) > limit:
+            linhas = linhas[:limit]
+            proximo_cursor = codificar_cursor(linhas[-1][ordenar], linhas[-1]["id"])
+        
+        return construir(ProcessoRelevanteResponse, linhas), proximo_cursor
     
     async def atualizar_processo(self, processo_id: int, processo_data: ProcessoUpdate, usuario_id: int) -> ProcessoResponse:
         """Atualiza processo"""
@@ -139,7 +355,7 @@ class ProcessoService:
         if "prazo_dias" in data and data["prazo_dias"]:
             data["data_prazo"] = datetime.now() + timedelta(days=data["prazo_dias"])
         
-        result = self.supabase.table("processos").update(data).eq("id", processo_id).execute()
+        result = await executar(self.supabase.table("processos").update(data).eq("id", processo_id))
         
         if not result.data:
             raise HTTPException(
@@ -149,38 +365,62 @@ class ProcessoService:
         
         return ProcessoResponse(**result.data[0])
     
-    async def tramitar_processo(self, tramitacao_data: TramitacaoCreate, usuario_id: int) -> TramitacaoResponse:
-        """Tramita processo entre setores"""
-        # Verificar se processo existe
-        await self.buscar_processo(tramitacao_data.processo_id)
-        
-        # Criar tramitação
-        data = tramitacao_data.model_dump()
-        data["enviado_por"] = usuario_id
-        
-        result = self.supabase.table("tramitacoes").insert(data).execute()
-        
-        if not result.data:
+    def _resultado_tramitacao(self, resultado: Optional[dict]) -> TramitacaoComProcesso:
+        """Converte o retorno das RPCs de tramitação, traduzindo {erro} em HTTPException"""
+        if not resultado:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Erro ao tramitar processo"
             )
         
-        tramitacao = result.data[0]
-        
-        # Atualizar setor atual do processo
-        self.supabase.table("processos").update({
-            "setor_atual_id": tramitacao_data.setor_destino_id,
-            "status": "em_tramite"
-        }).eq("id", tramitacao_data.processo_id).execute()
+        if resultado.get("erro"):
+            codigo, mensagem = ERROS_TRAMITACAO[resultado["erro"]]
+            raise HTTPException(status_code=codigo, detail=mensagem)
         
-        return TramitacaoResponse(**tramitacao)
+        return TramitacaoComProcesso(**resultado["tramitacao"], processo=resultado["processo"])
+    
+    async def tramitar_processo(self, tramitacao_data: TramitacaoCreate, usuario_id: int) -> TramitacaoComProcesso:
+        """Tramita processo entre setores (tramitação e novo setor na mesma transação)"""
+        result = await executar(self.supabase.rpc("tramitar_processo", {
+            "p_processo_id": tramitacao_data.processo_id,
+            "p_setor_origem_id": tramitacao_data.setor_origem_id,
+            "p_setor_destino_id": tramitacao_data.setor_destino_id,
+            "p_usuario_id": usuario_id,
+            "p_observacao": tramitacao_data.observacao,
+            "p_tipo_tramitacao": tramitacao_data.tipo_tramitacao
+        }))
+        
+        return self._resultado_tramitacao(result.data)
+    
+    async def rejeitar_tramitacao(self, tramitacao_id: int, motivo: str, usuario_id: int, setor_id: Optional[int]) -> TramitacaoComProcesso:
+        """Rejeita a tramitação e devolve o processo ao setor de origem (uma transação)"""
+        result = await executar(self.supabase.rpc("rejeitar_tramitacao", {
+            "p_tramitacao_id": tramitacao_id,
+            "p_usuario_id": usuario_id,
+            "p_setor_id": setor_id,
+            "p_motivo": motivo
+        }))
+        
+        return self._resultado_tramitacao(result.data)
+    
+    async def tramitar_lote(self, lote: TramitacaoLote, setor_origem_id: int, usuario_id: int) -> List[TramitacaoLoteItem]:
+        """Tramita vários processos para o mesmo setor em uma única transação"""
+        result = await executar(self.supabase.rpc("tramitar_processos", {
+            "p_processo_ids": lote.processo_ids,
+            "p_setor_origem_id": setor_origem_id,
+            "p_setor_destino_id": lote.setor_destino_id,
+            "p_usuario_id": usuario_id,
+            "p_observacao": lote.observacao,
+            "p_tipo_tramitacao": lote.tipo_tramitacao
+        }))
+        
+        return [TramitacaoLoteItem(**item) for item in result.data or []]
     
     async def listar_tramitacoes(self, processo_id: int) -> List[TramitacaoResponse]:
         """Lista histórico de tramitações de um processo"""
-        result = self.supabase.table("tramitacoes").select("*").eq("processo_id", processo_id).order("data_envio", desc=True).execute()
+        result = await executar(self.supabase.table("tramitacoes").select("*").eq("processo_id", processo_id).order("data_envio", desc=True))
         
-        return [TramitacaoResponse(**t) for t in result.data]
+        return construir(TramitacaoResponse, result.data)
     
     async def concluir_processo(self, processo_id: int, usuario_id: int) -> ProcessoResponse:
         """Conclui um processo"""
@@ -194,10 +434,10 @@ class ProcessoService:
             )
         
         # Atualizar status
-        result = self.supabase.table("processos").update({
+        result = await executar(self.supabase.table("processos").update({
             "status": "concluido",
             "data_conclusao": datetime.now().isoformat()
-        }).eq("id", processo_id).execute()
+        }).eq("id", processo_id))
         
         return ProcessoResponse(**result.data[0])
     
@@ -213,10 +453,10 @@ class ProcessoService:
             )
         
         # Atualizar status
-        result = self.supabase.table("processos").update({
+        result = await executar(self.supabase.table("processos").update({
             "status": "aberto",
             "data_conclusao": None
-        }).eq("id", processo_id).execute()
+        }).eq("id", processo_id))
         
         return ProcessoResponse(**result.data[0])
     
@@ -224,12 +464,12 @@ class ProcessoService:
         """Bloqueia um processo"""
         await self.buscar_processo(processo_id)
         
-        result = self.supabase.table("processos").update({
+        result = await executar(self.supabase.table("processos").update({
             "bloqueado": True,
             "motivo_bloqueio": motivo,
             "bloqueado_por": usuario_id,
             "bloqueado_em": datetime.now().isoformat()
-        }).eq("id", processo_id).execute()
+        }).eq("id", processo_id))
         
         return ProcessoResponse(**result.data[0])
     
@@ -237,55 +477,28 @@ class ProcessoService:
         """Desbloqueia um processo"""
         await self.buscar_processo(processo_id)
         
-        result = self.supabase.table("processos").update({
+        result = await executar(self.supabase.table("processos").update({
             "bloqueado": False,
             "motivo_bloqueio": None,
             "bloqueado_por": None,
             "bloqueado_em": None
-        }).eq("id", processo_id).execute()
+        }).eq("id", processo_id))
         
         return ProcessoResponse(**result.data[0])
     
     async def get_dashboard_stats(self, usuario_id: int, setor_id: Optional[int] = None) -> DashboardStats:
         """Retorna estatísticas para o dashboard"""
-        # Total de processos
-        total = self.supabase.table("processos").select("id", count="exact").execute()
-        
-        # Processos abertos
-        abertos = self.supabase.table("processos").select("id", count="exact").eq("status", "aberto").execute()
-        
-        # Processos em tramite
-        em_tramite = self.supabase.table("processos").select("id", count="exact").eq("status", "em_tramite").execute()
-        
-        # Processos concluídos
-        concluidos = self.supabase.table("processos").select("id", count="exact").eq("status", "concluido").execute()
-        
-        # Meus processos
-        meus = self.supabase.table("processos").select("id", count="exact").eq("criado_por", usuario_id).execute()
-        
-        # Processos do meu setor
-        meu_setor = 0
-        if setor_id:
-            result = self.supabase.table("processos").select("id", count="exact").eq("setor_atual_id", setor_id).execute()
-            meu_setor = result.count if result.count else 0
-        
-        # Pendentes de aprovação
-        aprovacoes = self.supabase.table("aprovacoes").select("id", count="exact").eq("aprovador_id", usuario_id).eq("status", "pendente").execute()
-        
-        # Pendentes de assinatura (documentos que requerem minha assinatura)
-        # Simplificado: documentos dos processos do meu setor que requerem assinatura e ainda não foram assinados
-        assinaturas_count = 0
-        if setor_id:
-            docs_result = self.supabase.table("documentos").select("id").eq("requer_assinatura", True).eq("assinado", False).execute()
-            assinaturas_count = len(docs_result.data) if docs_result.data else 0
-        
-        return DashboardStats(
-            total_processos=total.count if total.count else 0,
-            processos_abertos=abertos.count if abertos.count else 0,
-            processos_em_tramite=em_tramite.count if em_tramite.count else 0,
-            processos_concluidos=concluidos.count if concluidos.count else 0,
-            meus_processos=meus.count if meus.count else 0,
-            processos_meu_setor=meu_setor,
-            pendentes_aprovacao=aprovacoes.count if aprovacoes.count else 0,
-            pendentes_assinatura=assinaturas_count
-        )
+        # Todas as contagens em um único round trip (função dashboard_stats no banco).
+        # Pendentes de assinatura: documentos ativos dos processos do meu setor
+        # que requerem assinatura e ainda não foram assinados
+        result = await executar(self.supabase.rpc("dashboard_stats", {
+            "p_usuario_id": usuario_id,
+            "p_setor_id": setor_id
+        }))
+        
+        stats = result.data[0] if result.data else {}
+        
+        return DashboardStats(**{
+            campo: stats.get(campo) or 0
+            for campo in DashboardStats.model_fields
+        })
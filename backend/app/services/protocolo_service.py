@@ -0,0 +1,80 @@
+import asyncio
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from app.database import get_supabase_admin, executar
+from app.config import get_settings
+
+settings = get_settings()
+
+def calcular_digito_verificador(ano: int, sequencial: int) -> int:
+    """Dígito verificador módulo 11 (mesma regra de digito_verificador_protocolo no banco)"""
+    digitos = f"{ano}{sequencial:06d}"
+    soma = 0
+    peso = 2
+    for digito in reversed(digitos):
+        soma += int(digito) * peso
+        peso = 2 if peso == 9 else peso + 1
+
+    resto = 11 - (soma % 11)
+    return 0 if resto >= 10 else resto
+
+def formatar_protocolo(ano: int, sequencial: int) -> str:
+    """Gera protocolo no formato ANO.CBB.NNNNNN-DV"""
+    return f"{ano}.CBB.{sequencial:06d}-{calcular_digito_verificador(ano, sequencial)}"
+
+class ProtocoloService:
+    """Distribui números de protocolo a partir do contador anual no banco.
+
+    Cada chamada a reservar_protocolos incrementa o contador do ano de forma
+    atômica. Com protocolo_bloco > 1 o processo reserva vários números por
+    round trip e os entrega localmente; números de um bloco não usado (ex.:
+    reinício do servidor) ficam como lacunas na numeração.
+    """
+
+    def __init__(self, tamanho_bloco: Optional[int] = None):
+        self.supabase = get_supabase_admin()
+        self.tamanho_bloco = max(1, tamanho_bloco or settings.protocolo_bloco)
+        self._blocos: Dict[int, List[int]] = {}  # ano -> [próximo, último]
+        self._lock = asyncio.Lock()
+
+    async def _reservar(self, ano: int, quantidade: int) -> int:
+        """Reserva números consecutivos no banco e retorna o primeiro"""
+        result = await executar(self.supabase.rpc("reservar_protocolos", {
+            "p_ano": ano,
+            "p_quantidade": quantidade
+        }))
+
+        if result.data is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erro ao gerar número de protocolo"
+            )
+
+        return int(result.data)
+
+    async def proximo_protocolo(self, ano: int) -> str:
+        """Retorna o próximo número de protocolo do ano"""
+        if self.tamanho_bloco == 1:
+            # Sem bloco local: o contador do banco já serializa as reservas
+            return formatar_protocolo(ano, await self._reservar(ano, 1))
+
+        async with self._lock:
+            bloco = self._blocos.get(ano)
+
+            if not bloco or bloco[0] > bloco[1]:
+                primeiro = await self._reservar(ano, self.tamanho_bloco)
+                bloco = [primeiro, primeiro + self.tamanho_bloco - 1]
+                self._blocos[ano] = bloco
+
+            sequencial = bloco[0]
+            bloco[0] += 1
+
+        return formatar_protocolo(ano, sequencial)
+
+    async def reservar_protocolos(self, ano: int, quantidade: int) -> List[str]:
+        """Reserva uma faixa contígua de protocolos em um único round trip"""
+        if quantidade <= 0:
+            return []
+
+        primeiro = await self._reservar(ano, quantidade)
+        return [formatar_protocolo(ano, n) for n in range(primeiro, primeiro + quantidade)]
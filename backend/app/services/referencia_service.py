@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from app.database import get_supabase_admin, executar
+from app.models import SetorCreate, SetorResponse, TipoProcessoCreate, TipoProcessoResponse
+from app.config import get_settings
+
+settings = get_settings()
+
+class ReferenciaService:
+    """Cache em memória dos dados de referência (setores e tipos de processo).
+
+    Carregado no startup e recarregado quando o TTL vence ou após uma escrita
+    feita por este worker. Outros workers enxergam a mudança ao fim do TTL.
+    """
+
+    def __init__(self):
+        self.supabase = get_supabase_admin()
+        self.ttl = settings.referencia_cache_ttl
+        self._setores: Dict[int, dict] = {}
+        self._tipos: Dict[int, dict] = {}
+        self._versao = ""
+        self._carregado_em: Optional[float] = None  # None: nunca carregado ou invalidado
+        self._lock = asyncio.Lock()
+
+    async def carregar(self) -> None:
+        """Busca setores e tipos de processo no banco e substitui o cache"""
+        setores, tipos = await asyncio.gather(
+            executar(self.supabase.table("setores").select("*").order("nome")),
+            executar(self.supabase.table("tipos_processo").select("*").order("nome"))
+        )
+
+        self._setores = {s["id"]: s for s in setores.data or []}
+        self._tipos = {t["id"]: t for t in tipos.data or []}
+
+        conteudo = json.dumps([setores.data, tipos.data], sort_keys=True, default=str)
+        self._versao = hashlib.sha256(conteudo.encode()).hexdigest()[:16]
+        self._carregado_em = time.monotonic()
+
+    def _expirado(self) -> bool:
+        return self._carregado_em is None or time.monotonic() - self._carregado_em >= self.ttl
+
+    async def _garantir_carregado(self) -> None:
+        if not self._expirado():
+            return
+
+        async with self._lock:
+            # Outra requisição pode ter recarregado enquanto esperávamos o lock
+            if self._expirado():
+                await self.carregar()
+
+    def invalidar(self) -> None:
+        """Força recarga na próxima leitura"""
+        self._carregado_em = None
+
+    async def etag(self, recurso: str) -> str:
+        """ETag do recurso, derivado da versão atual dos dados de referência"""
+        await self._garantir_carregado()
+        return f'"{recurso}-{self._versao}"'
+
+    async def listar_setores(self) -> List[SetorResponse]:
+        """Setores ativos, ordenados por nome"""
+        await self._garantir_carregado()
+        return [SetorResponse(**s) for s in self._setores.values() if s.get("ativo")]
+
+    async def buscar_setor(self, setor_id: int) -> SetorResponse:
+        """Busca setor por ID"""
+        await self._garantir_carregado()
+        setor = self._setores.get(setor_id)
+
+        if not setor:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Setor não encontrado"
+            )
+
+        return SetorResponse(**setor)
+
+    async def listar_tipos_processo(self) -> List[TipoProcessoResponse]:
+        """Tipos de processo ativos, ordenados por nome"""
+        await self._garantir_carregado()
+        return [TipoProcessoResponse(**t) for t in self._tipos.values() if t.get("ativo")]
+
+    async def setores_por_id(self, ids) -> Dict[int, SetorResponse]:
+        """Setores (inclusive inativos) dos ids informados, resolvidos em memória"""
+        await self._garantir_carregado()
+        return {i: SetorResponse(**self._setores[i]) for i in ids if i in self._setores}
+
+    async def buscar_tipo_processo(self, tipo_processo_id: Optional[int]) -> Optional[TipoProcessoResponse]:
+        """Tipo de processo por ID (None se não existir)"""
+        await self._garantir_carregado()
+        tipo = self._tipos.get(tipo_processo_id)
+        return TipoProcessoResponse(**tipo) if tipo else None
+
+    async def criar_setor(self, setor_data: SetorCreate) -> SetorResponse:
+        """Cria setor e invalida o cache"""
+        result = await executar(self.supabase.table("setores").insert(setor_data.model_dump()))
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erro ao criar setor"
+            )
+
+        self.invalidar()
+        return SetorResponse(**result.data[0])
+
+    async def criar_tipo_processo(self, tipo_data: TipoProcessoCreate) -> TipoProcessoResponse:
+        """Cria tipo de processo e invalida o cache"""
+        result = await executar(self.supabase.table("tipos_processo").insert(tipo_data.model_dump()))
+
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erro ao criar tipo de processo"
+            )
+
+        self.invalidar()
+        return TipoProcessoResponse(**result.data[0])
+
+    def estatisticas(self) -> dict:
+        """Estado do cache para monitoramento"""
+        return {
+            "setores": len(self._setores),
+            "tipos_processo": len(self._tipos),
+            "versao": self._versao,
+            "idade_segundos": round(time.monotonic() - self._carregado_em, 1) if self._carregado_em is not None else None,
+            "ttl": self.ttl
+        }
@@ -1,18 +1,48 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import partial
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import get_settings
-from app.database import get_supabase_admin
+from app.database import get_supabase_admin, executar
 from app.models import TokenData, UsuarioResponse
+from app.utils.cache import CacheTTL
 import hashlib
 
 settings = get_settings()
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes com custo abaixo de bcrypt_rounds são marcados como obsoletos e
+# regravados de forma transparente no próximo login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds
+)
+
+# Rotas administrativas: só os e-mails listados em administradores
+ADMINISTRADORES = {e.strip().lower() for e in settings.administradores.split(",") if e.strip()}
+
+# Usuários autenticados recentemente, indexados por id
+cache_usuarios = CacheTTL(
+    maxsize=settings.usuario_cache_maxsize,
+    ttl=settings.usuario_cache_ttl
+)
+
+# bcrypt é CPU-bound (~250 ms por hash): roda em threads próprias, separadas
+# do executor do banco, com limite de fila para não acumular logins em rajada
+hash_executor = ThreadPoolExecutor(
+    max_workers=settings.hash_executor_workers,
+    thread_name_prefix="bcrypt"
+)
+_hash_pendentes = 0
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -20,6 +50,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def _executar_hash(func, *args):
+    """Executa func no executor de hash, recusando com 503 quando a fila está cheia"""
+    global _hash_pendentes
+    
+    if _hash_pendentes >= settings.hash_fila_max:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, tente novamente em instantes",
+            headers={"Retry-After": "1"}
+        )
+    
+    _hash_pendentes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(hash_executor, partial(func, *args))
+    finally:
+        _hash_pendentes -= 1
+
+async def verificar_senha(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha fora do event loop; retorna (válida, novo_hash se o custo estiver obsoleto)"""
+    return await _executar_hash(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def gerar_hash_senha(password: str) -> str:
+    """Gera o hash da senha fora do event loop"""
+    return await _executar_hash(pwd_context.hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -32,48 +88,51 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def decode_token(token: str) -> TokenData:
-    print("🔓 DECODIFICANDO TOKEN")
-    print(f"Token: {token[:30]}...")
-    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         usuario_id: int = payload.get("sub")
         email: str = payload.get("email")
         
-        print(f"✓ Usuario ID: {usuario_id}, Email: {email}")
-        
         if usuario_id is None:
-            print("❌ ERRO: usuario_id não encontrado")
+            logger.info("Token sem usuario_id")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido")
         
         return TokenData(usuario_id=usuario_id, email=email)
     except JWTError as e:
-        print(f"❌ ERRO JWT: {str(e)}")
+        logger.info("Token rejeitado: %s", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido ou expirado")
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UsuarioResponse:
-    print("👤 GET CURRENT USER")
     token = credentials.credentials
-    print(f"Token extraído: {token[:30]}...")
-    
     token_data = decode_token(token)
-    supabase = get_supabase_admin()
-    result = supabase.table("usuarios").select("*").eq("id", token_data.usuario_id).single().execute()
-    
-    print(f"Usuário encontrado: {result.data is not None}")
-    
-    if not result.data:
-        print("❌ Usuário não encontrado")
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
-    
-    usuario = result.data
-    print(f"✓ Usuário: {usuario.get('email')}, Ativo: {usuario.get('ativo')}")
-    
-    if not usuario.get("ativo"):
+
+    # Cache de principal: evita um SELECT em usuarios a cada requisição
+    usuario = cache_usuarios.get(token_data.usuario_id)
+
+    if usuario is None:
+        supabase = get_supabase_admin()
+        result = await executar(supabase.table("usuarios").select("*").eq("id", token_data.usuario_id).single())
+
+        if not result.data:
+            logger.warning("Usuário do token não encontrado", extra={"usuario_id": token_data.usuario_id})
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
+
+        result.data.pop("senha_hash", None)
+        usuario = UsuarioResponse(**result.data)
+        cache_usuarios.set(usuario.id, usuario)
+
+    if not usuario.ativo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário inativo")
-    
-    print("✅ SUCESSO")
-    return UsuarioResponse(**usuario)
+
+    return usuario
+
+def invalidar_usuario_cache(usuario_id: int) -> None:
+    """Remove o usuário do cache de principal (desativação, troca de setor etc.)"""
+    cache_usuarios.invalidar(usuario_id)
+
+def limpar_cache_usuarios() -> None:
+    """Esvazia o cache de principal"""
+    cache_usuarios.limpar()
 
 def calcular_hash_documento(conteudo: str) -> str:
     return hashlib.sha256(conteudo.encode()).hexdigest()
@@ -85,3 +144,8 @@ async def get_current_active_user(current_user: UsuarioResponse = Depends(get_cu
     if not current_user.ativo:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário inativo")
     return current_user
+
+async def get_current_admin_user(current_user: UsuarioResponse = Depends(get_current_active_user)) -> UsuarioResponse:
+    if current_user.email.lower() not in ADMINISTRADORES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso restrito a administradores")
+    return current_user
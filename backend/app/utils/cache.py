@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheTTL:
+    """Cache em memória com expiração (TTL), limite de tamanho e despejo LRU"""
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._dados: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.despejos = 0
+
+    def get(self, chave: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None se ausente/expirado"""
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expira_em, valor = item
+            if expira_em < time.monotonic():
+                del self._dados[chave]
+                self.misses += 1
+                return None
+
+            self._dados.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def set(self, chave: Hashable, valor: Any) -> None:
+        """Armazena um valor, despejando o menos usado se o cache estiver cheio"""
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.maxsize:
+                self._dados.popitem(last=False)
+                self.despejos += 1
+
+    def invalidar(self, chave: Hashable) -> None:
+        """Remove uma entrada do cache"""
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            self._dados.clear()
+
+    def estatisticas(self) -> dict:
+        """Contadores para monitoramento"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "tamanho": len(self._dados),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "despejos": self.despejos,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0
+            }
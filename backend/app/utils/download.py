@@ -0,0 +1,128 @@
+import os
+from typing import Iterator, Optional, Tuple
+from urllib.parse import quote
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from app.utils.http_cache import etag_corresponde, cabecalhos_cache, nao_modificado
+from app.utils.upload import TAMANHO_BLOCO
+
+# Downloads com validação (ETag) e requisições parciais (Range, RFC 9110)
+
+# Revalida sempre: o 304 economiza a transferência sem pular a checagem de acesso
+CACHE_CONTROL_DOWNLOAD = "private, no-cache"
+
+def interpretar_range(cabecalho: Optional[str], tamanho: int) -> Optional[Tuple[int, int]]:
+    """Converte o header Range em (inicio, fim) inclusivo.
+
+    Retorna None quando não há Range utilizável (ausente, malformado ou com
+    vários intervalos): nesses casos a resposta é o arquivo inteiro.
+    Levanta ValueError quando o intervalo não é satisfazível (416).
+    """
+    if not cabecalho or not cabecalho.startswith("bytes="):
+        return None
+
+    especificacao = cabecalho[len("bytes="):].strip()
+    if "," in especificacao or "-" not in especificacao:
+        return None
+
+    inicio_texto, fim_texto = (parte.strip() for parte in especificacao.split("-", 1))
+
+    if not inicio_texto:
+        # bytes=-N: últimos N bytes
+        if not fim_texto.isdigit():
+            return None
+        sufixo = int(fim_texto)
+        if sufixo == 0 or tamanho == 0:
+            raise ValueError("Intervalo não satisfazível")
+        return max(tamanho - sufixo, 0), tamanho - 1
+
+    if not inicio_texto.isdigit() or (fim_texto and not fim_texto.isdigit()):
+        return None
+
+    inicio = int(inicio_texto)
+    fim = int(fim_texto) if fim_texto else tamanho - 1
+
+    if inicio >= tamanho:
+        raise ValueError("Intervalo não satisfazível")
+    if fim < inicio:
+        return None
+
+    return inicio, min(fim, tamanho - 1)
+
+def _ler_intervalo(caminho: str, inicio: int, quantidade: int) -> Iterator[bytes]:
+    """Lê o trecho do arquivo em blocos (iterado em thread pelo StreamingResponse)"""
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(inicio)
+        while quantidade > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, quantidade))
+            if not bloco:
+                break
+            quantidade -= len(bloco)
+            yield bloco
+
+def _content_disposition(nome: str) -> str:
+    nome_codificado = quote(nome)
+    if nome_codificado != nome:
+        return f"attachment; filename*=utf-8''{nome_codificado}"
+    return f'attachment; filename="{nome}"'
+
+def resposta_arquivo(
+    request: Request,
+    caminho: str,
+    nome: str,
+    tipo: Optional[str] = None,
+    arquivo_hash: Optional[str] = None
+) -> Response:
+    """Resposta de download com ETag/304 e suporte a Range (206/416).
+
+    O ETag forte vem do SHA-256 do conteúdo; sem hash (documentos antigos)
+    usa um ETag fraco de tamanho e data de modificação.
+    """
+    if arquivo_hash:
+        # Validado antes de tocar no disco: o 304 não lê nem o stat do arquivo
+        etag = f'"{arquivo_hash}"'
+        if etag_corresponde(request, etag):
+            return nao_modificado(etag, CACHE_CONTROL_DOWNLOAD)
+
+    estado = os.stat(caminho)
+    tamanho = estado.st_size
+
+    if not arquivo_hash:
+        etag = f'W/"{tamanho:x}-{int(estado.st_mtime):x}"'
+        if etag_corresponde(request, etag):
+            return nao_modificado(etag, CACHE_CONTROL_DOWNLOAD)
+
+    cabecalhos = cabecalhos_cache(etag, CACHE_CONTROL_DOWNLOAD)
+    cabecalhos["Accept-Ranges"] = "bytes"
+    cabecalhos["Content-Disposition"] = _content_disposition(nome)
+    media_type = tipo or "application/octet-stream"
+
+    # If-Range: só atende o Range se o cliente ainda tem a mesma versão (ETag forte)
+    cabecalho_range = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and (if_range.strip() != etag or etag.startswith("W/")):
+        cabecalho_range = None
+
+    try:
+        intervalo = interpretar_range(cabecalho_range, tamanho)
+    except ValueError:
+        cabecalhos["Content-Range"] = f"bytes */{tamanho}"
+        return Response(status_code=416, headers=cabecalhos)
+
+    if intervalo is None:
+        cabecalhos["Content-Length"] = str(tamanho)
+        return StreamingResponse(
+            _ler_intervalo(caminho, 0, tamanho),
+            media_type=media_type,
+            headers=cabecalhos
+        )
+
+    inicio, fim = intervalo
+    cabecalhos["Content-Range"] = f"bytes {inicio}-{fim}/{tamanho}"
+    cabecalhos["Content-Length"] = str(fim - inicio + 1)
+    return StreamingResponse(
+        _ler_intervalo(caminho, inicio, fim - inicio + 1),
+        status_code=206,
+        media_type=media_type,
+        headers=cabecalhos
+    )
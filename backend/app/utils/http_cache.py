@@ -0,0 +1,31 @@
+from typing import Optional
+from fastapi import Request, Response
+
+# Validação condicional (ETag / If-None-Match) para respostas cacheáveis
+
+def etag_corresponde(request: Request, etag: str) -> bool:
+    """Verifica se o If-None-Match enviado pelo cliente casa com o ETag atual"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # Comparação fraca (RFC 9110): ignora o prefixo W/
+    atual = etag.removeprefix("W/")
+    return any(
+        candidato.strip().removeprefix("W/") == atual
+        for candidato in if_none_match.split(",")
+    )
+
+def cabecalhos_cache(etag: str, cache_control: Optional[str] = None) -> dict:
+    """Headers de validação a enviar tanto na resposta 200 quanto na 304"""
+    cabecalhos = {"ETag": etag}
+    if cache_control:
+        cabecalhos["Cache-Control"] = cache_control
+    return cabecalhos
+
+def nao_modificado(etag: str, cache_control: Optional[str] = None) -> Response:
+    """Resposta 304 sem corpo"""
+    return Response(status_code=304, headers=cabecalhos_cache(etag, cache_control))
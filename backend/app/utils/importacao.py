@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+from typing import List, Tuple
+from fastapi import HTTPException, status
+from app.config import get_settings
+
+settings = get_settings()
+
+# Leitura do arquivo de importação em lote (POST /api/processos/importar).
+# Cada linha vira (número da linha, dados): no CSV é a linha física do arquivo
+# (o cabeçalho é a linha 1); no JSON é a posição no array, a partir de 1.
+
+def _ler_csv(conteudo: bytes) -> List[Tuple[int, dict]]:
+    try:
+        texto = conteudo.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV deve estar codificado em UTF-8"
+        )
+
+    # Planilhas exportadas em pt-BR costumam usar ';' como separador
+    primeira_linha = texto.split("\n", 1)[0]
+    delimitador = ";" if primeira_linha.count(";") > primeira_linha.count(",") else ","
+
+    leitor = csv.DictReader(io.StringIO(texto), delimiter=delimitador)
+    linhas = []
+    for registro in leitor:
+        # Células vazias contam como campo não informado
+        dados = {
+            campo.strip(): valor.strip()
+            for campo, valor in registro.items()
+            if campo and valor is not None and valor.strip()
+        }
+        if dados:
+            linhas.append((leitor.line_num, dados))
+    return linhas
+
+def _ler_json(conteudo: bytes) -> List[Tuple[int, dict]]:
+    try:
+        registros = json.loads(conteudo)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="JSON inválido"
+        )
+
+    if not isinstance(registros, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O JSON deve ser um array de processos"
+        )
+
+    return [(posicao, registro) for posicao, registro in enumerate(registros, start=1)]
+
+def ler_importacao(conteudo: bytes, content_type: str) -> List[Tuple[int, dict]]:
+    """Interpreta o corpo da importação conforme o Content-Type (CSV ou JSON)"""
+    tipo = (content_type or "").split(";")[0].strip().lower()
+
+    if tipo in ("text/csv", "application/csv"):
+        linhas = _ler_csv(conteudo)
+    elif tipo == "application/json":
+        linhas = _ler_json(conteudo)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Envie text/csv ou application/json"
+        )
+
+    if not linhas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Nenhum processo para importar"
+        )
+
+    if len(linhas) > settings.importacao_max_linhas:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Importação limitada a {settings.importacao_max_linhas} processos por requisição"
+        )
+
+    return linhas
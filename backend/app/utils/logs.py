@@ -0,0 +1,151 @@
+import atexit
+import logging
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import orjson
+from app.config import get_settings
+
+# Logs estruturados (uma linha JSON por evento) sem bloquear o event loop:
+# quem loga só coloca o registro em uma fila em memória; a escrita em stdout
+# acontece na thread do QueueListener. Em caminhos quentes use %-args e níveis
+# (logger.debug("...", x)), que custam uma comparação quando o nível está
+# desligado. Segredos são mascarados antes da escrita.
+
+settings = get_settings()
+
+MASCARA = "***"
+
+# Campos do extra= cujo valor nunca vai para o log
+CAMPOS_SENSIVEIS = ("senha", "password", "token", "authorization", "secret", "supabase_key")
+
+# Segredos no texto da mensagem: JWT, Bearer e pares senha=... / token: ...
+PADROES_SENSIVEIS = [
+    re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]*"),
+    re.compile(r"(?i)(bearer\s+)\S+"),
+    re.compile(r"(?i)((?:senha|password|token|secret)\w*\s*[=:]\s*)\S+"),
+]
+
+# Atributos padrão do LogRecord (o resto veio de extra=)
+ATRIBUTOS_PADRAO = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "id_requisicao"}
+
+id_requisicao: ContextVar[Optional[str]] = ContextVar("id_requisicao", default=None)
+
+def mascarar(texto: str) -> str:
+    for padrao in PADROES_SENSIVEIS:
+        texto = padrao.sub(lambda m: (m.group(1) if m.groups() else "") + MASCARA, texto)
+    return texto
+
+def _sensivel(campo: str) -> bool:
+    campo = campo.lower()
+    return any(s in campo for s in CAMPOS_SENSIVEIS)
+
+class FormatadorJSON(logging.Formatter):
+    """Registro -> JSON (roda na thread do listener)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        evento = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": mascarar(record.getMessage()),
+        }
+        if getattr(record, "id_requisicao", None):
+            evento["id_requisicao"] = record.id_requisicao
+        for campo, valor in vars(record).items():
+            if campo not in ATRIBUTOS_PADRAO:
+                evento[campo] = MASCARA if _sensivel(campo) else valor
+        if record.exc_text:
+            evento["excecao"] = mascarar(record.exc_text)
+        return orjson.dumps(evento, default=str).decode()
+
+class HandlerFila(QueueHandler):
+    """Enfileira sem bloquear; com a fila cheia o registro é descartado e contado"""
+
+    def __init__(self, fila: queue.Queue):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Só o que depende de quem logou: id da requisição, args resolvidos
+        # (podem mudar depois) e o traceback. JSON e máscaras ficam no listener.
+        record.id_requisicao = id_requisicao.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+_listener: Optional[QueueListener] = None
+
+def configurar_logs() -> None:
+    """Instala fila + listener JSON no logger raiz e os níveis por módulo.
+
+    log_niveis: "app.utils.auth=DEBUG,app.services=WARNING"
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    saida = logging.StreamHandler(sys.stdout)
+    saida.setFormatter(FormatadorJSON())
+    fila = queue.Queue(maxsize=settings.log_fila_max)
+    _listener = QueueListener(fila, saida, respect_handler_level=False)
+
+    raiz = logging.getLogger()
+    raiz.handlers = [HandlerFila(fila)]
+    raiz.setLevel(settings.log_nivel.upper())
+    for item in filter(None, (i.strip() for i in settings.log_niveis.split(","))):
+        modulo, _, nivel = item.partition("=")
+        logging.getLogger(modulo.strip()).setLevel(nivel.strip().upper())
+
+    _listener.start()
+    atexit.register(encerrar_logs)
+
+def encerrar_logs() -> None:
+    """Esvazia a fila e para o listener (fim do processo)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class IdRequisicaoMiddleware:
+    """Correlaciona os logs de uma requisição.
+
+    Usa o X-Request-ID recebido (ex.: do proxy) ou gera um, devolve no
+    cabeçalho da resposta e o disponibiliza aos logs via contextvar.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recebido = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64]
+        identificador = recebido or uuid.uuid4().hex
+        token = id_requisicao.set(identificador)
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                mensagem = {**mensagem, "headers": [*mensagem.get("headers", []), (b"x-request-id", identificador.encode("latin-1"))]}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            id_requisicao.reset(token)
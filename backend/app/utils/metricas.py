@@ -0,0 +1,248 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Métricas em memória do processo no formato de exposição do Prometheus
+# (GET /metrics). Com vários workers do uvicorn cada processo tem os próprios
+# contadores; o Prometheus agrega as séries por instância.
+
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+LE_INFINITO = 'le="+Inf"'
+
+OPERACOES_HTTP = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _rotulos(nomes: Tuple[str, ...], valores: Tuple, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+class Contador:
+    """Contador monotônico com rótulos"""
+
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._valores: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores, quantidade: float = 1) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def amostras(self) -> List[str]:
+        with self._lock:
+            return [f"{self.nome}{_rotulos(self.rotulos, v)} {_numero(n)}" for v, n in sorted(self._valores.items())]
+
+class Medidor(Contador):
+    """Valor que sobe e desce (ex.: requisições em andamento)"""
+
+    tipo = "gauge"
+
+    def dec(self, *valores, quantidade: float = 1) -> None:
+        self.inc(*valores, quantidade=-quantidade)
+
+class MedidorColetado:
+    """Medidor lido no momento da exportação: funcao() -> {valores dos rótulos: valor}"""
+
+    tipo = "gauge"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[str, ...], funcao: Callable[[], Dict[Tuple, float]]):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.funcao = funcao
+
+    def amostras(self) -> List[str]:
+        return [f"{self.nome}{_rotulos(self.rotulos, v)} {_numero(n)}" for v, n in sorted(self.funcao().items())]
+
+class Histograma:
+    """Histograma com buckets cumulativos, soma e contagem por combinação de rótulos"""
+
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = (), buckets: Iterable[float] = BUCKETS_DURACAO):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}  # rótulos -> [contagens por bucket, soma, total]
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores) -> None:
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie[0][i] += 1
+                    break
+            serie[1] += valor
+            serie[2] += 1
+
+    def amostras(self) -> List[str]:
+        linhas = []
+        with self._lock:
+            for valores, (contagens, soma, total) in sorted(self._series.items()):
+                acumulado = 0
+                for limite, contagem in zip(self.buckets, contagens):
+                    acumulado += contagem
+                    le = f'le="{_numero(limite)}"'
+                    linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, valores, le)} {acumulado}")
+                linhas.append(f'{self.nome}_bucket{_rotulos(self.rotulos, valores, LE_INFINITO)} {total}')
+                linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, valores)} {_numero(soma)}")
+                linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+class RegistroMetricas:
+    """Métricas da API e das chamadas ao banco"""
+
+    def __init__(self):
+        self.requisicoes = Contador(
+            "cbb_http_requisicoes_total", "Requisições HTTP atendidas", ("metodo", "rota", "status")
+        )
+        self.duracao = Histograma(
+            "cbb_http_requisicao_duracao_segundos", "Latência das requisições HTTP", ("metodo", "rota")
+        )
+        self.em_andamento = Medidor(
+            "cbb_http_requisicoes_em_andamento", "Requisições HTTP em andamento"
+        )
+        self.consultas = Contador(
+            "cbb_db_consultas_total", "Chamadas ao banco (table/rpc)", ("tabela", "operacao")
+        )
+        self.erros_consulta = Contador(
+            "cbb_db_erros_total", "Chamadas ao banco que falharam", ("tabela", "operacao")
+        )
+        self.duracao_consulta = Histograma(
+            "cbb_db_consulta_duracao_segundos", "Duração das chamadas ao banco (inclui espera no executor)",
+            ("tabela", "operacao")
+        )
+        self.linhas = Contador(
+            "cbb_db_linhas_retornadas_total", "Linhas retornadas pelo banco", ("tabela", "operacao")
+        )
+        self.consultas_por_requisicao = Histograma(
+            "cbb_http_db_consultas_por_requisicao", "Chamadas ao banco feitas por requisição HTTP",
+            ("metodo", "rota"), BUCKETS_CONSULTAS
+        )
+        self.tempo_banco_por_requisicao = Histograma(
+            "cbb_http_db_tempo_por_requisicao_segundos", "Tempo em chamadas ao banco por requisição HTTP",
+            ("metodo", "rota")
+        )
+        self.todas = [
+            self.requisicoes, self.duracao, self.em_andamento, self.consultas, self.erros_consulta,
+            self.duracao_consulta, self.linhas, self.consultas_por_requisicao, self.tempo_banco_por_requisicao,
+        ]
+
+    def registrar(self, metrica) -> None:
+        """Inclui uma métrica de outro módulo (ex.: o pool HTTP em app.database)"""
+        self.todas.append(metrica)
+
+    def exportar(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        linhas = []
+        for metrica in self.todas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.amostras())
+        return "\n".join(linhas) + "\n"
+
+metricas = RegistroMetricas()
+
+# Consultas da requisição em andamento: [quantidade, tempo]. O executar()
+# roda no contexto da requisição (a thread do executor não precisa dele).
+_consultas_requisicao: ContextVar[Optional[list]] = ContextVar("consultas_requisicao", default=None)
+
+def descrever_consulta(query) -> Tuple[str, str]:
+    """(tabela ou função, operação) de um builder table/rpc"""
+    caminho = getattr(query, "path", None)
+    if caminho:
+        # Builders do postgrest-py: /tabela ou /rpc/funcao + método HTTP
+        partes = caminho.strip("/").split("/")
+        if partes[0] == "rpc" and len(partes) > 1:
+            return partes[1], "rpc"
+        return partes[-1], OPERACOES_HTTP.get(getattr(query, "http_method", ""), "desconhecida")
+    if hasattr(query, "tabela"):
+        return query.tabela, query.operacao
+    return getattr(query, "nome", "desconhecida"), "rpc"
+
+def registrar_consulta(query, duracao: float, dados=None, erro: bool = False) -> None:
+    """Contabiliza uma chamada ao banco (chamado por database.executar)"""
+    tabela, operacao = descrever_consulta(query)
+    metricas.consultas.inc(tabela, operacao)
+    metricas.duracao_consulta.observar(duracao, tabela, operacao)
+    if erro:
+        metricas.erros_consulta.inc(tabela, operacao)
+    elif dados is not None:
+        metricas.linhas.inc(tabela, operacao, quantidade=len(dados) if isinstance(dados, list) else 1)
+
+    requisicao = _consultas_requisicao.get()
+    if requisicao is not None:
+        requisicao[0] += 1
+        requisicao[1] += duracao
+
+class MetricasMiddleware:
+    """Latência, status e chamadas ao banco por rota.
+
+    A rota é o template do path (/api/processos/{processo_id}), não a URL,
+    para manter a cardinalidade das séries limitada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._rotas: Dict[object, str] = {}
+
+    def _rota(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "nao_encontrada"
+        rota = self._rotas.get(endpoint)
+        if rota is None:
+            rota = next(
+                (r.path for r in scope["app"].routes if getattr(r, "endpoint", None) is endpoint),
+                "nao_encontrada"
+            )
+            self._rotas[endpoint] = rota
+        return rota
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def enviar(mensagem):
+            nonlocal status_code
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+            await send(mensagem)
+
+        consultas = [0, 0.0]
+        token = _consultas_requisicao.set(consultas)
+        metricas.em_andamento.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            metricas.em_andamento.dec()
+            _consultas_requisicao.reset(token)
+
+            metodo, rota = scope["method"], self._rota(scope)
+            metricas.requisicoes.inc(metodo, rota, status_code)
+            metricas.duracao.observar(duracao, metodo, rota)
+            metricas.consultas_por_requisicao.observar(consultas[0], metodo, rota)
+            metricas.tempo_banco_por_requisicao.observar(consultas[1], metodo, rota)
@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response, status
+from app.database import executar
+
+# Paginação por cursor (keyset) ordenada por (data_autuacao, id) decrescente.
+# O cursor é opaco para o cliente: base64 de [data_autuacao, id] da última linha.
+
+CONTAGENS = {"exata": "exact", "estimada": "estimated"}
+
+def codificar_cursor(valor: Any, id: int) -> str:
+    """Gera o cursor opaco a partir da chave de ordenação da última linha"""
+    bruto = json.dumps([valor, id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> Tuple[str, int]:
+    """Lê o cursor recebido do cliente.
+
+    O valor vai para dentro do filtro or=() do PostgREST: só é aceito um
+    timestamp ISO (as colunas de ordenação são todas datas), o que impede um
+    cursor forjado de reescrever o filtro.
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, id = json.loads(bruto)
+        if not isinstance(valor, str):
+            raise TypeError("valor do cursor deve ser um timestamp")
+        datetime.fromisoformat(valor)
+        return valor, int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+def metodo_contagem(contagem: Optional[str]) -> Optional[str]:
+    """Converte o parâmetro contagem (exata/estimada) para o count do PostgREST"""
+    if contagem is None:
+        return None
+    if contagem not in CONTAGENS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Contagem deve ser 'exata' ou 'estimada'"
+        )
+    return CONTAGENS[contagem]
+
+def aplicar_cursor(query, cursor: Optional[str], coluna: str = "data_autuacao"):
+    """Filtra as linhas posteriores ao cursor e aplica a ordenação do keyset"""
+    if cursor:
+        valor, id = decodificar_cursor(cursor)
+        # Valores entre aspas: timestamps contêm ':' e '.', reservados no or=()
+        query = query.or_(
+            f'{coluna}.lt."{valor}",and({coluna}.eq."{valor}",id.lt.{id})'
+        )
+    return query.order(coluna, desc=True).order("id", desc=True)
+
+async def paginar(query, limit: int, cursor: Optional[str] = None, coluna: str = "data_autuacao") -> Tuple[List[dict], Optional[str], Optional[int]]:
+    """Executa a query paginada; retorna (linhas, próximo cursor, total)"""
+    # Busca uma linha a mais só para saber se existe próxima página
+    result = await executar(aplicar_cursor(query, cursor, coluna).limit(limit + 1))
+
+    linhas = result.data or []
+    proximo_cursor = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        ultima = linhas[-1]
+        proximo_cursor = codificar_cursor(ultima[coluna], ultima["id"])
+
+    return linhas, proximo_cursor, result.count
+
+def definir_cabecalhos_paginacao(response: Response, proximo_cursor: Optional[str], total: Optional[int] = None) -> None:
+    """Expõe o cursor da próxima página (e o total, se pedido) nos headers"""
+    if proximo_cursor:
+        response.headers["X-Next-Cursor"] = proximo_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
@@ -0,0 +1,162 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from app.config import get_settings
+from app.utils.metricas import descrever_consulta
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Parâmetros do PostgREST cujo valor não muda a forma da consulta
+PARAMETROS_SEM_OPERADOR = ("order", "limit", "offset", "or", "and", "on_conflict", "columns")
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Levantada no modo estrito quando uma requisição passa do orçamento ou repete consultas"""
+
+def forma_consulta(query) -> str:
+    """Consulta sem os valores: tabela, operação, colunas e filtros (coluna.operador)"""
+    tabela, operacao = descrever_consulta(query)
+    partes = []
+
+    parametros = getattr(query, "params", None)
+    if parametros is not None:
+        # Builders do postgrest-py: filtros na query string (coluna=op.valor)
+        for chave, valor in parametros.multi_items():
+            if chave == "select":
+                partes.append(f"select={valor}")
+            elif chave in PARAMETROS_SEM_OPERADOR:
+                partes.append(chave)
+            else:
+                partes.append(f"{chave}.{valor.split('.', 1)[0]}")
+    elif hasattr(query, "filtros"):
+        # Backend SQLite e substituto dos benchmarks
+        if query.operacao == "select":
+            partes.append(f"select={query.colunas}")
+        partes.extend(f[0] if f[0] in ("and", "or") else f"{f[0]}.{f[1]}" for f in query.filtros)
+
+    return f"{tabela} {operacao} {'&'.join(partes)}".rstrip()
+
+class RastroConsultas:
+    """Consultas feitas durante uma requisição (ou um bloco rastrear_consultas)"""
+
+    def __init__(self, orcamento: int):
+        self.orcamento = orcamento
+        self.consultas: List[Tuple[str, float]] = []
+
+    def registrar(self, forma: str, duracao: float) -> None:
+        self.consultas.append((forma, duracao))
+
+    @property
+    def total(self) -> int:
+        return len(self.consultas)
+
+    @property
+    def tempo(self) -> float:
+        return sum(duracao for _, duracao in self.consultas)
+
+    def repetidas(self) -> List[Tuple[str, int]]:
+        """Formas executadas mais de uma vez (suspeitas de N+1), da mais frequente"""
+        contagem = Counter(forma for forma, _ in self.consultas)
+        return [(forma, n) for forma, n in contagem.most_common() if n > 1]
+
+    def excedeu(self) -> bool:
+        return self.total > self.orcamento
+
+    def problemas(self) -> Optional[str]:
+        """Descrição dos problemas encontrados ou None"""
+        partes = []
+        if self.excedeu():
+            partes.append(f"{self.total} round trips (orçamento {self.orcamento})")
+        repetidas = self.repetidas()
+        if repetidas:
+            partes.append("repetidas: " + "; ".join(f"{forma} x{n}" for forma, n in repetidas))
+        return ", ".join(partes) or None
+
+    def cabecalho(self) -> str:
+        """Valor de X-Consultas-Banco: total, tempo e formas repetidas"""
+        valor = f"{self.total}; tempo={self.tempo * 1000:.1f}ms; orcamento={self.orcamento}"
+        repetidas = self.repetidas()
+        if repetidas:
+            valor += f"; repetidas={sum(n for _, n in repetidas)}"
+        return valor
+
+_rastro_atual: ContextVar[Optional[RastroConsultas]] = ContextVar("rastro_consultas", default=None)
+
+def registrar(query, duracao: float) -> None:
+    """Anota a consulta no rastro em andamento (chamado por database.executar)"""
+    rastro = _rastro_atual.get()
+    if rastro is not None:
+        rastro.registrar(forma_consulta(query), duracao)
+
+def orcamento_consultas(limite: int):
+    """Dependência que define o orçamento de round trips da rota.
+
+    Uso: @app.get(..., dependencies=[Depends(orcamento_consultas(3))])
+    Sem o rastreamento ativo não faz nada.
+    """
+    async def definir():
+        rastro = _rastro_atual.get()
+        if rastro is not None:
+            rastro.orcamento = limite
+    return definir
+
+@contextmanager
+def rastrear_consultas(orcamento: Optional[int] = None, estrito: bool = True):
+    """Rastreia as consultas de um bloco; em testes, falha se houver N+1 ou excesso.
+
+        with rastrear_consultas(orcamento=2) as rastro:
+            await processo_service.detalhar_processo(1)
+    """
+    rastro = RastroConsultas(orcamento if orcamento is not None else settings.rastreamento_orcamento)
+    token = _rastro_atual.set(rastro)
+    try:
+        yield rastro
+    finally:
+        _rastro_atual.reset(token)
+
+    problemas = rastro.problemas()
+    if problemas and estrito:
+        raise OrcamentoConsultasExcedido(problemas)
+
+class RastreamentoConsultasMiddleware:
+    """Detecta requisições falantes: N+1 e excesso de round trips ao banco.
+
+    Adiciona X-Consultas-Banco à resposta e registra um aviso com as formas
+    repetidas. Com rastreamento_estrito (testes) a requisição problemática
+    levanta OrcamentoConsultasExcedido, que o TestClient propaga ao teste.
+    """
+
+    def __init__(self, app, orcamento: Optional[int] = None, estrito: Optional[bool] = None):
+        self.app = app
+        self.orcamento = orcamento if orcamento is not None else settings.rastreamento_orcamento
+        self.estrito = settings.rastreamento_estrito if estrito is None else estrito
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rastro = RastroConsultas(self.orcamento)
+        token = _rastro_atual.set(rastro)
+
+        async def enviar(mensagem):
+            # Com streaming, consultas feitas depois do início da resposta
+            # entram no log, mas não no cabeçalho
+            if mensagem["type"] == "http.response.start":
+                cabecalhos = list(mensagem.get("headers", []))
+                cabecalhos.append((b"x-consultas-banco", rastro.cabecalho().encode("latin-1", "replace")))
+                mensagem = {**mensagem, "headers": cabecalhos}
+            await send(mensagem)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _rastro_atual.reset(token)
+
+        problemas = rastro.problemas()
+        if problemas:
+            logger.warning("Consultas da requisição %s %s: %s", scope["method"], scope["path"], problemas)
+            if self.estrito:
+                raise OrcamentoConsultasExcedido(f"{scope['method']} {scope['path']}: {problemas}")
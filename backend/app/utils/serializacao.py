@@ -0,0 +1,60 @@
+from typing import Iterable, Iterator, List, Optional, Type, TypeVar
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+# Caminho rápido de serialização para listagens.
+#
+# Linhas vindas do banco já têm os tipos certos (o PostgREST devolve JSON), então
+# os modelos são montados com model_construct, sem validar campo a campo, e a
+# resposta é gerada direto com orjson. As rotas que usam este caminho devolvem a
+# Response pronta: o FastAPI não revalida contra o response_model (que continua
+# declarado para a documentação).
+
+Modelo = TypeVar("Modelo", bound=BaseModel)
+
+ITENS_POR_BLOCO = 500  # itens codificados por bloco no streaming
+
+def construir(modelo: Type[Modelo], linhas: Iterable[dict]) -> List[Modelo]:
+    """Monta modelos a partir de linhas confiáveis do banco, sem revalidação.
+
+    Só os campos do modelo são copiados: model_construct guardaria colunas
+    extras (ex.: e-mails de processos_resumo) e elas iriam para o cliente.
+    """
+    campos = tuple(modelo.model_fields)
+    return [
+        modelo.model_construct(**{campo: linha[campo] for campo in campos if campo in linha})
+        for linha in linhas
+    ]
+
+def _padrao(obj):
+    # Modelos montados por construir guardam os valores do banco em __dict__
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError
+
+def codificar(conteudo) -> bytes:
+    """JSON com orjson, aceitando modelos pydantic"""
+    return orjson.dumps(conteudo, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+
+def resposta_lista(itens: list, response: Optional[Response] = None) -> Response:
+    """Resposta JSON já serializada; copia os headers definidos em response (ex.: cursor)"""
+    cabecalhos = None
+    if response is not None:
+        cabecalhos = {
+            nome: valor for nome, valor in response.headers.items()
+            if nome not in ("content-length", "content-type")
+        }
+    return Response(content=codificar(itens), media_type="application/json", headers=cabecalhos)
+
+def _blocos(itens: list) -> Iterator[bytes]:
+    yield b"["
+    for inicio in range(0, len(itens), ITENS_POR_BLOCO):
+        bloco = b",".join(codificar(item) for item in itens[inicio:inicio + ITENS_POR_BLOCO])
+        yield (b"," + bloco) if inicio else bloco
+    yield b"]"
+
+def transmitir_lista(itens: list) -> StreamingResponse:
+    """Array JSON enviado em blocos: o primeiro byte sai antes de codificar a lista toda"""
+    return StreamingResponse(_blocos(itens), media_type="application/json")
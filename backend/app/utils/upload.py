@@ -0,0 +1,93 @@
+import hashlib
+from io import BufferedReader
+from typing import BinaryIO, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from app.config import get_settings
+
+settings = get_settings()
+
+TAMANHO_BLOCO = 1024 * 1024  # 1 MB
+
+def _erro_tamanho(tamanho_max: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Arquivo excede o tamanho máximo de {tamanho_max // (1024 * 1024)} MB"
+    )
+
+def _consumir(origem: BinaryIO, destino: Optional[BinaryIO], tamanho_max: int) -> Tuple[str, int]:
+    """Lê origem em blocos calculando SHA-256 e o tamanho; copia para destino se informado"""
+    sha256 = hashlib.sha256()
+    total = 0
+    origem.seek(0)
+
+    while True:
+        bloco = origem.read(TAMANHO_BLOCO)
+        if not bloco:
+            break
+
+        total += len(bloco)
+        if total > tamanho_max:
+            raise _erro_tamanho(tamanho_max)
+
+        sha256.update(bloco)
+        if destino is not None:
+            destino.write(bloco)
+
+    origem.seek(0)
+    return sha256.hexdigest(), total
+
+async def processar_upload(arquivo: UploadFile, destino: Optional[BinaryIO] = None) -> Tuple[str, int]:
+    """Percorre o upload em blocos (memória constante) e retorna (sha256, tamanho).
+
+    Se destino for informado, os bytes são gravados nele na mesma passada.
+    O trabalho roda em thread para não bloquear o event loop.
+    """
+    return await run_in_threadpool(_consumir, arquivo.file, destino, settings.upload_tamanho_max)
+
+def leitor_binario(arquivo: UploadFile) -> BufferedReader:
+    """Leitor sobre o arquivo temporário do upload, aceito pelo cliente do Storage.
+
+    O Storage só faz streaming de BufferedReader; abrir o descritor do arquivo
+    temporário evita carregar o conteúdo inteiro em memória como bytes.
+    """
+    leitor = open(arquivo.file.fileno(), "rb", closefd=False)
+    leitor.seek(0)
+    return leitor
+
+class LimiteUploadMiddleware:
+    """Recusa com 413 corpos maiores que upload_tamanho_max.
+
+    Usa o Content-Length quando presente (antes de ler o corpo) e também conta
+    os bytes durante a recepção, abortando no meio do stream (ex.: chunked).
+    """
+
+    def __init__(self, app, tamanho_max: Optional[int] = None):
+        self.app = app
+        self.tamanho_max = tamanho_max or settings.upload_tamanho_max
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.tamanho_max:
+            erro = _erro_tamanho(self.tamanho_max)
+            resposta = JSONResponse({"detail": erro.detail}, status_code=erro.status_code)
+            await resposta(scope, receive, send)
+            return
+
+        recebido = 0
+
+        async def receive_limitado():
+            nonlocal recebido
+            mensagem = await receive()
+            if mensagem["type"] == "http.request":
+                recebido += len(mensagem.get("body", b""))
+                if recebido > self.tamanho_max:
+                    raise _erro_tamanho(self.tamanho_max)
+            return mensagem
+
+        await self.app(scope, receive_limitado, send)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência sob concorrência do acesso ao banco.
+
+Compara o modo antigo (query.execute() chamado direto dentro do handler
+async, bloqueando o event loop) com o executor de app.database. Cada
+"requisição" faz algumas queries com latência simulada de PostgREST.
+
+Uso (a partir de backend/):
+    python -m benchmarks.latencia_concorrencia
+"""
+import asyncio
+import os
+import statistics
+import time
+
+# Valores fictícios só para permitir importar app.database sem um .env
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.database import executar  # noqa: E402
+
+LATENCIA_QUERY = 0.02  # 20 ms por round trip
+QUERIES_POR_REQUISICAO = 2
+CONCORRENCIAS = [1, 8, 32, 64]
+
+
+class QueryFalsa:
+    """Imita um builder do postgrest cujo execute() bloqueia na rede"""
+
+    def execute(self):
+        time.sleep(LATENCIA_QUERY)
+        return None
+
+
+async def requisicao_bloqueante():
+    for _ in range(QUERIES_POR_REQUISICAO):
+        QueryFalsa().execute()
+    return time.perf_counter()
+
+
+async def requisicao_executor():
+    for _ in range(QUERIES_POR_REQUISICAO):
+        await executar(QueryFalsa())
+    return time.perf_counter()
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def medir(requisicao, concorrencia):
+    # Todas as requisições "chegam" juntas; a latência é medida a partir da chegada
+    chegada = time.perf_counter()
+    termino = await asyncio.gather(*[requisicao() for _ in range(concorrencia)])
+    latencias_ms = [(t - chegada) * 1000 for t in termino]
+    return statistics.median(latencias_ms), percentil(latencias_ms, 99)
+
+
+async def main():
+    print(f"Latência simulada por query: {LATENCIA_QUERY * 1000:.0f} ms, "
+          f"{QUERIES_POR_REQUISICAO} queries por requisição\n")
+    print(f"{'concorrência':>12} | {'bloqueante p50/p99 (ms)':>24} | {'executor p50/p99 (ms)':>22}")
+    print("-" * 66)
+    for concorrencia in CONCORRENCIAS:
+        b50, b99 = await medir(requisicao_bloqueante, concorrencia)
+        e50, e99 = await medir(requisicao_executor, concorrencia)
+        print(f"{concorrencia:>12} | {b50:>11.1f} / {b99:>10.1f} | {e50:>9.1f} / {e99:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
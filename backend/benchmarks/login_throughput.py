@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de vazão de login (POST /api/auth/login) com 1, 8 e 64 clientes.
+
+A aplicação (main.app) roda no próprio processo, atendida por um
+httpx.AsyncClient com ASGITransport, e o Supabase é trocado pelo substituto
+em memória de benchmarks.supabase_local: cada login passa pela rota real,
+com o SELECT do usuário, a verificação bcrypt e o UPDATE de ultimo_acesso.
+
+Compara a verificação feita direto no handler async (modo antigo, trocando
+verificar_senha do AuthService por uma versão inline) com o executor de hash
+de app.utils.auth. Respostas 503 (limite de fila do executor) são contadas à
+parte. Em paralelo, uma requisição leve mede o atraso máximo do event loop
+durante a rajada de logins (o que as demais rotas do worker sentem). Com
+poucas CPUs a vazão de bcrypt fica parecida nos dois modos; o ganho aparece
+no atraso do loop.
+
+Uso (a partir de backend/):
+    python -m benchmarks.login_throughput [--latencia-ms 2]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Valores fictícios só para permitir importar app.* sem um .env
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ARMAZENAMENTO_BACKEND", "local")
+os.environ.setdefault("ARMAZENAMENTO_DIR", tempfile.mkdtemp(prefix="cbb_bench_"))
+# Um "Login bem-sucedido" por requisição misturaria os logs à tabela
+os.environ.setdefault("LOG_NIVEL", "WARNING")
+
+from benchmarks.supabase_local import SupabaseLocal  # noqa: E402
+
+SENHA = "senha123"
+LOGINS_POR_CLIENTE = 2
+CLIENTES = [1, 8, 64]
+
+
+async def verificar_inline(senha, senha_hash):
+    """O que o login fazia: bcrypt no próprio event loop, sem rehash"""
+    from app.utils.auth import verify_password
+    return verify_password(senha, senha_hash), None
+
+
+async def cliente(http, email, resultado):
+    for _ in range(LOGINS_POR_CLIENTE):
+        resposta = await http.post("/api/auth/login", json={"email": email, "senha": SENHA})
+        if resposta.status_code == 200:
+            resultado["ok"] += 1
+        elif resposta.status_code == 503:
+            resultado["recusados"] += 1
+        else:
+            resultado["erros"] += 1
+
+
+async def atraso_event_loop(parar, atrasos):
+    """Requisição leve: dorme 10 ms repetidamente e registra o atraso extra"""
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(0.01)
+        atrasos.append((time.perf_counter() - inicio - 0.01) * 1000)
+
+
+async def medir(http, emails, clientes):
+    resultado = {"ok": 0, "recusados": 0, "erros": 0}
+    parar = asyncio.Event()
+    atrasos = [0.0]
+    sonda = asyncio.create_task(atraso_event_loop(parar, atrasos))
+    await asyncio.sleep(0)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*[cliente(http, emails[i % len(emails)], resultado) for i in range(clientes)])
+    duracao = time.perf_counter() - inicio
+
+    parar.set()
+    await sonda
+    return resultado["ok"] / duracao, resultado["recusados"], resultado["erros"], max(atrasos)
+
+
+async def main(args):
+    import httpx
+    from app import database
+    from app.services import auth_service
+    from app.utils.auth import pwd_context
+
+    # Todos os serviços pegam o cliente por get_supabase_admin() ao serem criados
+    banco = SupabaseLocal(latencia=args.latencia_ms / 1000)
+    database.supabase = banco
+    database.supabase_admin = banco
+
+    banco.tabela("setores").inserir({"nome": "Secretaria Geral", "sigla": "SEGE"})
+    senha_hash = pwd_context.hash(SENHA)
+    emails = [f"usuario{i}@cbb.com.br" for i in range(1, max(CLIENTES) + 1)]
+    for i, email in enumerate(emails, start=1):
+        banco.tabela("usuarios").inserir({
+            "nome": f"Usuário {i:04d}", "email": email, "senha_hash": senha_hash, "setor_id": 1,
+        })
+
+    import main as aplicacao
+    verificar_executor = auth_service.verificar_senha
+
+    print(f"{LOGINS_POR_CLIENTE} logins por cliente, latência do banco {args.latencia_ms} ms\n")
+    print(f"{'':>8} | {'inline':^27} | {'executor':^33}")
+    print(f"{'clientes':>8} | {'login/s':>8} | {'atraso loop (ms)':>16} | "
+          f"{'login/s':>8} | {'atraso loop (ms)':>16} | {'503':>3}")
+    print("-" * 74)
+
+    transporte = httpx.ASGITransport(app=aplicacao.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as http:
+        await http.post("/api/auth/login", json={"email": emails[0], "senha": SENHA})  # aquecimento
+        for clientes in CLIENTES:
+            auth_service.verificar_senha = verificar_inline
+            try:
+                inline, _, erros_inline, atraso_inline = await medir(http, emails, clientes)
+            finally:
+                auth_service.verificar_senha = verificar_executor
+            executor, recusados, erros_executor, atraso_executor = await medir(http, emails, clientes)
+            assert not erros_inline and not erros_executor, "login respondeu com erro"
+            print(f"{clientes:>8} | {inline:>8.1f} | {atraso_inline:>16.1f} | "
+                  f"{executor:>8.1f} | {atraso_executor:>16.1f} | {recusados:>3}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--latencia-ms", type=float, default=2.0,
+                        help="latência simulada de cada round trip ao PostgREST")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Paridade entre as duas emulações das funções do schema.
+
+As RPCs de database/schema.sql são reimplementadas em dois lugares: no
+backend SQLite (app/database_sqlite.py) e no substituto em memória dos
+benchmarks (benchmarks/supabase_local.py). Este script aplica o mesmo
+cenário aos dois, a partir das mesmas seeds, e compara o resultado de cada
+chamada a cada RPC que o substituto implementa. Timestamps são ignorados
+(dependem do relógio). Sai com código 1 se houver divergência ou se o
+substituto tiver uma RPC que o backend SQLite não conhece.
+
+Uso (a partir de backend/):
+    python -m benchmarks.paridade_rpc
+"""
+import json
+import os
+import sys
+
+# Valores fictícios só para permitir importar app.* sem um .env
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.database_sqlite import ClienteSQLite  # noqa: E402
+from benchmarks.supabase_local import SupabaseLocal  # noqa: E402
+
+# Copiadas do backend SQLite (seeds de schema_sqlite.sql) para o substituto
+TABELAS_SEED = ("setores", "tipos_processo", "usuarios")
+
+PROCESSOS = [
+    {"tipo_processo_id": 1, "assunto": "Compra de bolas oficiais", "interessado": "Seleção Feminina",
+     "setor_atual_id": 1, "criado_por": 1},
+    {"tipo_processo_id": 2, "assunto": "Contrato de <b>transporte</b> & hospedagem", "interessado": "A & B Ltda",
+     "setor_atual_id": 2, "criado_por": 2},
+    {"tipo_processo_id": 1, "assunto": "Compra de uniformes", "especificacao": "bolas, redes e bolas de treino",
+     "setor_atual_id": 1, "criado_por": 1},
+    {"tipo_processo_id": 3, "assunto": "Processo bloqueado", "setor_atual_id": 3, "criado_por": 2,
+     "bloqueado": True, "motivo_bloqueio": "auditoria"},
+]
+
+DOCUMENTOS = [
+    {"processo_id": 1, "tipo_documento": "anexo", "nome": "Orçamento", "criado_por": 1, "requer_assinatura": True},
+    {"processo_id": 1, "tipo_documento": "anexo", "nome": "Proposta", "criado_por": 1},
+    {"processo_id": 2, "tipo_documento": "gerado", "nome": "Minuta", "criado_por": 2, "requer_assinatura": True},
+]
+
+BLOB = {"p_hash": "ab" * 32, "p_caminho": "blobs/ab/abab-1", "p_url": "/blobs/ab/abab-1", "p_tamanho": 10, "p_tipo": "text/plain"}
+
+# (rpc, parâmetros), na ordem: chamadas com escrita mudam o estado das seguintes
+CENARIO = [
+    ("reservar_protocolos", {"p_ano": 2031, "p_quantidade": 5}),
+    ("reservar_protocolos", {"p_ano": 2031}),
+    ("dashboard_stats", {"p_usuario_id": 1, "p_setor_id": 1}),
+    ("dashboard_stats", {"p_usuario_id": 2, "p_setor_id": None}),
+    ("buscar_processos", {"p_termo": "bolas"}),
+    ("buscar_processos", {"p_termo": "compra bolas", "p_limite": 1, "p_offset": 1}),
+    ("buscar_processos", {"p_termo": "transporte"}),
+    ("buscar_processos", {"p_termo": "   "}),
+    ("buscar_processos", {"p_termo": "inexistente"}),
+    # Curingas do LIKE são texto literal na busca (nenhum protocolo tem "%" ou "_")
+    ("buscar_processos", {"p_termo": "%"}),
+    ("buscar_processos", {"p_termo": "_"}),
+    ("tramitar_processo", {"p_processo_id": 1, "p_setor_origem_id": 1, "p_setor_destino_id": 2,
+                           "p_usuario_id": 1, "p_observacao": "Segue"}),
+    ("tramitar_processo", {"p_processo_id": 4, "p_setor_origem_id": 3, "p_setor_destino_id": 1,
+                           "p_usuario_id": 2}),
+    ("tramitar_processo", {"p_processo_id": 999, "p_setor_origem_id": 1, "p_setor_destino_id": 2,
+                           "p_usuario_id": 1}),
+    ("dashboard_stats", {"p_usuario_id": 1, "p_setor_id": 2}),
+    ("referenciar_blob", {"p_hash": BLOB["p_hash"]}),
+    ("reservar_blob", BLOB),
+    ("reservar_blob", {**BLOB, "p_caminho": "blobs/ab/abab-2", "p_url": "/blobs/ab/abab-2"}),
+    ("referenciar_blob", {"p_hash": BLOB["p_hash"]}),
+    ("liberar_blob", {"p_hash": BLOB["p_hash"], "p_url": "/outra/url"}),
+    ("liberar_blob", {"p_hash": BLOB["p_hash"], "p_url": BLOB["p_url"]}),
+    ("liberar_blob", {"p_hash": BLOB["p_hash"], "p_url": BLOB["p_url"]}),
+    ("liberar_blob", {"p_hash": BLOB["p_hash"], "p_url": BLOB["p_url"]}),
+    ("referenciar_blob", {"p_hash": BLOB["p_hash"]}),
+]
+
+
+def volatil(coluna):
+    return coluna.endswith("_em") or coluna.startswith("data_")
+
+
+def normalizar(valor):
+    """Resultado como chegaria em JSON, sem os timestamps"""
+    valor = json.loads(json.dumps(valor, default=str))
+
+    def limpar(item):
+        if isinstance(item, dict):
+            return {c: limpar(v) for c, v in item.items() if not volatil(c)}
+        if isinstance(item, list):
+            return [limpar(v) for v in item]
+        return item
+
+    return limpar(valor)
+
+
+def preparar():
+    sqlite, local = ClienteSQLite(), SupabaseLocal()
+    for tabela in TABELAS_SEED:
+        linhas = sqlite.table(tabela).select("*").order("id").execute().data
+        local.table(tabela).insert(linhas).execute()
+    for tabela, linhas in (("processos", PROCESSOS), ("documentos", DOCUMENTOS)):
+        for linha in linhas:
+            sqlite.table(tabela).insert(linha).execute()
+            local.table(tabela).insert(linha).execute()
+    aprovacao = {"tipo_aprovacao": "documento", "documento_id": 1, "aprovador_id": 1, "solicitado_por": 2}
+    sqlite.table("aprovacoes").insert(aprovacao).execute()
+    local.table("aprovacoes").insert(aprovacao).execute()
+    return sqlite, local
+
+
+def main():
+    sqlite, local = preparar()
+    divergencias = 0
+
+    sem_equivalente = sorted(set(local.rpcs) - set(sqlite.rpcs))
+    for nome in sem_equivalente:
+        print(f"{nome}: implementada no substituto, ausente no backend SQLite")
+        divergencias += 1
+
+    cobertas = {nome for nome, _ in CENARIO}
+    for nome in sorted(set(local.rpcs) - cobertas):
+        print(f"{nome}: sem chamada no cenário")
+        divergencias += 1
+
+    for nome, parametros in CENARIO:
+        esperado = normalizar(sqlite.rpc(nome, parametros).execute().data)
+        obtido = normalizar(local.rpc(nome, parametros).execute().data)
+        if esperado != obtido:
+            divergencias += 1
+            print(f"{nome}({parametros}):\n  sqlite:     {esperado}\n  substituto: {obtido}")
+
+    print(f"{len(CENARIO)} chamadas, {len(local.rpcs)} RPCs do substituto, {divergencias} divergência(s)")
+    sys.exit(1 if divergencias else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Teste de concorrência do alocador de protocolos.
+
+Cria milhares de protocolos em paralelo contra a função reservar_protocolos
+real do backend SQLite (o mesmo UPSERT ... RETURNING de schema.sql), a partir
+de várias instâncias de ProtocoloService, cada uma com a própria conexão ao
+mesmo arquivo de banco (simulando workers do uvicorn). As chamadas rodam de
+fato em paralelo nas threads do executor do banco, e a reserva de uma faixa
+contígua (importação em lote) concorre com as demais. Falha com código de
+saída 1 se houver qualquer número repetido, dígito verificador inválido ou,
+com bloco 1, lacuna na numeração.
+
+Uso (a partir de backend/):
+    python -m benchmarks.protocolo_concorrencia
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Valores fictícios só para permitir importar app.* sem um .env
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from app.database_sqlite import ClienteSQLite  # noqa: E402
+from app.services.protocolo_service import ProtocoloService, calcular_digito_verificador  # noqa: E402
+
+ANO = 2025
+TOTAL = 5000
+LOTE = 1000
+WORKERS = 4
+
+
+class ClienteContado(ClienteSQLite):
+    """Conexão própria ao arquivo do banco, contando os round trips"""
+
+    def __init__(self, caminho):
+        super().__init__(caminho)
+        self.chamadas = 0
+
+    def rpc(self, nome, parametros=None):
+        self.chamadas += 1
+        return super().rpc(nome, parametros)
+
+
+def validar(protocolos):
+    erros = len(protocolos) - len(set(protocolos))
+    for protocolo in protocolos:
+        ano, _, resto = protocolo.split(".")
+        sequencial, dv = resto.split("-")
+        if int(dv) != calcular_digito_verificador(int(ano), int(sequencial)):
+            erros += 1
+    return erros
+
+
+def sequenciais(protocolos):
+    return sorted(int(p.split(".")[2].split("-")[0]) for p in protocolos)
+
+
+async def rodar(tamanho_bloco, diretorio):
+    caminho = os.path.join(diretorio, f"protocolos_{tamanho_bloco}.db")
+    bancos = [ClienteContado(caminho) for _ in range(WORKERS)]
+    servicos = []
+    for banco in bancos:
+        servico = ProtocoloService(tamanho_bloco=tamanho_bloco)
+        servico.supabase = banco
+        servicos.append(servico)
+
+    inicio = time.perf_counter()
+    chamadas = [servicos[i % WORKERS].proximo_protocolo(ANO) for i in range(TOTAL)]
+    # Reserva de faixa contígua (importação em lote) no meio das demais
+    chamadas.insert(TOTAL // 2, servicos[0].reservar_protocolos(ANO, LOTE))
+    resultados = await asyncio.gather(*chamadas)
+    duracao = time.perf_counter() - inicio
+
+    lote = resultados.pop(TOTAL // 2)
+    protocolos = list(resultados) + lote
+
+    erros = validar(protocolos)
+    numeros = sequenciais(lote)
+    if numeros != list(range(numeros[0], numeros[0] + LOTE)):
+        erros += 1
+    if tamanho_bloco == 1 and sequenciais(protocolos) != list(range(1, TOTAL + LOTE + 1)):
+        erros += 1
+
+    for banco in bancos:
+        banco.conexao.close()
+    return erros, sum(banco.chamadas for banco in bancos), duracao
+
+
+async def main():
+    falhou = False
+    print(f"{TOTAL} protocolos + lote de {LOTE}, {WORKERS} conexões ao mesmo banco SQLite\n")
+    print(f"{'bloco':>6} | {'round trips':>11} | {'tempo (s)':>9} | {'erros':>20}")
+    print("-" * 56)
+    with tempfile.TemporaryDirectory(prefix="cbb_protocolos_") as diretorio:
+        for tamanho_bloco in [1, 10, 100]:
+            erros, chamadas, duracao = await rodar(tamanho_bloco, diretorio)
+            falhou = falhou or erros > 0
+            print(f"{tamanho_bloco:>6} | {chamadas:>11} | {duracao:>9.2f} | {erros:>20}")
+
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
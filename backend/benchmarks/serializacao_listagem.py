@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização de uma listagem de 1.000 processos.
+
+Compara o caminho antigo de listar_processos (ProcessoResponse(**p) para cada
+linha, revalidação contra o response_model e JSONResponse da stdlib) com o
+caminho rápido de app.utils.serializacao (model_construct + orjson), tanto
+em memória (só a montagem e a serialização) quanto de ponta a ponta por uma
+rota FastAPI. O banco não participa: as linhas são geradas no formato em que
+o PostgREST as devolve.
+
+Uso (a partir de backend/):
+    python -m benchmarks.serializacao_listagem
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+# Valores fictícios só para permitir importar app.* sem um .env
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from app.models import ProcessoResponse  # noqa: E402
+from app.utils.serializacao import construir, resposta_lista, transmitir_lista  # noqa: E402
+
+LINHAS = 1000
+REPETICOES = 50
+
+
+def gerar_linhas(quantidade):
+    base = datetime(2024, 1, 1, 8, 0, 0)
+    linhas = []
+    for i in range(1, quantidade + 1):
+        data = (base + timedelta(minutes=i)).isoformat()
+        linhas.append({
+            "id": i,
+            "numero_protocolo": f"2024.{i:06d}",
+            "ano": 2024,
+            "tipo_processo_id": 1 + i % 5,
+            "assunto": f"Solicitação de inscrição de atleta nº {i}",
+            "interessado": "Federação Paulista de Basketball",
+            "cpf_cnpj_interessado": "12.345.678/0001-90",
+            "especificacao": "Inscrição para o campeonato nacional sub-17",
+            "status": "em_tramite",
+            "nivel_acesso": "publico",
+            "prioridade": "normal",
+            "setor_atual_id": 1 + i % 8,
+            "usuario_responsavel_id": None,
+            "observacoes": None,
+            "prazo_dias": 30,
+            "data_autuacao": data,
+            "data_conclusao": None,
+            "data_prazo": None,
+            "criado_por": 1 + i % 20,
+            "criado_em": data,
+            "atualizado_em": data,
+            "bloqueado": False,
+        })
+    return linhas
+
+
+def caminho_antigo(linhas, adaptador):
+    """O que a rota fazia: validar no service, revalidar e codificar no FastAPI"""
+    processos = [ProcessoResponse(**p) for p in linhas]
+    # Mesmas etapas de fastapi.routing.serialize_response com pydantic v2
+    validados = adaptador.validate_python(processos, from_attributes=True)
+    return JSONResponse(adaptador.dump_python(validados, mode="json")).body
+
+
+def caminho_rapido(linhas):
+    return resposta_lista(construir(ProcessoResponse, linhas)).body
+
+
+def cronometrar(funcao, repeticoes=REPETICOES):
+    funcao()  # aquecimento
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def montar_app(linhas):
+    app_antigo = FastAPI(default_response_class=JSONResponse)
+    app_rapido = FastAPI()
+
+    @app_antigo.get("/processos", response_model=List[ProcessoResponse])
+    async def antigo():
+        return [ProcessoResponse(**p) for p in linhas]
+
+    @app_rapido.get("/processos", response_model=List[ProcessoResponse])
+    async def rapido():
+        return resposta_lista(construir(ProcessoResponse, linhas))
+
+    @app_rapido.get("/processos/stream", response_model=List[ProcessoResponse])
+    async def rapido_stream():
+        return transmitir_lista(construir(ProcessoResponse, linhas))
+
+    return TestClient(app_antigo), TestClient(app_rapido)
+
+
+def main():
+    linhas = gerar_linhas(LINHAS)
+    adaptador = TypeAdapter(List[ProcessoResponse])
+
+    # As duas saídas devem representar os mesmos dados
+    antigo = caminho_antigo(linhas, adaptador)
+    rapido = caminho_rapido(linhas)
+    assert json.loads(antigo) == json.loads(rapido)
+
+    print(f"{LINHAS} processos, média de {REPETICOES} repetições\n")
+    print(f"{'etapa':<34} | {'antes (ms)':>10} | {'depois (ms)':>11} | {'ganho':>6}")
+    print("-" * 70)
+
+    em_memoria_antes = cronometrar(lambda: caminho_antigo(linhas, adaptador))
+    em_memoria_depois = cronometrar(lambda: caminho_rapido(linhas))
+    print(f"{'montagem + serialização':<34} | {em_memoria_antes:>10.2f} | "
+          f"{em_memoria_depois:>11.2f} | {em_memoria_antes / em_memoria_depois:>5.1f}x")
+
+    cliente_antigo, cliente_rapido = montar_app(linhas)
+    rota_antes = cronometrar(lambda: cliente_antigo.get("/processos"))
+    rota_depois = cronometrar(lambda: cliente_rapido.get("/processos"))
+    rota_stream = cronometrar(lambda: cliente_rapido.get("/processos/stream"))
+    print(f"{'rota GET /processos':<34} | {rota_antes:>10.2f} | "
+          f"{rota_depois:>11.2f} | {rota_antes / rota_depois:>5.1f}x")
+    print(f"{'rota GET /processos (streaming)':<34} | {rota_antes:>10.2f} | "
+          f"{rota_stream:>11.2f} | {rota_antes / rota_stream:>5.1f}x")
+    print(f"\ntamanho do corpo: antes {len(antigo)} bytes, depois {len(rapido)} bytes")
+
+
+if __name__ == "__main__":
+    main()
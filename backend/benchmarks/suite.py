@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks dos fluxos principais da API, sem rede e sem Supabase.
+
+A aplicação (main.app) roda no próprio processo, atendida por um
+httpx.AsyncClient com ASGITransport, e o Supabase é trocado pelo substituto
+em memória de benchmarks.supabase_local (PostgREST + Storage com latência
+configurável). O banco é populado com volumes realistas e cada fluxo é
+medido em cada nível de concorrência:
+
+    login, dashboard, listagem, busca, detalhe, tramitar, upload, download
+
+O resultado sai em JSON (latências p50/p95/p99, vazão, erros, round trips e
+tempo gasto pelo substituto por requisição), para comparar execuções:
+
+    python -m benchmarks.suite --saida antes.json
+    python -m benchmarks.suite --saida depois.json
+    python -m benchmarks.suite --comparar antes.json depois.json
+
+O login verifica bcrypt com o custo de Settings.bcrypt_rounds; por isso faz
+um décimo das requisições dos demais fluxos.
+
+Uso (a partir de backend/):
+    python -m benchmarks.suite [--processos 10000] [--latencia-ms 2]
+                               [--concorrencia 1,16] [--requisicoes 200]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Valores fictícios só para permitir importar app.* sem um .env
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from benchmarks.supabase_local import SupabaseLocal  # noqa: E402
+
+SENHA = "senha123"
+FLUXOS = ["login", "dashboard", "listagem", "busca", "detalhe", "tramitar", "upload", "download"]
+
+SETORES = [
+    ("Presidência", "PRES"), ("Secretaria Geral", "SEGE"), ("Diretoria Técnica", "DITEC"),
+    ("Departamento Jurídico", "DEJUR"), ("Departamento Financeiro", "DEFIN"),
+    ("Registro de Atletas", "REGAT"), ("Arbitragem", "ARBIT"), ("Competições", "COMP"),
+    ("Comunicação", "COMUN"), ("Seleções", "SELEC"), ("Ouvidoria", "OUVID"), ("Tecnologia", "TI"),
+]
+TIPOS = [
+    "Inscrição de Atleta", "Transferência", "Homologação de Contrato", "Recurso Disciplinar",
+    "Solicitação de Arbitragem", "Prestação de Contas", "Convocação", "Ofício",
+]
+ASSUNTOS = [
+    "inscrição de atleta", "transferência interestadual", "renovação de contrato",
+    "recurso contra punição", "pedido de arbitragem", "prestação de contas do convênio",
+    "convocação para seleção", "homologação de resultado", "registro de técnico",
+    "alteração de tabela", "licença de ginásio", "pedido de patrocínio",
+]
+COMPLEMENTOS = ["sub-15", "sub-17", "sub-19", "adulto", "feminino", "masculino", "NBB", "LBF"]
+INTERESSADOS = [
+    "Federação Paulista de Basketball", "Federação Mineira de Basketball", "Flamengo",
+    "Franca Basquete", "Minas Tênis Clube", "Sesi Araraquara", "Pinheiros", "Corinthians",
+    "Federação Gaúcha de Basketball", "Bauru Basket", "Unifacisa", "Brasília Basquete",
+]
+STATUS = ["aberto"] * 3 + ["em_tramite"] * 5 + ["concluido"] * 2 + ["arquivado"]
+PRIORIDADES = ["baixa", "normal", "normal", "normal", "alta", "urgente"]
+
+# ---------------------------------------------------------------------------
+# Carga de dados
+
+def popular(banco: SupabaseLocal, processos: int, usuarios: int, senha_hash: str, semente: int) -> None:
+    """Gera setores, tipos, usuários, processos, tramitações e documentos"""
+    aleatorio = random.Random(semente)
+    inicio = datetime(2022, 1, 3, 8, 0, 0)
+    intervalo = (datetime(2025, 12, 19, 18, 0, 0) - inicio) / max(processos, 1)
+
+    for nome, sigla in SETORES:
+        banco.tabela("setores").inserir({"nome": nome, "sigla": sigla, "criado_em": inicio.isoformat()})
+    for nome in TIPOS:
+        banco.tabela("tipos_processo").inserir({"nome": nome, "criado_em": inicio.isoformat()})
+
+    for i in range(1, usuarios + 1):
+        banco.tabela("usuarios").inserir({
+            "nome": f"Usuário {i:04d}",
+            "email": f"usuario{i}@cbb.com.br",
+            "senha_hash": senha_hash,
+            "setor_id": 1 + (i - 1) % len(SETORES),
+            "cargo": "Analista",
+            "criado_em": inicio.isoformat(),
+        })
+
+    for i in range(1, processos + 1):
+        autuacao = inicio + intervalo * i
+        setor_origem = aleatorio.randint(1, len(SETORES))
+        criador = aleatorio.randint(1, usuarios)
+        processo = banco.tabela("processos").inserir({
+            "numero_protocolo": f"{autuacao.year}.CBB.{i:06d}",
+            "ano": autuacao.year,
+            "tipo_processo_id": aleatorio.randint(1, len(TIPOS)),
+            "assunto": f"{aleatorio.choice(ASSUNTOS).capitalize()} {aleatorio.choice(COMPLEMENTOS)}",
+            "interessado": aleatorio.choice(INTERESSADOS),
+            "especificacao": f"Processo administrativo referente a {aleatorio.choice(ASSUNTOS)}",
+            "status": aleatorio.choice(STATUS),
+            "prioridade": aleatorio.choice(PRIORIDADES),
+            "setor_atual_id": setor_origem,
+            "prazo_dias": aleatorio.choice([None, 15, 30, 60]),
+            "data_autuacao": autuacao.isoformat(),
+            "criado_por": criador,
+            "criado_em": autuacao.isoformat(),
+            "atualizado_em": autuacao.isoformat(),
+            "bloqueado": aleatorio.random() < 0.01,
+        })
+
+        setor = setor_origem
+        for passo in range(aleatorio.randint(0, 6)):
+            destino = aleatorio.randint(1, len(SETORES))
+            envio = autuacao + timedelta(days=passo + 1)
+            banco.tabela("tramitacoes").inserir({
+                "processo_id": processo["id"],
+                "setor_origem_id": setor,
+                "setor_destino_id": destino,
+                "tipo_tramitacao": "despacho",
+                "data_envio": envio.isoformat(),
+                "enviado_por": criador,
+                "status_aprovacao": aleatorio.choice(["pendente", "aprovado"]),
+                "criado_em": envio.isoformat(),
+            })
+            setor = destino
+        banco.tabela("processos").atualizar(processo, {"setor_atual_id": setor, "atualizado_em": processo["atualizado_em"]})
+
+        for ordem in range(aleatorio.randint(0, 5)):
+            banco.tabela("documentos").inserir({
+                "processo_id": processo["id"],
+                "tipo_documento": aleatorio.choice(["gerado", "externo", "anexo"]),
+                "nome": f"Documento {ordem + 1}",
+                "arquivo_nome": f"documento_{processo['id']}_{ordem + 1}.pdf",
+                "arquivo_tamanho": aleatorio.randint(20_000, 2_000_000),
+                "arquivo_tipo": "application/pdf",
+                "ordem": ordem,
+                "requer_assinatura": aleatorio.random() < 0.2,
+                "criado_por": criador,
+                "criado_em": (autuacao + timedelta(hours=ordem)).isoformat(),
+                "atualizado_em": (autuacao + timedelta(hours=ordem)).isoformat(),
+            })
+
+# ---------------------------------------------------------------------------
+# Medição
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+async def medir(banco, cliente, requisicao, concorrencia, total):
+    """Dispara `total` requisições com `concorrencia` clientes simultâneos"""
+    latencias, erros = [], 0
+    pendentes = iter(range(total))
+
+    async def trabalhador():
+        nonlocal erros
+        for i in pendentes:
+            inicio = time.perf_counter()
+            resposta = await requisicao(cliente, i)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    round_trips, tempo_banco = banco.estatisticas()
+    inicio = time.perf_counter()
+    await asyncio.gather(*[trabalhador() for _ in range(concorrencia)])
+    duracao = time.perf_counter() - inicio
+    round_trips_fim, tempo_banco_fim = banco.estatisticas()
+
+    return {
+        "requisicoes": total,
+        "erros": erros,
+        "duracao_s": round(duracao, 4),
+        "vazao_rps": round(total / duracao, 2),
+        "latencia_ms": {
+            "media": round(statistics.mean(latencias), 3),
+            "p50": round(percentil(latencias, 50), 3),
+            "p95": round(percentil(latencias, 95), 3),
+            "p99": round(percentil(latencias, 99), 3),
+            "max": round(max(latencias), 3),
+        },
+        "round_trips_por_requisicao": round((round_trips_fim - round_trips) / total, 2),
+        "tempo_substituto_ms_por_requisicao": round((tempo_banco_fim - tempo_banco) * 1000 / total, 3),
+    }
+
+def montar_requisicoes(args, usuario, token, tramitaveis, documentos_enviados):
+    """Uma função (cliente, i) -> resposta por fluxo"""
+    aleatorio = random.Random(args.semente)
+    cabecalhos = {"Authorization": f"Bearer {token}"}
+    setor = usuario["setor_id"]
+    termos = ["transferência", "sub-17 Flamengo", "contrato", "arbitragem", "Franca"]
+    conteudo = os.urandom(args.upload_kb * 1024)
+
+    async def login(cliente, i):
+        return await cliente.post("/api/auth/login", json={"email": usuario["email"], "senha": SENHA})
+
+    async def dashboard(cliente, i):
+        return await cliente.get("/api/dashboard/stats", headers=cabecalhos)
+
+    async def listagem(cliente, i):
+        return await cliente.get(
+            "/api/processos",
+            params={"setor_atual_id": 1 + i % len(SETORES), "limit": 20, "contagem": "exata"},
+            headers=cabecalhos
+        )
+
+    async def busca(cliente, i):
+        return await cliente.get("/api/processos/busca", params={"q": termos[i % len(termos)]}, headers=cabecalhos)
+
+    async def detalhe(cliente, i):
+        processo_id = aleatorio.randint(1, args.processos)
+        return await cliente.get(f"/api/processos/{processo_id}/detalhe", headers=cabecalhos)
+
+    async def tramitar(cliente, i):
+        processo_id = aleatorio.choice(tramitaveis)
+        destino = 1 + (setor + i) % len(SETORES)
+        return await cliente.post(
+            f"/api/processos/{processo_id}/tramitar",
+            json={"setor_destino_id": destino, "observacao": "Para análise"},
+            headers=cabecalhos
+        )
+
+    async def upload(cliente, i):
+        # Conteúdo distinto a cada envio: todo upload grava um blob novo
+        arquivo = f"{time.perf_counter_ns()}-{i}".encode().ljust(32) + conteudo
+        resposta = await cliente.post(
+            "/api/documentos/upload",
+            data={"processo_id": str(1 + i % args.processos), "tipo_documento": "anexo"},
+            files={"arquivo": (f"anexo_{i}.pdf", arquivo, "application/pdf")},
+            headers=cabecalhos
+        )
+        if resposta.status_code == 200:
+            documentos_enviados.append(resposta.json()["id"])
+        return resposta
+
+    async def download(cliente, i):
+        documento_id = documentos_enviados[i % len(documentos_enviados)]
+        return await cliente.get(f"/api/documentos/{documento_id}/download", headers=cabecalhos)
+
+    return {
+        "login": login, "dashboard": dashboard, "listagem": listagem, "busca": busca,
+        "detalhe": detalhe, "tramitar": tramitar, "upload": upload, "download": download,
+    }
+
+async def executar_suite(args) -> dict:
+    diretorio = tempfile.mkdtemp(prefix="cbb_bench_")
+    os.environ["ARMAZENAMENTO_BACKEND"] = args.armazenamento
+    os.environ["ARMAZENAMENTO_DIR"] = diretorio
+
+    import httpx
+    from app import database
+    from app.utils.auth import create_access_token, pwd_context
+
+    # Todos os serviços pegam o cliente por get_supabase_admin() ao serem criados
+    banco = SupabaseLocal(latencia=args.latencia_ms / 1000)
+    database.supabase = banco
+    database.supabase_admin = banco
+
+    inicio = time.perf_counter()
+    popular(banco, args.processos, args.usuarios, pwd_context.hash(SENHA), args.semente)
+    tempo_carga = time.perf_counter() - inicio
+
+    import main
+    await main.referencia_service.carregar()
+
+    usuario = banco.tabela("usuarios").linhas[1]
+    token = create_access_token(data={"sub": str(usuario["id"]), "email": usuario["email"]})
+    tramitaveis = [p["id"] for p in banco.tabela("processos").linhas.values() if not p["bloqueado"]]
+    requisicoes = montar_requisicoes(args, usuario, token, tramitaveis, [])
+    fluxos = [f for f in FLUXOS if f in args.fluxos]
+
+    resultados = []
+    transporte = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        for fluxo in fluxos:
+            total = max(args.requisicoes // 10, 10) if fluxo == "login" else args.requisicoes
+            for concorrencia in args.concorrencia:
+                # Aquecimento fora da medição (caches, primeiro upload)
+                for i in range(3):
+                    await requisicoes[fluxo](cliente, i)
+                medicao = await medir(banco, cliente, requisicoes[fluxo], concorrencia, total)
+                resultados.append({"fluxo": fluxo, "concorrencia": concorrencia, **medicao})
+                print(
+                    f"{fluxo:<10} c={concorrencia:<3} p50={medicao['latencia_ms']['p50']:>8.2f} ms "
+                    f"p95={medicao['latencia_ms']['p95']:>8.2f} ms {medicao['vazao_rps']:>8.1f} req/s "
+                    f"erros={medicao['erros']}",
+                    file=sys.stderr
+                )
+
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {
+            "latencia_ms": args.latencia_ms,
+            "processos": args.processos,
+            "usuarios": args.usuarios,
+            "tramitacoes": len(banco.tabela("tramitacoes").linhas),
+            "documentos": len(banco.tabela("documentos").linhas),
+            "requisicoes": args.requisicoes,
+            "concorrencia": args.concorrencia,
+            "upload_kb": args.upload_kb,
+            "armazenamento": args.armazenamento,
+            "semente": args.semente,
+            "carga_s": round(tempo_carga, 2),
+        },
+        "resultados": resultados,
+    }
+
+# ---------------------------------------------------------------------------
+# Comparação de execuções
+
+def comparar(caminho_antes: str, caminho_depois: str) -> None:
+    with open(caminho_antes) as arquivo:
+        antes = {(r["fluxo"], r["concorrencia"]): r for r in json.load(arquivo)["resultados"]}
+    with open(caminho_depois) as arquivo:
+        depois = {(r["fluxo"], r["concorrencia"]): r for r in json.load(arquivo)["resultados"]}
+
+    print(f"{'fluxo':<10} {'conc':>4} | {'p50 antes':>9} {'depois':>8} {'Δ%':>6} | "
+          f"{'p95 antes':>9} {'depois':>8} {'Δ%':>6} | {'req/s antes':>11} {'depois':>8}")
+    print("-" * 100)
+    for chave in sorted(antes.keys() & depois.keys(), key=lambda c: (FLUXOS.index(c[0]), c[1])):
+        a, d = antes[chave], depois[chave]
+        linha = [f"{chave[0]:<10} {chave[1]:>4} |"]
+        for medida in ("p50", "p95"):
+            va, vd = a["latencia_ms"][medida], d["latencia_ms"][medida]
+            linha.append(f"{va:>9.2f} {vd:>8.2f} {(vd - va) / va * 100:>+6.1f} |")
+        linha.append(f"{a['vazao_rps']:>11.1f} {d['vazao_rps']:>8.1f}")
+        print(" ".join(linha))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--processos", type=int, default=10000)
+    parser.add_argument("--usuarios", type=int, default=150)
+    parser.add_argument("--latencia-ms", type=float, default=2.0, help="round trip simulado do PostgREST")
+    parser.add_argument("--concorrencia", type=lambda v: [int(c) for c in v.split(",")], default=[1, 16])
+    parser.add_argument("--requisicoes", type=int, default=200, help="por fluxo e nível de concorrência")
+    parser.add_argument("--fluxos", type=lambda v: v.split(","), default=FLUXOS)
+    parser.add_argument("--upload-kb", type=int, default=256)
+    parser.add_argument("--armazenamento", choices=["local", "supabase"], default="local")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: stdout)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"))
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    # Os prints da aplicação não podem se misturar ao JSON nem ao resumo
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = asyncio.run(executar_suite(args))
+
+    saida = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w") as arquivo:
+            arquivo.write(saida + "\n")
+    else:
+        print(saida)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,636 @@
+"""
+Substituto local do Supabase para os benchmarks (PostgREST e Storage em memória).
+
+Implementa o subconjunto do cliente supabase-py que a aplicação usa:
+table(...) com select/insert/update/delete, filtros (eq, neq, gt, gte, lt,
+lte, ilike, in_, is_, or_), embed de relações no select, order, limit,
+range, single e count; rpc(...) para as funções do schema usadas nos fluxos
+medidos; e storage.from_(bucket) com upload/remove/get_public_url.
+
+Cada chamada dorme `latencia` segundos (o round trip até o PostgREST) fora
+da trava, e os dados voltam copiados por JSON, como chegariam da API. O
+tempo que o próprio substituto gasta filtrando e ordenando fica em
+tempo_banco, para não ser confundido com o custo da aplicação.
+
+As RPCs repetem a semântica das do backend SQLite (app/database_sqlite.py);
+ao alterar qualquer um dos dois, rode python -m benchmarks.paridade_rpc.
+"""
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from postgrest.exceptions import APIError
+from app.database_sqlite import destacar
+
+# Colunas com índice de igualdade (o restante é filtrado varrendo a tabela)
+INDICES = {
+    "usuarios": ("id", "email"),
+    "processos": ("id", "numero_protocolo", "setor_atual_id", "criado_por"),
+    "tramitacoes": ("id", "processo_id"),
+    "documentos": ("id", "processo_id"),
+}
+
+# Embeds do select: (tabela, relação) -> (coluna na tabela, coluna na relação)
+RELACOES = {
+    ("processos", "tramitacoes"): ("id", "processo_id"),
+    ("processos", "documentos"): ("id", "processo_id"),
+}
+
+# Valores padrão das colunas (schema.sql); "agora" vira o timestamp do insert
+PADROES = {
+    "setores": {
+        "descricao": None, "email": None, "responsavel": None, "ativo": True, "criado_em": "agora",
+    },
+    "tipos_processo": {
+        "descricao": None, "cor": "#3B82F6", "ativo": True, "criado_em": "agora",
+    },
+    "usuarios": {
+        "setor_id": None, "cargo": None, "cpf": None, "telefone": None, "foto_url": None,
+        "ativo": True, "ultimo_acesso": None, "criado_em": "agora",
+    },
+    "processos": {
+        "interessado": None, "cpf_cnpj_interessado": None, "especificacao": None,
+        "status": "aberto", "nivel_acesso": "publico", "prioridade": "normal",
+        "setor_atual_id": None, "usuario_responsavel_id": None, "observacoes": None,
+        "data_autuacao": "agora", "data_conclusao": None, "prazo_dias": None, "data_prazo": None,
+        "criado_em": "agora", "atualizado_em": "agora",
+        "bloqueado": False, "motivo_bloqueio": None, "bloqueado_por": None, "bloqueado_em": None,
+    },
+    "tramitacoes": {
+        "observacao": None, "tipo_tramitacao": "normal", "data_envio": "agora",
+        "data_recebimento": None, "recebido_por": None, "status_aprovacao": "pendente",
+        "aprovado_por": None, "data_aprovacao": None, "motivo_rejeicao": None, "criado_em": "agora",
+    },
+    "documentos": {
+        "numero_documento": None, "descricao": None, "arquivo_url": None, "arquivo_nome": None,
+        "arquivo_tamanho": None, "arquivo_tipo": None, "arquivo_hash": None, "conteudo_html": None,
+        "data_documento": None, "numero_externo": None, "remetente": None, "ordem": 0,
+        "nivel_acesso": "publico", "status": "ativo", "motivo_cancelamento": None,
+        "cancelado_por": None, "cancelado_em": None, "requer_assinatura": False, "assinado": False,
+        "criado_em": "agora", "atualizado_em": "agora",
+    },
+    "aprovacoes": {"status": "pendente", "criado_em": "agora"},
+}
+
+def agora() -> str:
+    return datetime.now().isoformat()
+
+class Resposta:
+    """Mesmos atributos do APIResponse do postgrest-py usados pela aplicação"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+class Tabela:
+    """Linhas por id, com índices de igualdade nas colunas de INDICES"""
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.linhas: Dict[int, dict] = {}
+        self.indices = {coluna: defaultdict(set) for coluna in INDICES.get(self.nome, ("id",))}
+        self.proximo_id = 1
+
+    def inserir(self, valores: dict) -> dict:
+        linha = {"id": self.proximo_id}
+        for coluna, padrao in PADROES.get(self.nome, {}).items():
+            linha[coluna] = agora() if padrao == "agora" else padrao
+        linha.update({c: (agora() if v == "now()" else v) for c, v in valores.items()})
+        self.proximo_id = max(self.proximo_id, linha["id"]) + 1
+        self.linhas[linha["id"]] = linha
+        self._indexar(linha)
+        return linha
+
+    def atualizar(self, linha: dict, valores: dict) -> dict:
+        self._desindexar(linha)
+        linha.update({c: (agora() if v == "now()" else v) for c, v in valores.items()})
+        if "atualizado_em" in linha and "atualizado_em" not in valores:
+            linha["atualizado_em"] = agora()  # trigger atualizar_data_modificacao
+        self._indexar(linha)
+        return linha
+
+    def remover(self, linha: dict) -> None:
+        self._desindexar(linha)
+        del self.linhas[linha["id"]]
+
+    def por_coluna(self, coluna: str, valor: Any) -> List[dict]:
+        return [self.linhas[i] for i in self.indices[coluna].get(valor, ())]
+
+    def candidatas(self, filtros: list) -> List[dict]:
+        """Usa um índice quando há igualdade em coluna indexada"""
+        for filtro in filtros:
+            if filtro[1] == "eq" and filtro[0] in self.indices:
+                return self.por_coluna(filtro[0], filtro[2])
+            if filtro[1] == "in" and filtro[0] in self.indices:
+                return [linha for valor in set(filtro[2]) for linha in self.por_coluna(filtro[0], valor)]
+        return list(self.linhas.values())
+
+    def _indexar(self, linha: dict) -> None:
+        for coluna, indice in self.indices.items():
+            indice[linha.get(coluna)].add(linha["id"])
+
+    def _desindexar(self, linha: dict) -> None:
+        for coluna, indice in self.indices.items():
+            indice[linha.get(coluna)].discard(linha["id"])
+
+# ---------------------------------------------------------------------------
+# Filtros
+
+def _coagir(referencia: Any, valor: Any) -> Any:
+    """Converte o valor do filtro (às vezes texto, vindo do or=) para o tipo da coluna"""
+    if isinstance(valor, str):
+        if isinstance(referencia, bool):
+            return valor == "true"
+        if isinstance(referencia, int):
+            return int(valor)
+        if isinstance(referencia, float):
+            return float(valor)
+    return valor
+
+def _padrao_ilike(padrao: str) -> re.Pattern:
+    return re.compile("^" + ".*".join(re.escape(p) for p in padrao.split("%")) + "$", re.IGNORECASE | re.DOTALL)
+
+def _atende(linha: dict, filtro: tuple) -> bool:
+    if filtro[0] in ("and", "or"):
+        resultados = (_atende(linha, f) for f in filtro[1])
+        return all(resultados) if filtro[0] == "and" else any(resultados)
+
+    coluna, operador, valor = filtro
+    atual = linha.get(coluna)
+    if operador == "is":
+        return atual is valor
+    if atual is None:
+        return False
+    if operador == "in":
+        return atual in {_coagir(atual, v) for v in valor}
+    if operador == "ilike":
+        return bool(_padrao_ilike(valor).match(str(atual)))
+    valor = _coagir(atual, valor)
+    if operador == "eq":
+        return atual == valor
+    if operador == "neq":
+        return atual != valor
+    if operador == "gt":
+        return atual > valor
+    if operador == "gte":
+        return atual >= valor
+    if operador == "lt":
+        return atual < valor
+    if operador == "lte":
+        return atual <= valor
+    raise NotImplementedError(f"Operador {operador} não suportado pelo substituto local")
+
+def _dividir(texto: str) -> List[str]:
+    """Separa por vírgulas de nível zero (fora de parênteses e aspas)"""
+    partes, atual, nivel, aspas = [], [], 0, False
+    for caractere in texto:
+        if caractere == '"':
+            aspas = not aspas
+        elif not aspas and caractere == "(":
+            nivel += 1
+        elif not aspas and caractere == ")":
+            nivel -= 1
+        elif not aspas and caractere == "," and nivel == 0:
+            partes.append("".join(atual).strip())
+            atual = []
+            continue
+        atual.append(caractere)
+    if atual:
+        partes.append("".join(atual).strip())
+    return [p for p in partes if p]
+
+def _interpretar_logica(texto: str) -> List[tuple]:
+    """Converte a sintaxe do or=()/and() do PostgREST em filtros"""
+    filtros = []
+    for item in _dividir(texto):
+        if item.startswith(("and(", "or(")):
+            operador, corpo = item.split("(", 1)
+            filtros.append((operador, _interpretar_logica(corpo[:-1])))
+            continue
+        coluna, operador, valor = item.split(".", 2)
+        if operador == "in":
+            valor = [v.strip('"') for v in _dividir(valor[1:-1])]
+        elif operador == "is":
+            valor = {"null": None, "true": True, "false": False}[valor]
+        else:
+            valor = valor.strip('"')
+        filtros.append((coluna, operador, valor))
+    return filtros
+
+def _interpretar_select(texto: str) -> Tuple[List[str], List[Tuple[str, bool, List[str]]]]:
+    """Separa colunas e embeds (relacao(colunas) ou relacao!inner(colunas))"""
+    colunas, embeds = [], []
+    for item in _dividir(texto):
+        if "(" in item:
+            nome, corpo = item.split("(", 1)
+            interno = nome.endswith("!inner")
+            embeds.append((nome.split("!")[0], interno, _dividir(corpo[:-1])))
+        else:
+            colunas.append(item)
+    return colunas, embeds
+
+def _projetar(linha: dict, colunas: List[str]) -> dict:
+    if "*" in colunas:
+        return dict(linha)
+    return {coluna: linha.get(coluna) for coluna in colunas}
+
+def _ordenar(pares: List[Tuple[dict, dict]], ordem: List[Tuple[str, bool]]) -> None:
+    """Ordena pares (linha, resultado) pelas colunas da linha.
+
+    Ordenações estáveis da última chave para a primeira; nulos por último em
+    ASC e primeiro em DESC, como no Postgres.
+    """
+    for coluna, decrescente in reversed(ordem):
+        pares.sort(key=lambda par: (par[0].get(coluna) is None, par[0].get(coluna)), reverse=decrescente)
+
+# ---------------------------------------------------------------------------
+# Builders
+
+class ConsultaLocal:
+    """Imita o builder de table(...) do postgrest-py"""
+
+    def __init__(self, banco: "SupabaseLocal", tabela: str):
+        self.banco = banco
+        self.tabela = tabela
+        self.operacao = "select"
+        self.colunas = "*"
+        self.contagem = None
+        self.valores = None
+        self.filtros: list = []
+        self.ordem: List[Tuple[str, bool]] = []
+        self.limite: Optional[int] = None
+        self.deslocamento = 0
+        self.unica = False
+        self.talvez_unica = False
+
+    def select(self, *colunas, count=None):
+        self.colunas = ",".join(colunas) or "*"
+        self.contagem = count
+        return self
+
+    def insert(self, valores, **_):
+        self.operacao, self.valores = "insert", valores
+        return self
+
+    def update(self, valores, **_):
+        self.operacao, self.valores = "update", valores
+        return self
+
+    def delete(self, **_):
+        self.operacao = "delete"
+        return self
+
+    def _filtro(self, coluna, operador, valor):
+        self.filtros.append((coluna, operador, valor))
+        return self
+
+    def eq(self, coluna, valor):
+        return self._filtro(coluna, "eq", valor)
+
+    def neq(self, coluna, valor):
+        return self._filtro(coluna, "neq", valor)
+
+    def gt(self, coluna, valor):
+        return self._filtro(coluna, "gt", valor)
+
+    def gte(self, coluna, valor):
+        return self._filtro(coluna, "gte", valor)
+
+    def lt(self, coluna, valor):
+        return self._filtro(coluna, "lt", valor)
+
+    def lte(self, coluna, valor):
+        return self._filtro(coluna, "lte", valor)
+
+    def ilike(self, coluna, padrao):
+        return self._filtro(coluna, "ilike", padrao)
+
+    def in_(self, coluna, valores):
+        return self._filtro(coluna, "in", list(valores))
+
+    def is_(self, coluna, valor):
+        return self._filtro(coluna, "is", {"null": None, "true": True, "false": False}.get(valor, valor))
+
+    def or_(self, filtros, reference_table=None):
+        self.filtros.append(("or", _interpretar_logica(filtros)))
+        return self
+
+    def order(self, coluna, desc=False, nullsfirst=False, foreign_table=None):
+        self.ordem.append((coluna, desc))
+        return self
+
+    def limit(self, quantidade, foreign_table=None):
+        self.limite = quantidade
+        return self
+
+    def range(self, inicio, fim, foreign_table=None):
+        self.deslocamento, self.limite = inicio, fim - inicio + 1
+        return self
+
+    def single(self):
+        self.unica = True
+        return self
+
+    def maybe_single(self):
+        self.talvez_unica = True
+        return self
+
+    def execute(self):
+        return self.banco._executar(self._resolver)
+
+    # -- resolução (sob a trava do banco) --
+
+    def _selecionar(self, tabela: Tabela) -> Tuple[List[dict], Optional[int]]:
+        colunas, embeds = _interpretar_select(self.colunas)
+        # Filtros com "relacao.coluna" valem para o embed, não para a tabela
+        proprios, de_embed = [], defaultdict(list)
+        for filtro in self.filtros:
+            if filtro[0] not in ("and", "or") and "." in filtro[0]:
+                relacao, coluna = filtro[0].split(".", 1)
+                de_embed[relacao].append((coluna, filtro[1], filtro[2]))
+            else:
+                proprios.append(filtro)
+
+        linhas = []
+        for linha in tabela.candidatas(proprios):
+            if not all(_atende(linha, f) for f in proprios):
+                continue
+            resultado = _projetar(linha, colunas)
+            descartar = False
+            for relacao, interno, colunas_relacao in embeds:
+                coluna_local, coluna_remota = RELACOES[(self.tabela, relacao)]
+                filhos = [
+                    _projetar(filho, colunas_relacao)
+                    for filho in self.banco.tabela(relacao).por_coluna(coluna_remota, linha[coluna_local])
+                    if all(_atende(filho, f) for f in de_embed[relacao])
+                ]
+                if interno and not filhos:
+                    descartar = True
+                    break
+                resultado[relacao] = filhos
+            if not descartar:
+                linhas.append((linha, resultado))
+
+        total = len(linhas) if self.contagem else None
+        _ordenar(linhas, self.ordem)
+        fim = None if self.limite is None else self.deslocamento + self.limite
+        return [resultado for _, resultado in linhas[self.deslocamento:fim]], total
+
+    def _resolver(self):
+        tabela = self.banco.tabela(self.tabela)
+
+        if self.operacao == "insert":
+            valores = self.valores if isinstance(self.valores, list) else [self.valores]
+            dados = [dict(self.banco._antes_de_inserir(self.tabela, v)) for v in valores]
+            return [dict(tabela.inserir(v)) for v in dados], None
+
+        if self.operacao in ("update", "delete"):
+            alvos = [l for l in tabela.candidatas(self.filtros) if all(_atende(l, f) for f in self.filtros)]
+            if self.operacao == "delete":
+                for linha in alvos:
+                    tabela.remover(linha)
+                return [dict(l) for l in alvos], None
+            return [dict(tabela.atualizar(l, self.valores)) for l in alvos], None
+
+        dados, total = self._selecionar(tabela)
+        if self.unica or self.talvez_unica:
+            if len(dados) != 1:
+                if self.talvez_unica and not dados:
+                    return None, total
+                raise APIError({
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "code": "PGRST116",
+                    "hint": None,
+                    "details": f"The result contains {len(dados)} rows"
+                })
+            return dados[0], total
+        return dados, total
+
+class ChamadaLocal:
+    """Imita o builder de rpc(...)"""
+
+    def __init__(self, banco: "SupabaseLocal", nome: str, funcao: Callable[[dict], Any], parametros: dict):
+        self.banco = banco
+        self.nome = nome
+        self.funcao = funcao
+        self.parametros = parametros or {}
+
+    def execute(self):
+        return self.banco._executar(lambda: (self.funcao(self.parametros), None))
+
+class BucketLocal:
+    def __init__(self, storage: "StorageLocal", nome: str):
+        self.storage = storage
+        self.nome = nome
+
+    def upload(self, caminho: str, arquivo, opcoes: Optional[dict] = None):
+        time.sleep(self.storage.banco.latencia)
+        conteudo = arquivo.read() if hasattr(arquivo, "read") else arquivo
+        with self.storage.banco.trava:
+            self.storage.objetos[(self.nome, caminho)] = conteudo
+        return {"Key": f"{self.nome}/{caminho}"}
+
+    def remove(self, caminhos: List[str]):
+        time.sleep(self.storage.banco.latencia)
+        with self.storage.banco.trava:
+            for caminho in caminhos:
+                self.storage.objetos.pop((self.nome, caminho), None)
+        return []
+
+    def get_public_url(self, caminho: str) -> str:
+        return f"{self.storage.banco.url}/storage/v1/object/public/{self.nome}/{caminho}"
+
+class StorageLocal:
+    """Supabase Storage em memória (bytes por bucket/caminho)"""
+
+    def __init__(self, banco: "SupabaseLocal"):
+        self.banco = banco
+        self.objetos: Dict[Tuple[str, str], bytes] = {}
+
+    def from_(self, bucket: str) -> BucketLocal:
+        return BucketLocal(self, bucket)
+
+# ---------------------------------------------------------------------------
+
+class SupabaseLocal:
+    """Cliente no lugar de supabase.Client, com latência de rede configurável"""
+
+    def __init__(self, latencia: float = 0.0, url: str = "http://supabase.local"):
+        self.latencia = latencia
+        self.url = url
+        self.trava = threading.Lock()
+        self.tabelas: Dict[str, Tabela] = {}
+        self.blobs: Dict[str, dict] = {}
+        self.sequencias: Dict[int, int] = {}
+        self.storage = StorageLocal(self)
+        self.round_trips = 0
+        self.tempo_banco = 0.0
+        self.rpcs = {
+            "dashboard_stats": self._dashboard_stats,
+            "buscar_processos": self._buscar_processos,
+            "tramitar_processo": self._tramitar_processo,
+            "referenciar_blob": self._referenciar_blob,
+            "reservar_blob": self._reservar_blob,
+            "liberar_blob": self._liberar_blob,
+            "reservar_protocolos": self._reservar_protocolos,
+        }
+
+    def tabela(self, nome: str) -> Tabela:
+        if nome not in self.tabelas:
+            self.tabelas[nome] = Tabela(nome)
+        return self.tabelas[nome]
+
+    def table(self, nome: str) -> ConsultaLocal:
+        return ConsultaLocal(self, nome)
+
+    def rpc(self, nome: str, parametros: Optional[dict] = None) -> ChamadaLocal:
+        if nome not in self.rpcs:
+            raise NotImplementedError(f"RPC {nome} não implementada no substituto local")
+        return ChamadaLocal(self, nome, self.rpcs[nome], parametros)
+
+    def estatisticas(self) -> Tuple[int, float]:
+        """(round trips, segundos gastos pelo substituto) desde a criação"""
+        with self.trava:
+            return self.round_trips, self.tempo_banco
+
+    def _executar(self, resolver: Callable[[], Tuple[Any, Optional[int]]]) -> Resposta:
+        time.sleep(self.latencia)
+        with self.trava:
+            inicio = time.perf_counter()
+            try:
+                dados, total = resolver()
+                # Cópia pelo caminho que os dados fariam (JSON da API)
+                dados = json.loads(json.dumps(dados, default=str))
+            finally:
+                self.round_trips += 1
+                self.tempo_banco += time.perf_counter() - inicio
+        return Resposta(dados, total)
+
+    def _antes_de_inserir(self, tabela: str, valores: dict) -> dict:
+        # Trigger gerar_numero_protocolo
+        if tabela == "processos" and not valores.get("numero_protocolo"):
+            from app.services.protocolo_service import formatar_protocolo
+            ano = datetime.now().year
+            sequencial = self._reservar_protocolos({"p_ano": ano, "p_quantidade": 1})
+            valores = {**valores, "numero_protocolo": formatar_protocolo(ano, sequencial), "ano": ano}
+        return valores
+
+    # -- funções do schema (mesma semântica do SQL) --
+
+    def _reservar_protocolos(self, p: dict) -> int:
+        quantidade = p.get("p_quantidade", 1)
+        ultimo = self.sequencias.get(p["p_ano"], 0) + quantidade
+        self.sequencias[p["p_ano"]] = ultimo
+        return ultimo - quantidade + 1
+
+    def _dashboard_stats(self, p: dict) -> List[dict]:
+        processos = self.tabela("processos").linhas.values()
+        setor_id = p.get("p_setor_id")
+        contagem = defaultdict(int)
+        for processo in processos:
+            contagem[processo["status"]] += 1
+        no_setor = self.tabela("processos").por_coluna("setor_atual_id", setor_id)
+        pendentes_assinatura = sum(
+            1
+            for processo in no_setor
+            for documento in self.tabela("documentos").por_coluna("processo_id", processo["id"])
+            if documento["requer_assinatura"] and not documento["assinado"] and documento["status"] == "ativo"
+        )
+        pendentes_aprovacao = sum(
+            1 for a in self.tabela("aprovacoes").linhas.values()
+            if a.get("aprovador_id") == p["p_usuario_id"] and a.get("status") == "pendente"
+        )
+        return [{
+            "total_processos": len(processos),
+            "processos_abertos": contagem["aberto"],
+            "processos_em_tramite": contagem["em_tramite"],
+            "processos_concluidos": contagem["concluido"],
+            "meus_processos": len(self.tabela("processos").por_coluna("criado_por", p["p_usuario_id"])),
+            "processos_meu_setor": len(no_setor),
+            "pendentes_aprovacao": pendentes_aprovacao,
+            "pendentes_assinatura": pendentes_assinatura,
+        }]
+
+    def _buscar_processos(self, p: dict) -> List[dict]:
+        # Aproximação da busca textual (a mesma do backend SQLite): relevância =
+        # palavras do termo encontradas
+        palavras = [w for w in p["p_termo"].lower().split() if w][:10]
+        if not palavras:
+            return []
+        marcar = re.compile("|".join(re.escape(w) for w in palavras), re.IGNORECASE)
+        encontrados = []
+        for processo in self.tabela("processos").linhas.values():
+            texto = " ".join(filter(None, (
+                processo["numero_protocolo"], processo["assunto"],
+                processo["interessado"], processo["especificacao"]
+            ))).lower()
+            relevancia = sum(w in texto for w in palavras)
+            if relevancia:
+                encontrados.append((relevancia, processo))
+
+        encontrados.sort(key=lambda e: (e[0], e[1]["id"]), reverse=True)
+        inicio = p.get("p_offset", 0)
+        pagina = encontrados[inicio:inicio + p.get("p_limite", 20)]
+        colunas = (
+            "id", "numero_protocolo", "assunto", "interessado", "status", "prioridade",
+            "tipo_processo_id", "setor_atual_id", "data_autuacao"
+        )
+        return [
+            {
+                **{c: processo[c] for c in colunas},
+                "relevancia": float(relevancia),
+                "destaque_assunto": destacar(marcar, processo["assunto"]),
+                "destaque_interessado": destacar(marcar, processo["interessado"]),
+            }
+            for relevancia, processo in pagina
+        ]
+
+    def _tramitar_processo(self, p: dict) -> dict:
+        processos = self.tabela("processos")
+        processo = processos.linhas.get(p["p_processo_id"])
+        if processo is None:
+            return {"erro": "processo_nao_encontrado"}
+        if processo["bloqueado"]:
+            return {"erro": "processo_bloqueado"}
+
+        tramitacao = self.tabela("tramitacoes").inserir({
+            "processo_id": p["p_processo_id"],
+            "setor_origem_id": p["p_setor_origem_id"],
+            "setor_destino_id": p["p_setor_destino_id"],
+            "observacao": p.get("p_observacao"),
+            "tipo_tramitacao": p.get("p_tipo_tramitacao") or "despacho",
+            "enviado_por": p["p_usuario_id"],
+        })
+        processos.atualizar(processo, {"setor_atual_id": p["p_setor_destino_id"], "status": "em_tramite"})
+        return {"tramitacao": dict(tramitacao), "processo": dict(processo)}
+
+    def _referenciar_blob(self, p: dict) -> List[dict]:
+        blob = self.blobs.get(p["p_hash"])
+        if blob is None:
+            return []
+        blob["referencias"] += 1
+        return [{"caminho": blob["caminho"], "url": blob["url"]}]
+
+    def _reservar_blob(self, p: dict) -> List[dict]:
+        blob = self.blobs.get(p["p_hash"])
+        novo = blob is None
+        if novo:
+            blob = self.blobs[p["p_hash"]] = {
+                "caminho": p["p_caminho"], "url": p["p_url"], "tamanho": p["p_tamanho"],
+                "tipo": p.get("p_tipo"), "referencias": 0,
+            }
+        blob["referencias"] += 1
+        return [{"caminho": blob["caminho"], "url": blob["url"], "novo": novo}]
+
+    def _liberar_blob(self, p: dict) -> Optional[str]:
+        blob = self.blobs.get(p["p_hash"])
+        if blob is None or blob["url"] != p["p_url"]:
+            return None
+        blob["referencias"] -= 1
+        if blob["referencias"] <= 0:
+            del self.blobs[p["p_hash"]]
+            return blob["caminho"]
+        return None
@@ -1,20 +1,42 @@
-from fastapi import FastAPI, Body, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request, Response, status, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, StreamingResponse
 from typing import List, Optional
+import json
+import logging
 from app.models import *
-from app.utils.auth import get_current_user, get_current_active_user
+from app.utils.auth import get_current_user, get_current_active_user, get_current_admin_user, cache_usuarios, invalidar_usuario_cache
 from app.services.auth_service import AuthService
 from app.services.processo_service import ProcessoService
 from app.services.documento_service import DocumentoService
-from app.database import get_supabase_admin
+from app.services.referencia_service import ReferenciaService
+from app.database import get_supabase_admin, executar
+from app.utils.paginacao import paginar, definir_cabecalhos_paginacao
+from app.utils.http_cache import etag_corresponde, cabecalhos_cache, nao_modificado
+from app.utils.upload import LimiteUploadMiddleware
+from app.utils.download import resposta_arquivo
+from app.utils.importacao import ler_importacao
+from app.utils.serializacao import resposta_lista, transmitir_lista
+from app.utils.metricas import MetricasMiddleware, metricas
+from app.utils.rastreamento import RastreamentoConsultasMiddleware, orcamento_consultas
+from app.config import get_settings
+from app.utils.logs import IdRequisicaoMiddleware, configurar_logs
+
+# Logs JSON via fila (os módulos de app.* só logam a partir daqui)
+configurar_logs()
+logger = logging.getLogger(__name__)
 
 # Criar app FastAPI
 app = FastAPI(
     title="Sistema de Gestão de Processos - CBB",
     description="API para gestão de processos eletrônicos da Confederação Brasileira de Basketball",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Limite de tamanho do corpo (uploads), aplicado enquanto o corpo é recebido
+app.add_middleware(LimiteUploadMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,13 +44,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Content-Range", "Accept-Ranges", "Content-Disposition", "X-Consultas-Banco", "X-Request-ID"],
 )
 
+# Detector de N+1 e de requisições com round trips demais (desligado em produção)
+if get_settings().rastreamento_consultas:
+    app.add_middleware(RastreamentoConsultasMiddleware)
+
+# Latência por rota e chamadas ao banco (GET /metrics)
+app.add_middleware(MetricasMiddleware)
+
+# X-Request-ID nos logs e na resposta; mais externo, cobre os demais
+app.add_middleware(IdRequisicaoMiddleware)
+
 # Instanciar serviços
 auth_service = AuthService()
-processo_service = ProcessoService()
+referencia_service = ReferenciaService()
+processo_service = ProcessoService(referencia_service)
 documento_service = DocumentoService()
 
+@app.on_event("startup")
+async def carregar_referencias():
+    """Pré-carrega setores e tipos de processo no cache"""
+    try:
+        await referencia_service.carregar()
+    except Exception as e:
+        # Sem o banco no startup o cache é carregado na primeira requisição
+        logger.warning("Falha ao pré-carregar referências: %s", e)
+
 # ==================== ROTAS DE AUTENTICAÇÃO ====================
 
 @app.post("/api/auth/login", response_model=Token, tags=["Autenticação"])
@@ -56,74 +99,158 @@ async def criar_processo(
     """Cria um novo processo"""
     return await processo_service.criar_processo(processo, current_user.id)
 
-@app.get("/api/processos/{processo_id}", response_model=ProcessoResponse, tags=["Processos"])
-async def buscar_processo(
-    processo_id: int,
+@app.post("/api/processos/importar", tags=["Processos"])
+async def importar_processos(
+    request: Request,
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
-    """Busca processo por ID"""
-    return await processo_service.buscar_processo(processo_id)
+    """Importa processos em lote (corpo text/csv ou array application/json).
 
-@app.get("/api/processos/protocolo/{numero_protocolo}", response_model=ProcessoResponse, tags=["Processos"])
-async def buscar_por_protocolo(
-    numero_protocolo: str,
-    current_user: UsuarioResponse = Depends(get_current_active_user)
-):
-    """Busca processo por número de protocolo"""
-    return await processo_service.buscar_por_protocolo(numero_protocolo)
+    Responde em NDJSON: uma linha por registro com o protocolo gerado ou os
+    erros de validação, e uma linha final com o resumo.
+    """
+    linhas = ler_importacao(await request.body(), request.headers.get("content-type"))
 
-@app.get("/api/processos", response_model=List[ProcessoResponse], tags=["Processos"])
-async def listar_processos(
+    async def resultados():
+        async for resultado in processo_service.importar_processos(linhas, current_user.id):
+            yield json.dumps(resultado, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(resultados(), media_type="application/x-ndjson")
+
+@app.get("/api/processos/resumo", response_model=List[ProcessoResumoResponse], tags=["Processos"])
+async def listar_processos_resumo(
+    response: Response,
     numero_protocolo: Optional[str] = None,
     assunto: Optional[str] = None,
     interessado: Optional[str] = None,
     tipo_processo_id: Optional[int] = None,
     status: Optional[StatusProcesso] = None,
+    prioridade: Optional[Prioridade] = None,
     setor_atual_id: Optional[int] = None,
-    limit: int = 20,
-    offset: int = 0,
+    criado_por: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    contagem: Optional[str] = Query(None, description="exata ou estimada"),
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
-    """Lista processos com filtros"""
+    """Listagem com nomes de tipo/setor/criador e totais de documentos e tramitações"""
     filtros = ProcessoFiltros(
         numero_protocolo=numero_protocolo,
         assunto=assunto,
         interessado=interessado,
         tipo_processo_id=tipo_processo_id,
         status=status,
-        setor_atual_id=setor_atual_id
+        prioridade=prioridade,
+        setor_atual_id=setor_atual_id,
+        criado_por=criado_por
     )
-    processos, total = await processo_service.listar_processos(filtros, limit=limit, offset=offset)
-    return processos
+    processos, proximo_cursor, total = await processo_service.listar_resumo(
+        filtros, limit=limit, cursor=cursor, contagem=contagem
+    )
+    definir_cabecalhos_paginacao(response, proximo_cursor, total)
+    return resposta_lista(processos, response)
+
+@app.get("/api/processos/busca", response_model=List[ProcessoBuscaResponse], tags=["Processos"])
+async def buscar_processos_texto(
+    q: str = Query(..., min_length=2, description="Termo de busca (protocolo, assunto, interessado)"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=500),
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Busca processos por relevância, com trechos destacados"""
+    return resposta_lista(await processo_service.buscar_texto(q, limit=limit, offset=offset))
 
+# Rotas com caminho fixo antes de /api/processos/{processo_id}, que as capturaria
 @app.get("/api/processos/meus", response_model=List[ProcessoResponse], tags=["Processos"])
 async def listar_meus_processos(
-    limit: int = 20,
-    offset: int = 0,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    contagem: Optional[str] = Query(None, description="exata ou estimada"),
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     """Lista processos criados pelo usuário atual"""
-    processos, total = await processo_service.listar_processos(
+    processos, proximo_cursor, total = await processo_service.listar_processos(
         usuario_id=current_user.id,
         limit=limit,
-        offset=offset
+        cursor=cursor,
+        contagem=contagem
     )
-    return processos
+    definir_cabecalhos_paginacao(response, proximo_cursor, total)
+    return resposta_lista(processos, response)
 
 @app.get("/api/processos/setor/{setor_id}", response_model=List[ProcessoResponse], tags=["Processos"])
 async def listar_processos_setor(
     setor_id: int,
-    limit: int = 20,
-    offset: int = 0,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    contagem: Optional[str] = Query(None, description="exata ou estimada"),
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     """Lista processos de um setor"""
-    processos, total = await processo_service.listar_processos(
+    processos, proximo_cursor, total = await processo_service.listar_processos(
         setor_id=setor_id,
         limit=limit,
-        offset=offset
+        cursor=cursor,
+        contagem=contagem
     )
-    return processos
+    definir_cabecalhos_paginacao(response, proximo_cursor, total)
+    return resposta_lista(processos, response)
+
+@app.get("/api/processos/{processo_id}", response_model=ProcessoResponse, tags=["Processos"])
+async def buscar_processo(
+    processo_id: int,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Busca processo por ID"""
+    return await processo_service.buscar_processo(processo_id)
+
+@app.get("/api/processos/{processo_id}/detalhe", response_model=ProcessoDetalheResponse, tags=["Processos"])
+async def detalhar_processo(
+    processo_id: int,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Tudo que a tela do processo exibe em uma requisição: processo, tramitações,
+    documentos ativos e os usuários/setores citados"""
+    return await processo_service.detalhar_processo(processo_id)
+
+@app.get("/api/processos/protocolo/{numero_protocolo}", response_model=ProcessoResponse, tags=["Processos"])
+async def buscar_por_protocolo(
+    numero_protocolo: str,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Busca processo por número de protocolo"""
+    return await processo_service.buscar_por_protocolo(numero_protocolo)
+
+@app.get("/api/processos", response_model=List[ProcessoResponse], tags=["Processos"])
+async def listar_processos(
+    response: Response,
+    numero_protocolo: Optional[str] = None,
+    assunto: Optional[str] = None,
+    interessado: Optional[str] = None,
+    tipo_processo_id: Optional[int] = None,
+    status: Optional[StatusProcesso] = None,
+    setor_atual_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    contagem: Optional[str] = Query(None, description="exata ou estimada"),
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Lista processos com filtros (cursor da próxima página em X-Next-Cursor)"""
+    filtros = ProcessoFiltros(
+        numero_protocolo=numero_protocolo,
+        assunto=assunto,
+        interessado=interessado,
+        tipo_processo_id=tipo_processo_id,
+        status=status,
+        setor_atual_id=setor_atual_id
+    )
+    processos, proximo_cursor, total = await processo_service.listar_processos(
+        filtros, limit=limit, cursor=cursor, contagem=contagem
+    )
+    definir_cabecalhos_paginacao(response, proximo_cursor, total)
+    return resposta_lista(processos, response)
 
 @app.put("/api/processos/{processo_id}", response_model=ProcessoResponse, tags=["Processos"])
 async def atualizar_processo(
@@ -134,7 +261,7 @@ async def atualizar_processo(
     """Atualiza processo"""
     return await processo_service.atualizar_processo(processo_id, processo, current_user.id)
 
-@app.post("/api/processos/{processo_id}/tramitar", response_model=TramitacaoResponse, tags=["Processos"])
+@app.post("/api/processos/{processo_id}/tramitar", response_model=TramitacaoComProcesso, tags=["Processos"])
 async def tramitar_processo(
     processo_id: int,
     setor_destino_id: int = Body(...),
@@ -155,13 +282,23 @@ async def tramitar_processo(
     
     return await processo_service.tramitar_processo(tramitacao_data, current_user.id)
 
+@app.post("/api/processos/tramitar-lote", response_model=List[TramitacaoLoteItem], tags=["Processos"])
+async def tramitar_lote(
+    lote: TramitacaoLote,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Tramita vários processos para um setor; retorna o resultado de cada um"""
+    # Valida o destino pelo cache de referências (404 sem ir ao banco)
+    await referencia_service.buscar_setor(lote.setor_destino_id)
+    return await processo_service.tramitar_lote(lote, current_user.setor_id, current_user.id)
+
 @app.get("/api/processos/{processo_id}/tramitacoes", response_model=List[TramitacaoResponse], tags=["Processos"])
 async def listar_tramitacoes(
     processo_id: int,
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     """Lista histórico de tramitações de um processo"""
-    return await processo_service.listar_tramitacoes(processo_id)
+    return transmitir_lista(await processo_service.listar_tramitacoes(processo_id))
 
 @app.post("/api/processos/{processo_id}/concluir", response_model=ProcessoResponse, tags=["Processos"])
 async def concluir_processo(
@@ -233,6 +370,16 @@ async def buscar_documento(
     """Busca documento por ID"""
     return await documento_service.buscar_documento(documento_id)
 
+@app.put("/api/processos/{processo_id}/documentos/ordem", tags=["Documentos"])
+async def reordenar_documentos(
+    processo_id: int,
+    ordem: DocumentoOrdem,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Aplica a nova ordem da árvore de documentos do processo"""
+    await documento_service.reordenar_documentos(processo_id, ordem.ids)
+    return {"message": "Documentos reordenados com sucesso"}
+
 # Endpoint antigo comentado - conflitava com o novo
 # @app.get("/api/processos/{processo_id}/documentos")
 # async def listar_documentos_old(...):
@@ -267,37 +414,94 @@ async def get_dashboard_stats(
 
 # ==================== ROTAS DE SETORES ====================
 
+# Dados de referência mudam raramente: servidos do cache em memória, com
+# ETag para que o navegador revalide com If-None-Match e receba 304
+CACHE_CONTROL_REFERENCIAS = "private, max-age=60, must-revalidate"
+
 @app.get("/api/setores", response_model=List[SetorResponse], tags=["Setores"])
 async def listar_setores(
+    request: Request,
+    response: Response,
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     """Lista todos os setores ativos"""
-    supabase = get_supabase_admin()
-    result = supabase.table("setores").select("*").eq("ativo", True).order("nome").execute()
-    return [SetorResponse(**s) for s in result.data]
+    etag = await referencia_service.etag("setores")
+    if etag_corresponde(request, etag):
+        return nao_modificado(etag, CACHE_CONTROL_REFERENCIAS)
+    response.headers.update(cabecalhos_cache(etag, CACHE_CONTROL_REFERENCIAS))
+    return await referencia_service.listar_setores()
+
+@app.post("/api/setores", response_model=SetorResponse, tags=["Setores"])
+async def criar_setor(
+    setor: SetorCreate,
+    current_user: UsuarioResponse = Depends(get_current_admin_user)
+):
+    """Cria setor (administradores; invalida o cache de referências)"""
+    return await referencia_service.criar_setor(setor)
 
 @app.get("/api/setores/{setor_id}", response_model=SetorResponse, tags=["Setores"])
 async def buscar_setor(
     setor_id: int,
+    request: Request,
+    response: Response,
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     """Busca setor por ID"""
-    supabase = get_supabase_admin()
-    result = supabase.table("setores").select("*").eq("id", setor_id).single().execute()
-    if not result.data:
-        raise HTTPException(status_code=404, detail="Setor não encontrado")
-    return SetorResponse(**result.data)
+    # 404 antes do ETag: um setor inexistente não pode responder 304
+    setor = await referencia_service.buscar_setor(setor_id)
+    etag = await referencia_service.etag(f"setor-{setor_id}")
+    if etag_corresponde(request, etag):
+        return nao_modificado(etag, CACHE_CONTROL_REFERENCIAS)
+    response.headers.update(cabecalhos_cache(etag, CACHE_CONTROL_REFERENCIAS))
+    return setor
 
 # ==================== ROTAS DE TIPOS DE PROCESSO ====================
 
 @app.get("/api/tipos-processo", response_model=List[TipoProcessoResponse], tags=["Tipos de Processo"])
 async def listar_tipos_processo(
+    request: Request,
+    response: Response,
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     """Lista todos os tipos de processo ativos"""
-    supabase = get_supabase_admin()
-    result = supabase.table("tipos_processo").select("*").eq("ativo", True).order("nome").execute()
-    return [TipoProcessoResponse(**tp) for tp in result.data]
+    etag = await referencia_service.etag("tipos-processo")
+    if etag_corresponde(request, etag):
+        return nao_modificado(etag, CACHE_CONTROL_REFERENCIAS)
+    response.headers.update(cabecalhos_cache(etag, CACHE_CONTROL_REFERENCIAS))
+    return await referencia_service.listar_tipos_processo()
+
+@app.post("/api/tipos-processo", response_model=TipoProcessoResponse, tags=["Tipos de Processo"])
+async def criar_tipo_processo(
+    tipo: TipoProcessoCreate,
+    current_user: UsuarioResponse = Depends(get_current_admin_user)
+):
+    """Cria tipo de processo (administradores; invalida o cache de referências)"""
+    return await referencia_service.criar_tipo_processo(tipo)
+
+@app.post("/api/referencias/recarregar", tags=["Setores"])
+async def recarregar_referencias(
+    current_user: UsuarioResponse = Depends(get_current_admin_user)
+):
+    """Recarrega setores e tipos de processo após alteração direta no banco (administradores)"""
+    await referencia_service.carregar()
+    return referencia_service.estatisticas()
+
+# ==================== ROTAS DE MONITORAMENTO ====================
+
+@app.get("/api/monitoramento/cache", tags=["Monitoramento"])
+async def estatisticas_cache(
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Retorna contadores de hit/miss dos caches em memória"""
+    return {
+        "usuarios": cache_usuarios.estatisticas(),
+        "referencias": referencia_service.estatisticas()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def exportar_metricas():
+    """Métricas no formato de exposição do Prometheus"""
+    return PlainTextResponse(metricas.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # ==================== ROTA DE HEALTH CHECK ====================
 
@@ -333,11 +537,35 @@ async def buscar_usuario_por_id(
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     supabase = get_supabase_admin()
-    result = supabase.table("usuarios").select("*").eq("id", usuario_id).execute()
+    result = await executar(supabase.table("usuarios").select("*").eq("id", usuario_id))
     if not result.data:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return result.data[0]
 
+@app.put("/api/usuarios/{usuario_id}", response_model=UsuarioResponse, tags=["Usuários"])
+async def atualizar_usuario(
+    usuario_id: int,
+    usuario: UsuarioUpdate,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Atualiza os dados do próprio usuário (invalida o cache de autenticação)"""
+    return await auth_service.atualizar_usuario(usuario_id, usuario, current_user.id)
+
+@app.put("/api/usuarios/{usuario_id}/acesso", response_model=UsuarioResponse, tags=["Usuários"])
+async def atualizar_acesso_usuario(usuario_id: int, acesso: UsuarioAcessoUpdate, current_user: UsuarioResponse = Depends(get_current_admin_user)):
+    """Ativa/desativa o usuário ou troca o setor (administradores; invalida o cache de autenticação)"""
+    return await auth_service.atualizar_acesso(usuario_id, acesso)
+
+@app.delete("/api/usuarios/{usuario_id}/cache", tags=["Usuários"])
+async def invalidar_cache_usuario(usuario_id: int, current_user: UsuarioResponse = Depends(get_current_admin_user)):
+    """Descarta o usuário do cache de autenticação após alteração direta no banco (administradores).
+
+    Vale para o worker que atende a requisição; os demais enxergam a mudança
+    ao fim de usuario_cache_ttl.
+    """
+    invalidar_usuario_cache(usuario_id)
+    return {"message": "Cache do usuário invalidado"}
+
 @app.post("/api/processos/{processo_id}/documentos", tags=["Documentos"])
 async def upload_documento(
     processo_id: int,
@@ -347,26 +575,29 @@ async def upload_documento(
     descricao: str = Form(None),
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
-    import os
     supabase = get_supabase_admin()
-    upload_dir = f"/tmp/cbb_documentos/{processo_id}"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = f"{upload_dir}/{arquivo.filename}"
-    content = await arquivo.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    # Armazenamento por conteúdo: uploads repetidos não gravam o arquivo de novo
+    blob = await documento_service.armazenamento.salvar(arquivo)
     doc_data = {
         "processo_id": processo_id,
         "nome": nome,
         "tipo_documento": tipo_documento,
         "descricao": descricao,
-        "arquivo_url": file_path,
+        "arquivo_url": blob.url,
         "arquivo_nome": arquivo.filename,
-        "arquivo_tamanho": len(content),
+        "arquivo_tamanho": blob.tamanho,
         "arquivo_tipo": arquivo.content_type,
+        "arquivo_hash": blob.hash,
         "criado_por": current_user.id
     }
-    result = supabase.table("documentos").insert(doc_data).execute()
+    try:
+        result = await executar(supabase.table("documentos").insert(doc_data))
+    except Exception:
+        await documento_service.armazenamento.liberar(blob.hash, blob.url)
+        raise
+    if not result.data:
+        await documento_service.armazenamento.liberar(blob.hash, blob.url)
+        raise HTTPException(status_code=500, detail="Erro ao criar registro do documento")
     return {"message": "Sucesso", "documento": result.data[0]}
 
 @app.get("/api/processos/{processo_id}/documentos", tags=["Documentos"])
@@ -375,28 +606,40 @@ async def listar_documentos_processo(
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
     supabase = get_supabase_admin()
-    result = supabase.table("documentos").select("*").eq("processo_id", processo_id).order("criado_em", desc=True).execute()
-    return result.data
+    result = await executar(supabase.table("documentos").select("*").eq("processo_id", processo_id).order("criado_em", desc=True))
+    return transmitir_lista(result.data)
 
 @app.get("/api/documentos/{documento_id}/download", tags=["Documentos"])
 async def download_documento(
     documento_id: int,
+    request: Request,
     current_user: UsuarioResponse = Depends(get_current_active_user)
 ):
-    from fastapi.responses import FileResponse
+    """Download com ETag (SHA-256 do arquivo) e suporte a Range"""
+    from fastapi.responses import RedirectResponse
     import os
     supabase = get_supabase_admin()
-    result = supabase.table("documentos").select("*").eq("id", documento_id).execute()
+    # Só os metadados do arquivo (sem conteudo_html)
+    result = await executar(
+        supabase.table("documentos")
+        .select("arquivo_url, arquivo_nome, arquivo_tipo, arquivo_hash")
+        .eq("id", documento_id)
+    )
     if not result.data:
         raise HTTPException(status_code=404, detail="Documento não encontrado")
     doc = result.data[0]
     file_path = doc['arquivo_url']
+    # Arquivos no Supabase Storage: o próprio Storage atende Range e ETag
+    if file_path and file_path.startswith(("http://", "https://")):
+        return RedirectResponse(file_path)
     if not file_path or not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Arquivo não encontrado")
-    return FileResponse(
-        path=file_path,
-        filename=doc['arquivo_nome'],
-        media_type=doc['arquivo_tipo'] or 'application/octet-stream'
+    return resposta_arquivo(
+        request,
+        file_path,
+        doc['arquivo_nome'] or os.path.basename(file_path),
+        doc['arquivo_tipo'],
+        doc['arquivo_hash']
     )
 
 
@@ -409,115 +652,82 @@ async def aprovar_tramitacao(
     observacao = data.get('observacao')
     from datetime import datetime
     supabase = get_supabase_admin()
-    tram = supabase.table("tramitacoes").select("*").eq("id", tramitacao_id).single().execute()
+    tram = await executar(supabase.table("tramitacoes").select("*").eq("id", tramitacao_id).single())
     if not tram.data:
         raise HTTPException(404, "Não encontrada")
     if current_user.setor_id != tram.data['setor_destino_id']:
         raise HTTPException(403, "Sem permissão")
-    supabase.table("tramitacoes").update({
+    await executar(supabase.table("tramitacoes").update({
         "status_aprovacao": "aprovado",
         "aprovado_por": current_user.id,
         "data_aprovacao": datetime.now().isoformat()
-    }).eq("id", tramitacao_id).execute()
+    }).eq("id", tramitacao_id))
     return {"message": "Aprovado"}
 
 
 @app.get("/api/processos-meus", tags=["Processos"])
-async def get_meus_processos(current_user: UsuarioResponse = Depends(get_current_active_user)):
+async def get_meus_processos(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
     supabase = get_supabase_admin()
-    result = supabase.table("processos").select("*").eq("criado_por", current_user.id).order("criado_em", desc=True).execute()
-    return result.data if result.data else []
+    query = supabase.table("processos").select("*").eq("criado_por", current_user.id)
+    processos, proximo_cursor, _ = await paginar(query, limit, cursor)
+    definir_cabecalhos_paginacao(response, proximo_cursor)
+    return resposta_lista(processos, response)
 
 @app.get("/api/processos-setor", tags=["Processos"])
-async def get_processos_setor(current_user: UsuarioResponse = Depends(get_current_active_user)):
-    supabase = get_supabase_admin()
-    trams = supabase.table("tramitacoes").select("processo_id").eq("setor_destino_id", current_user.setor_id).execute()
-    if not trams.data:
-        return []
-    processo_ids = list(set([t['processo_id'] for t in trams.data]))
-    result = supabase.table("processos").select("*").in_("id", processo_ids).order("criado_em", desc=True).execute()
-    return result.data if result.data else []
-
-
-@app.get("/api/processos-relevantes", tags=["Processos"])
-async def get_processos_relevantes(current_user: UsuarioResponse = Depends(get_current_active_user)):
-    """Lista processos relevantes para o usuário"""
-    supabase = get_supabase_admin()
-    
-    # Processos criados por mim
-    meus = supabase.table("processos").select("*").eq("criado_por", current_user.id).execute()
-    meus_ids = set([p['id'] for p in meus.data]) if meus.data else set()
-    
-    # Processos tramitados para meu setor
-    trams = supabase.table("tramitacoes").select("processo_id").eq("setor_destino_id", current_user.setor_id).execute()
-    setor_ids = set([t['processo_id'] for t in trams.data]) if trams.data else set()
-    
-    # Combinar
-    todos_ids = list(meus_ids | setor_ids)
-    
-    if not todos_ids:
-        return []
-    
-    result = supabase.table("processos").select("*").in_("id", todos_ids).order("criado_em", desc=True).execute()
-    return result.data if result.data else []
-
-
-@app.get("/api/processos-relevantes", tags=["Processos"])
-async def get_processos_relevantes(current_user: UsuarioResponse = Depends(get_current_active_user)):
-    """Lista processos relevantes para o usuário"""
+async def get_processos_setor(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
     supabase = get_supabase_admin()
-    
-    # Processos criados por mim
-    meus = supabase.table("processos").select("*").eq("criado_por", current_user.id).execute()
-    meus_ids = set([p['id'] for p in meus.data]) if meus.data else set()
-    
-    # Processos tramitados para meu setor
-    trams = supabase.table("tramitacoes").select("processo_id").eq("setor_destino_id", current_user.setor_id).execute()
-    setor_ids = set([t['processo_id'] for t in trams.data]) if trams.data else set()
-    
-    # Combinar
-    todos_ids = list(meus_ids | setor_ids)
-    
-    if not todos_ids:
-        return []
-    
-    result = supabase.table("processos").select("*").in_("id", todos_ids).order("criado_em", desc=True).execute()
-    return result.data if result.data else []
+    # Processos que já tramitaram para o meu setor (join com tramitacoes no PostgREST)
+    query = supabase.table("processos").select("*, tramitacoes!inner(setor_destino_id)").eq("tramitacoes.setor_destino_id", current_user.setor_id)
+    processos, proximo_cursor, _ = await paginar(query, limit, cursor)
+    for p in processos:
+        p.pop("tramitacoes", None)
+    definir_cabecalhos_paginacao(response, proximo_cursor)
+    return resposta_lista(processos, response)
+
+
+@app.get("/api/processos-relevantes", response_model=List[ProcessoRelevanteResponse], tags=["Processos"])
+async def get_processos_relevantes(
+    response: Response,
+    status: Optional[List[StatusProcesso]] = Query(None),
+    ordenar: str = Query("criado_em", description="criado_em, atualizado_em ou data_autuacao"),
+    crescente: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: UsuarioResponse = Depends(get_current_active_user)
+):
+    """Processos criados por mim ou tramitados para meu setor (cursor em X-Next-Cursor)"""
+    processos, proximo_cursor = await processo_service.listar_relevantes(
+        current_user.id,
+        current_user.setor_id,
+        status_filtro=status,
+        ordenar=ordenar,
+        crescente=crescente,
+        limit=limit,
+        cursor=cursor
+    )
+    definir_cabecalhos_paginacao(response, proximo_cursor)
+    return resposta_lista(processos, response)
 
 
 @app.post("/api/tramitacoes/{tramitacao_id}/rejeitar", tags=["Tramitações"])
 async def rejeitar_tramitacao(tramitacao_id: int, current_user: UsuarioResponse = Depends(get_current_active_user), data: dict = Body({})):
-    from datetime import datetime
     motivo = data.get('motivo', '')
     if not motivo:
         raise HTTPException(400, "Motivo obrigatório")
     
-    supabase = get_supabase_admin()
-    tram = supabase.table("tramitacoes").select("*").eq("id", tramitacao_id).single().execute()
-    if not tram.data:
-        raise HTTPException(404, "Não encontrada")
-    
-    if current_user.setor_id != tram.data['setor_destino_id']:
-        raise HTTPException(403, "Sem permissão")
-    
-    # Marcar como rejeitada
-    supabase.table("tramitacoes").update({
-        "status_aprovacao": "rejeitado",
-        "aprovado_por": current_user.id,
-        "data_aprovacao": datetime.now().isoformat(),
-        "motivo_rejeicao": motivo
-    }).eq("id", tramitacao_id).execute()
-    
-    # Criar devolução
-    nova = {
-        "processo_id": tram.data['processo_id'],
-        "setor_origem_id": tram.data['setor_destino_id'],
-        "setor_destino_id": tram.data['setor_origem_id'],
-        "observacao": f"REJEITADO: {motivo}",
-        "tipo_tramitacao": "despacho",
-        "enviado_por": current_user.id,
-        "status_aprovacao": "pendente"
-    }
-    supabase.table("tramitacoes").insert(nova).execute()
+    # Rejeição, devolução e retorno do processo ao setor de origem em uma transação
+    devolucao = await processo_service.rejeitar_tramitacao(
+        tramitacao_id, motivo, current_user.id, current_user.setor_id
+    )
     
-    return {"message": "Rejeitado e devolvido"}
+    return {"message": "Rejeitado e devolvido", "tramitacao": devolucao}
@@ -0,0 +1,53 @@
+-- Migração: agregação do dashboard em uma única chamada RPC
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão
+
+CREATE INDEX IF NOT EXISTS idx_documentos_pendentes_assinatura ON documentos(processo_id)
+    WHERE requer_assinatura AND NOT assinado AND status = 'ativo';
+
+-- Estatísticas do dashboard em um único round trip (ProcessoService.get_dashboard_stats)
+CREATE OR REPLACE FUNCTION dashboard_stats(p_usuario_id INTEGER, p_setor_id INTEGER DEFAULT NULL)
+RETURNS TABLE (
+    total_processos BIGINT,
+    processos_abertos BIGINT,
+    processos_em_tramite BIGINT,
+    processos_concluidos BIGINT,
+    meus_processos BIGINT,
+    processos_meu_setor BIGINT,
+    pendentes_aprovacao BIGINT,
+    pendentes_assinatura BIGINT
+) AS $$
+    SELECT
+        p.total_processos,
+        p.processos_abertos,
+        p.processos_em_tramite,
+        p.processos_concluidos,
+        p.meus_processos,
+        p.processos_meu_setor,
+        a.pendentes_aprovacao,
+        s.pendentes_assinatura
+    FROM (
+        SELECT
+            COUNT(*) AS total_processos,
+            COUNT(*) FILTER (WHERE status = 'aberto') AS processos_abertos,
+            COUNT(*) FILTER (WHERE status = 'em_tramite') AS processos_em_tramite,
+            COUNT(*) FILTER (WHERE status = 'concluido') AS processos_concluidos,
+            COUNT(*) FILTER (WHERE criado_por = p_usuario_id) AS meus_processos,
+            COUNT(*) FILTER (WHERE setor_atual_id = p_setor_id) AS processos_meu_setor
+        FROM processos
+    ) p
+    CROSS JOIN (
+        SELECT COUNT(*) AS pendentes_aprovacao
+        FROM aprovacoes
+        WHERE aprovador_id = p_usuario_id AND status = 'pendente'
+    ) a
+    CROSS JOIN (
+        -- Documentos dos processos que estão no meu setor e aguardam assinatura
+        SELECT COUNT(*) AS pendentes_assinatura
+        FROM documentos d
+        JOIN processos pr ON pr.id = d.processo_id
+        WHERE pr.setor_atual_id = p_setor_id
+          AND d.requer_assinatura
+          AND NOT d.assinado
+          AND d.status = 'ativo'
+    ) s;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,69 @@
+-- Migração: alocador de protocolos por ano com dígito verificador real
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão
+
+CREATE TABLE IF NOT EXISTS protocolo_sequencias (
+    ano INTEGER PRIMARY KEY,
+    ultimo_numero INTEGER NOT NULL DEFAULT 0
+);
+
+-- Continua a numeração a partir do maior protocolo já emitido em cada ano
+INSERT INTO protocolo_sequencias (ano, ultimo_numero)
+SELECT ano, COALESCE(MAX(CAST(SUBSTRING(numero_protocolo FROM '\d{4}\.CBB\.(\d+)-\d') AS INTEGER)), 0)
+FROM processos
+GROUP BY ano
+ON CONFLICT (ano) DO UPDATE
+    SET ultimo_numero = GREATEST(protocolo_sequencias.ultimo_numero, EXCLUDED.ultimo_numero);
+
+-- Alocação de números de protocolo: um contador por ano, incrementado de forma
+-- atômica (O(1), sem varrer processos). Usado pela API e pelo trigger abaixo.
+CREATE OR REPLACE FUNCTION reservar_protocolos(p_ano INTEGER, p_quantidade INTEGER DEFAULT 1)
+RETURNS INTEGER AS $$
+    -- Reserva p_quantidade números consecutivos e retorna o primeiro deles
+    INSERT INTO protocolo_sequencias (ano, ultimo_numero)
+    VALUES (p_ano, p_quantidade)
+    ON CONFLICT (ano) DO UPDATE
+        SET ultimo_numero = protocolo_sequencias.ultimo_numero + EXCLUDED.ultimo_numero
+    RETURNING ultimo_numero - p_quantidade + 1;
+$$ LANGUAGE sql VOLATILE;
+
+-- Dígito verificador (módulo 11, pesos 2 a 9 da direita para a esquerda)
+CREATE OR REPLACE FUNCTION digito_verificador_protocolo(p_ano INTEGER, p_sequencial INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    digitos TEXT := p_ano::TEXT || LPAD(p_sequencial::TEXT, GREATEST(6, LENGTH(p_sequencial::TEXT)), '0');
+    soma INTEGER := 0;
+    peso INTEGER := 2;
+    resto INTEGER;
+BEGIN
+    FOR i IN REVERSE LENGTH(digitos)..1 LOOP
+        soma := soma + SUBSTRING(digitos FROM i FOR 1)::INTEGER * peso;
+        peso := CASE WHEN peso = 9 THEN 2 ELSE peso + 1 END;
+    END LOOP;
+    
+    resto := 11 - (soma % 11);
+    RETURN CASE WHEN resto >= 10 THEN 0 ELSE resto END;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Formato: AAAA.CBB.NNNNNN-D (onde D é o dígito verificador)
+CREATE OR REPLACE FUNCTION formatar_protocolo(p_ano INTEGER, p_sequencial INTEGER)
+RETURNS VARCHAR AS $$
+    SELECT p_ano || '.CBB.'
+        || LPAD(p_sequencial::TEXT, GREATEST(6, LENGTH(p_sequencial::TEXT)), '0')
+        || '-' || digito_verificador_protocolo(p_ano, p_sequencial);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Função para gerar número de protocolo automático
+CREATE OR REPLACE FUNCTION gerar_numero_protocolo()
+RETURNS TRIGGER AS $$
+DECLARE
+    ano_atual INTEGER;
+BEGIN
+    ano_atual := EXTRACT(YEAR FROM NOW());
+    
+    NEW.numero_protocolo := formatar_protocolo(ano_atual, reservar_protocolos(ano_atual, 1));
+    NEW.ano := ano_atual;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,100 @@
+-- Migração: busca textual (full-text em português + trigramas) e RPC buscar_processos
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- Em tabelas grandes, prefira criar os índices com CREATE INDEX CONCURRENTLY fora de transação.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public;
+
+-- unaccent() não é IMMUTABLE; o wrapper permite usá-lo em índices
+CREATE OR REPLACE FUNCTION f_unaccent(TEXT)
+RETURNS TEXT AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1);
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+DROP TEXT SEARCH CONFIGURATION IF EXISTS portugues_sem_acento CASCADE;
+CREATE TEXT SEARCH CONFIGURATION portugues_sem_acento (COPY = portuguese);
+ALTER TEXT SEARCH CONFIGURATION portugues_sem_acento
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+
+-- Documento de busca do processo (pesos: protocolo/assunto > interessado > especificação)
+CREATE OR REPLACE FUNCTION processo_tsvector(
+    p_numero_protocolo TEXT, p_assunto TEXT, p_interessado TEXT, p_especificacao TEXT
+)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('portugues_sem_acento', COALESCE(p_numero_protocolo, '')), 'A')
+        || setweight(to_tsvector('portugues_sem_acento', COALESCE(p_assunto, '')), 'A')
+        || setweight(to_tsvector('portugues_sem_acento', COALESCE(p_interessado, '')), 'B')
+        || setweight(to_tsvector('portugues_sem_acento', COALESCE(p_especificacao, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Texto normalizado para a busca aproximada (erros de digitação, nomes parciais)
+CREATE OR REPLACE FUNCTION processo_texto_busca(p_assunto TEXT, p_interessado TEXT)
+RETURNS TEXT AS $$
+    SELECT f_unaccent(lower(COALESCE(p_assunto, '') || ' ' || COALESCE(p_interessado, '')));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS idx_processos_busca_tsv ON processos
+    USING GIN (processo_tsvector(numero_protocolo, assunto, interessado, especificacao));
+CREATE INDEX IF NOT EXISTS idx_processos_busca_trgm ON processos
+    USING GIN (processo_texto_busca(assunto, interessado) gin_trgm_ops);
+
+-- Permitem usar índice nos filtros ILIKE '%termo%' de listar_processos
+CREATE INDEX IF NOT EXISTS idx_processos_numero_trgm ON processos USING GIN (numero_protocolo gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_assunto_trgm ON processos USING GIN (assunto gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_interessado_trgm ON processos USING GIN (interessado gin_trgm_ops);
+
+-- Busca ranqueada de processos com trechos destacados (GET /api/processos/busca)
+CREATE OR REPLACE FUNCTION buscar_processos(p_termo TEXT, p_limite INTEGER DEFAULT 20, p_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER,
+    numero_protocolo VARCHAR,
+    assunto TEXT,
+    interessado VARCHAR,
+    status VARCHAR,
+    prioridade VARCHAR,
+    tipo_processo_id INTEGER,
+    setor_atual_id INTEGER,
+    data_autuacao TIMESTAMP,
+    relevancia REAL,
+    destaque_assunto TEXT,
+    destaque_interessado TEXT
+) AS $$
+    WITH consulta AS (
+        SELECT
+            websearch_to_tsquery('portugues_sem_acento', p_termo) AS q,
+            f_unaccent(lower(p_termo)) AS texto
+    ),
+    encontrados AS (
+        -- Primeiro só ids e relevância (usa os índices GIN); o destaque,
+        -- mais caro, é calculado apenas para a página retornada
+        SELECT
+            p.id,
+            (ts_rank_cd(processo_tsvector(p.numero_protocolo, p.assunto, p.interessado, p.especificacao), c.q)
+                + word_similarity(c.texto, processo_texto_busca(p.assunto, p.interessado)))::REAL AS relevancia
+        FROM processos p, consulta c
+        WHERE processo_tsvector(p.numero_protocolo, p.assunto, p.interessado, p.especificacao) @@ c.q
+           OR c.texto <% processo_texto_busca(p.assunto, p.interessado)
+           OR p.numero_protocolo ILIKE '%' || p_termo || '%'
+        ORDER BY relevancia DESC, p.id DESC
+        LIMIT p_limite OFFSET p_offset
+    )
+    SELECT
+        p.id,
+        p.numero_protocolo,
+        p.assunto,
+        p.interessado,
+        p.status,
+        p.prioridade,
+        p.tipo_processo_id,
+        p.setor_atual_id,
+        p.data_autuacao,
+        e.relevancia,
+        ts_headline('portugues_sem_acento', p.assunto, c.q,
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true'),
+        ts_headline('portugues_sem_acento', COALESCE(p.interessado, ''), c.q,
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true')
+    FROM encontrados e
+    JOIN processos p ON p.id = e.id
+    CROSS JOIN consulta c
+    ORDER BY e.relevancia DESC, p.id DESC;
+$$ LANGUAGE sql STABLE;
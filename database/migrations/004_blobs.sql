@@ -0,0 +1,48 @@
+-- Migração: armazenamento de documentos endereçado por conteúdo (deduplicação)
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- Documentos já existentes continuam nos caminhos antigos e não entram na contagem.
+
+-- Arquivos armazenados por conteúdo (SHA-256): uploads repetidos compartilham
+-- um único blob; referencias conta os documentos que apontam para ele
+CREATE TABLE IF NOT EXISTS blobs (
+    hash VARCHAR(64) PRIMARY KEY,
+    caminho TEXT NOT NULL, -- caminho no backend de armazenamento
+    url TEXT NOT NULL, -- valor gravado em documentos.arquivo_url
+    tamanho BIGINT NOT NULL,
+    tipo VARCHAR(100),
+    referencias INTEGER NOT NULL DEFAULT 0,
+    criado_em TIMESTAMP DEFAULT NOW()
+);
+
+-- Registra mais uma referência ao blob; cria o registro se o conteúdo é novo.
+-- novo = true indica que o arquivo ainda precisa ser gravado em p_caminho
+CREATE OR REPLACE FUNCTION reservar_blob(
+    p_hash VARCHAR, p_caminho TEXT, p_url TEXT, p_tamanho BIGINT, p_tipo VARCHAR
+)
+RETURNS TABLE (caminho TEXT, url TEXT, novo BOOLEAN) AS $$
+    INSERT INTO blobs (hash, caminho, url, tamanho, tipo, referencias)
+    VALUES (p_hash, p_caminho, p_url, p_tamanho, p_tipo, 1)
+    ON CONFLICT (hash) DO UPDATE SET referencias = blobs.referencias + 1
+    RETURNING blobs.caminho, blobs.url, (xmax = 0);
+$$ LANGUAGE sql VOLATILE;
+
+-- Remove uma referência; ao chegar a zero apaga o registro e retorna o
+-- caminho do arquivo para a API removê-lo do armazenamento
+CREATE OR REPLACE FUNCTION liberar_blob(p_hash VARCHAR, p_url TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_referencias INTEGER;
+    v_caminho TEXT;
+BEGIN
+    UPDATE blobs SET referencias = referencias - 1
+    WHERE hash = p_hash AND url = p_url
+    RETURNING referencias, caminho INTO v_referencias, v_caminho;
+    
+    IF v_referencias IS NOT NULL AND v_referencias <= 0 THEN
+        DELETE FROM blobs WHERE hash = p_hash;
+        RETURN v_caminho;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
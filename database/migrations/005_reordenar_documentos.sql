@@ -0,0 +1,31 @@
+-- Migração: reordenação da árvore de documentos em uma única chamada RPC
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão
+
+-- Aplica a nova ordem da árvore de documentos em um único UPDATE (a posição no
+-- array vira documentos.ordem). Se algum id não pertence ao processo, nada é
+-- alterado e os ids inválidos são retornados.
+CREATE OR REPLACE FUNCTION reordenar_documentos(p_processo_id INTEGER, p_ids INTEGER[])
+RETURNS TABLE (atualizados INTEGER, invalidos INTEGER[]) AS $$
+DECLARE
+    v_invalidos INTEGER[];
+    v_atualizados INTEGER;
+BEGIN
+    SELECT COALESCE(array_agg(i.id), '{}') INTO v_invalidos
+    FROM unnest(p_ids) AS i(id)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM documentos d WHERE d.id = i.id AND d.processo_id = p_processo_id
+    );
+    
+    IF cardinality(v_invalidos) > 0 THEN
+        RETURN QUERY SELECT 0, v_invalidos;
+        RETURN;
+    END IF;
+    
+    UPDATE documentos d SET ordem = n.posicao - 1
+    FROM unnest(p_ids) WITH ORDINALITY AS n(id, posicao)
+    WHERE d.id = n.id AND d.processo_id = p_processo_id;
+    
+    GET DIAGNOSTICS v_atualizados = ROW_COUNT;
+    RETURN QUERY SELECT v_atualizados, v_invalidos;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,59 @@
+-- Migração: caixa de entrada (processos relevantes) em uma única consulta RPC
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão
+
+-- Caixa de entrada: ids tramitados para um setor sem visitar a tabela (index-only)
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_setor_processo ON tramitacoes(setor_destino_id, processo_id);
+
+-- Caixa de entrada (GET /api/processos-relevantes): processos criados pelo
+-- usuário ou tramitados para o setor dele, em uma única consulta paginada
+-- por cursor (p_cursor_valor, p_cursor_id) sobre (p_ordenar, id)
+CREATE OR REPLACE FUNCTION processos_relevantes(
+    p_usuario_id INTEGER,
+    p_setor_id INTEGER,
+    p_status VARCHAR[] DEFAULT NULL,
+    p_ordenar TEXT DEFAULT 'criado_em',
+    p_crescente BOOLEAN DEFAULT false,
+    p_cursor_valor TIMESTAMP DEFAULT NULL,
+    p_cursor_id INTEGER DEFAULT NULL,
+    p_limite INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    numero_protocolo VARCHAR,
+    assunto TEXT,
+    interessado VARCHAR,
+    status VARCHAR,
+    prioridade VARCHAR,
+    setor_atual_id INTEGER,
+    data_autuacao TIMESTAMP,
+    criado_em TIMESTAMP,
+    atualizado_em TIMESTAMP
+) AS $$
+DECLARE
+    v_direcao TEXT := CASE WHEN p_crescente THEN 'ASC' ELSE 'DESC' END;
+    v_comparador TEXT := CASE WHEN p_crescente THEN '>' ELSE '<' END;
+BEGIN
+    IF p_ordenar NOT IN ('criado_em', 'atualizado_em', 'data_autuacao') THEN
+        RAISE EXCEPTION 'Ordenação inválida: %', p_ordenar;
+    END IF;
+    
+    -- SQL dinâmico só para a coluna/direção da ordenação (valores via USING)
+    RETURN QUERY EXECUTE format($sql$
+        WITH relevantes AS (
+            SELECT p.id FROM processos p WHERE p.criado_por = $1
+            UNION
+            SELECT t.processo_id FROM tramitacoes t WHERE t.setor_destino_id = $2
+        )
+        SELECT
+            p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.prioridade,
+            p.setor_atual_id, p.data_autuacao, p.criado_em, p.atualizado_em
+        FROM relevantes r
+        JOIN processos p ON p.id = r.id
+        WHERE ($3 IS NULL OR p.status = ANY($3))
+          AND ($4 IS NULL OR (p.%1$I, p.id) %2$s ($4, $5))
+        ORDER BY p.%1$I %3$s, p.id %3$s
+        LIMIT $6
+    $sql$, p_ordenar, v_comparador, v_direcao)
+    USING p_usuario_id, p_setor_id, p_status, p_cursor_valor, p_cursor_id, p_limite;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -0,0 +1,53 @@
+-- Migração: tramitação de vários processos em uma única chamada RPC
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão
+
+-- Tramitação em lote (POST /api/processos/tramitar-lote): um único comando
+-- insere as tramitações e atualiza os processos. Processos bloqueados ou
+-- inexistentes ficam de fora e são informados em resultado.
+CREATE OR REPLACE FUNCTION tramitar_processos(
+    p_processo_ids INTEGER[],
+    p_setor_origem_id INTEGER,
+    p_setor_destino_id INTEGER,
+    p_usuario_id INTEGER,
+    p_observacao TEXT DEFAULT NULL,
+    p_tipo_tramitacao VARCHAR DEFAULT 'despacho'
+)
+RETURNS TABLE (processo_id INTEGER, resultado TEXT, tramitacao_id INTEGER) AS $$
+    WITH pedidos AS (
+        SELECT u.id, MIN(u.posicao) AS posicao
+        FROM unnest(p_processo_ids) WITH ORDINALITY AS u(id, posicao)
+        GROUP BY u.id
+    ),
+    alvos AS (
+        SELECT p.id
+        FROM processos p
+        JOIN pedidos pe ON pe.id = p.id
+        WHERE NOT COALESCE(p.bloqueado, false)
+        FOR UPDATE OF p
+    ),
+    inseridas AS (
+        INSERT INTO tramitacoes (processo_id, setor_origem_id, setor_destino_id, observacao, tipo_tramitacao, enviado_por)
+        SELECT a.id, p_setor_origem_id, p_setor_destino_id, p_observacao, p_tipo_tramitacao, p_usuario_id
+        FROM alvos a
+        RETURNING tramitacoes.id, tramitacoes.processo_id
+    ),
+    atualizados AS (
+        UPDATE processos p
+        SET setor_atual_id = p_setor_destino_id, status = 'em_tramite'
+        FROM alvos a
+        WHERE p.id = a.id
+        RETURNING p.id
+    )
+    SELECT
+        pe.id,
+        CASE
+            WHEN i.id IS NOT NULL THEN 'tramitado'
+            WHEN p.id IS NULL THEN 'nao_encontrado'
+            ELSE 'bloqueado'
+        END,
+        i.id
+    FROM pedidos pe
+    LEFT JOIN processos p ON p.id = pe.id
+    LEFT JOIN inseridas i ON i.processo_id = pe.id
+    ORDER BY pe.posicao;
+$$ LANGUAGE sql VOLATILE;
@@ -0,0 +1,101 @@
+-- Migração: tramitar e rejeitar como procedimentos transacionais (uma chamada RPC)
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- As colunas de decisão já existem em bancos em produção; o ADD COLUMN
+-- IF NOT EXISTS só alinha bancos criados a partir do schema.sql antigo.
+
+ALTER TABLE tramitacoes ADD COLUMN IF NOT EXISTS status_aprovacao VARCHAR(20) DEFAULT 'pendente';
+ALTER TABLE tramitacoes ADD COLUMN IF NOT EXISTS aprovado_por INTEGER REFERENCES usuarios(id);
+ALTER TABLE tramitacoes ADD COLUMN IF NOT EXISTS data_aprovacao TIMESTAMP;
+ALTER TABLE tramitacoes ADD COLUMN IF NOT EXISTS motivo_rejeicao TEXT;
+
+-- Tramitação de um processo em uma transação: registra a tramitação e move o
+-- processo para o setor de destino. Retorna {tramitacao, processo} ou {erro}.
+CREATE OR REPLACE FUNCTION tramitar_processo(
+    p_processo_id INTEGER,
+    p_setor_origem_id INTEGER,
+    p_setor_destino_id INTEGER,
+    p_usuario_id INTEGER,
+    p_observacao TEXT DEFAULT NULL,
+    p_tipo_tramitacao VARCHAR DEFAULT 'despacho'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_processo processos;
+    v_tramitacao tramitacoes;
+BEGIN
+    SELECT * INTO v_processo FROM processos WHERE id = p_processo_id FOR UPDATE;
+    
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('erro', 'processo_nao_encontrado');
+    END IF;
+    
+    IF v_processo.bloqueado THEN
+        RETURN jsonb_build_object('erro', 'processo_bloqueado');
+    END IF;
+    
+    INSERT INTO tramitacoes (processo_id, setor_origem_id, setor_destino_id, observacao, tipo_tramitacao, enviado_por)
+    VALUES (p_processo_id, p_setor_origem_id, p_setor_destino_id, p_observacao, p_tipo_tramitacao, p_usuario_id)
+    RETURNING * INTO v_tramitacao;
+    
+    UPDATE processos SET setor_atual_id = p_setor_destino_id, status = 'em_tramite'
+    WHERE id = p_processo_id
+    RETURNING * INTO v_processo;
+    
+    RETURN jsonb_build_object('tramitacao', to_jsonb(v_tramitacao), 'processo', to_jsonb(v_processo));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rejeição pelo setor de destino em uma transação: marca a tramitação como
+-- rejeitada, cria a devolução ao setor de origem e move o processo de volta.
+-- Retorna {tramitacao (a devolução), processo} ou {erro}.
+CREATE OR REPLACE FUNCTION rejeitar_tramitacao(
+    p_tramitacao_id INTEGER,
+    p_usuario_id INTEGER,
+    p_setor_id INTEGER,
+    p_motivo TEXT
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_rejeitada tramitacoes;
+    v_devolucao tramitacoes;
+    v_processo processos;
+BEGIN
+    SELECT * INTO v_rejeitada FROM tramitacoes WHERE id = p_tramitacao_id FOR UPDATE;
+    
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('erro', 'tramitacao_nao_encontrada');
+    END IF;
+    
+    IF v_rejeitada.setor_destino_id IS DISTINCT FROM p_setor_id THEN
+        RETURN jsonb_build_object('erro', 'sem_permissao');
+    END IF;
+    
+    -- O lock acima serializa cliques repetidos: só a primeira rejeição devolve
+    IF v_rejeitada.status_aprovacao = 'rejeitado' THEN
+        RETURN jsonb_build_object('erro', 'tramitacao_ja_rejeitada');
+    END IF;
+    
+    UPDATE tramitacoes SET
+        status_aprovacao = 'rejeitado',
+        aprovado_por = p_usuario_id,
+        data_aprovacao = NOW(),
+        motivo_rejeicao = p_motivo
+    WHERE id = p_tramitacao_id;
+    
+    INSERT INTO tramitacoes (
+        processo_id, setor_origem_id, setor_destino_id, observacao,
+        tipo_tramitacao, enviado_por, status_aprovacao
+    )
+    VALUES (
+        v_rejeitada.processo_id, v_rejeitada.setor_destino_id, v_rejeitada.setor_origem_id,
+        'REJEITADO: ' || p_motivo, 'despacho', p_usuario_id, 'pendente'
+    )
+    RETURNING * INTO v_devolucao;
+    
+    UPDATE processos SET setor_atual_id = v_rejeitada.setor_origem_id, status = 'em_tramite'
+    WHERE id = v_rejeitada.processo_id
+    RETURNING * INTO v_processo;
+    
+    RETURN jsonb_build_object('tramitacao', to_jsonb(v_devolucao), 'processo', to_jsonb(v_processo));
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,301 @@
+-- Migração: resumo dos processos (processos_resumo) mantido por triggers
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão
+
+BEGIN;
+
+-- Resumo dos processos para listagens: nomes desnormalizados e contadores
+-- mantidos por triggers (substitui as subconsultas de vw_processos_completos)
+CREATE TABLE IF NOT EXISTS processos_resumo (
+    id INTEGER PRIMARY KEY REFERENCES processos(id) ON DELETE CASCADE,
+    numero_protocolo VARCHAR(50) NOT NULL,
+    assunto TEXT NOT NULL,
+    interessado VARCHAR(200),
+    status VARCHAR(50),
+    nivel_acesso VARCHAR(20),
+    prioridade VARCHAR(20),
+    data_autuacao TIMESTAMP,
+    data_conclusao TIMESTAMP,
+    prazo_dias INTEGER,
+    data_prazo TIMESTAMP,
+    tipo_processo_id INTEGER,
+    tipo_processo VARCHAR(200),
+    tipo_processo_cor VARCHAR(7),
+    setor_atual_id INTEGER,
+    setor_atual VARCHAR(200),
+    setor_atual_sigla VARCHAR(20),
+    criado_por INTEGER,
+    criado_por_nome VARCHAR(200),
+    criado_por_email VARCHAR(255),
+    usuario_responsavel_id INTEGER,
+    responsavel_nome VARCHAR(200),
+    responsavel_email VARCHAR(255),
+    total_documentos INTEGER NOT NULL DEFAULT 0, -- documentos ativos
+    total_tramitacoes INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP
+);
+
+-- Listagens a partir de processos_resumo: keyset por (data_autuacao, id)
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_autuacao ON processos_resumo(data_autuacao DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_setor ON processos_resumo(setor_atual_id, data_autuacao DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_criado_por ON processos_resumo(criado_por, data_autuacao DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_status ON processos_resumo(status, data_autuacao DESC, id DESC);
+
+-- Triggers por comando (FOR EACH STATEMENT com tabelas de transição): inserções e
+-- atualizações em lote (importação, tramitação em lote) ajustam o resumo com um
+-- único comando, sem trabalho por linha.
+
+-- Copia os dados do processo e os nomes de tipo, setor e usuários
+CREATE OR REPLACE FUNCTION sincronizar_processos_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO processos_resumo (
+        id, numero_protocolo, assunto, interessado, status, nivel_acesso, prioridade,
+        data_autuacao, data_conclusao, prazo_dias, data_prazo,
+        tipo_processo_id, tipo_processo, tipo_processo_cor,
+        setor_atual_id, setor_atual, setor_atual_sigla,
+        criado_por, criado_por_nome, criado_por_email,
+        usuario_responsavel_id, responsavel_nome, responsavel_email,
+        atualizado_em
+    )
+    SELECT
+        p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.nivel_acesso, p.prioridade,
+        p.data_autuacao, p.data_conclusao, p.prazo_dias, p.data_prazo,
+        p.tipo_processo_id, tp.nome, tp.cor,
+        p.setor_atual_id, sa.nome, sa.sigla,
+        p.criado_por, uc.nome, uc.email,
+        p.usuario_responsavel_id, ur.nome, ur.email,
+        p.atualizado_em
+    FROM novos p
+    LEFT JOIN tipos_processo tp ON tp.id = p.tipo_processo_id
+    LEFT JOIN setores sa ON sa.id = p.setor_atual_id
+    LEFT JOIN usuarios uc ON uc.id = p.criado_por
+    LEFT JOIN usuarios ur ON ur.id = p.usuario_responsavel_id
+    ON CONFLICT (id) DO UPDATE SET
+        numero_protocolo = EXCLUDED.numero_protocolo,
+        assunto = EXCLUDED.assunto,
+        interessado = EXCLUDED.interessado,
+        status = EXCLUDED.status,
+        nivel_acesso = EXCLUDED.nivel_acesso,
+        prioridade = EXCLUDED.prioridade,
+        data_autuacao = EXCLUDED.data_autuacao,
+        data_conclusao = EXCLUDED.data_conclusao,
+        prazo_dias = EXCLUDED.prazo_dias,
+        data_prazo = EXCLUDED.data_prazo,
+        tipo_processo_id = EXCLUDED.tipo_processo_id,
+        tipo_processo = EXCLUDED.tipo_processo,
+        tipo_processo_cor = EXCLUDED.tipo_processo_cor,
+        setor_atual_id = EXCLUDED.setor_atual_id,
+        setor_atual = EXCLUDED.setor_atual,
+        setor_atual_sigla = EXCLUDED.setor_atual_sigla,
+        criado_por = EXCLUDED.criado_por,
+        criado_por_nome = EXCLUDED.criado_por_nome,
+        criado_por_email = EXCLUDED.criado_por_email,
+        usuario_responsavel_id = EXCLUDED.usuario_responsavel_id,
+        responsavel_nome = EXCLUDED.responsavel_nome,
+        responsavel_email = EXCLUDED.responsavel_email,
+        atualizado_em = EXCLUDED.atualizado_em;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_processo_insert
+    AFTER INSERT ON processos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sincronizar_processos_resumo();
+
+CREATE TRIGGER trigger_resumo_processo_update
+    AFTER UPDATE ON processos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sincronizar_processos_resumo();
+
+-- Contador de documentos ativos por processo
+CREATE OR REPLACE FUNCTION contar_documentos_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE processos_resumo r SET total_documentos = r.total_documentos + d.delta
+        FROM (
+            SELECT processo_id, COUNT(*) AS delta FROM novos WHERE status = 'ativo' GROUP BY processo_id
+        ) d
+        WHERE r.id = d.processo_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE processos_resumo r SET total_documentos = r.total_documentos - d.delta
+        FROM (
+            SELECT processo_id, COUNT(*) AS delta FROM antigos WHERE status = 'ativo' GROUP BY processo_id
+        ) d
+        WHERE r.id = d.processo_id;
+    ELSE
+        -- Mudança de status (ex.: cancelamento) ou de processo
+        UPDATE processos_resumo r SET total_documentos = r.total_documentos + d.delta
+        FROM (
+            SELECT processo_id, SUM(delta) AS delta
+            FROM (
+                SELECT processo_id, 1 AS delta FROM novos WHERE status = 'ativo'
+                UNION ALL
+                SELECT processo_id, -1 FROM antigos WHERE status = 'ativo'
+            ) mudancas
+            GROUP BY processo_id
+            HAVING SUM(delta) <> 0
+        ) d
+        WHERE r.id = d.processo_id;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_documento_insert
+    AFTER INSERT ON documentos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_documentos_resumo();
+
+CREATE TRIGGER trigger_resumo_documento_update
+    AFTER UPDATE ON documentos
+    REFERENCING OLD TABLE AS antigos NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_documentos_resumo();
+
+CREATE TRIGGER trigger_resumo_documento_delete
+    AFTER DELETE ON documentos
+    REFERENCING OLD TABLE AS antigos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_documentos_resumo();
+
+-- Contador de tramitações por processo
+CREATE OR REPLACE FUNCTION contar_tramitacoes_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE processos_resumo r SET total_tramitacoes = r.total_tramitacoes + t.delta
+        FROM (SELECT processo_id, COUNT(*) AS delta FROM novos GROUP BY processo_id) t
+        WHERE r.id = t.processo_id;
+    ELSE
+        UPDATE processos_resumo r SET total_tramitacoes = r.total_tramitacoes - t.delta
+        FROM (SELECT processo_id, COUNT(*) AS delta FROM antigos GROUP BY processo_id) t
+        WHERE r.id = t.processo_id;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_tramitacao_insert
+    AFTER INSERT ON tramitacoes
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_tramitacoes_resumo();
+
+CREATE TRIGGER trigger_resumo_tramitacao_delete
+    AFTER DELETE ON tramitacoes
+    REFERENCING OLD TABLE AS antigos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_tramitacoes_resumo();
+
+-- Renomear setor, tipo de processo ou usuário atualiza os nomes copiados
+CREATE OR REPLACE FUNCTION propagar_nomes_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'setores' THEN
+        UPDATE processos_resumo SET setor_atual = NEW.nome, setor_atual_sigla = NEW.sigla
+        WHERE setor_atual_id = NEW.id;
+    ELSIF TG_TABLE_NAME = 'tipos_processo' THEN
+        UPDATE processos_resumo SET tipo_processo = NEW.nome, tipo_processo_cor = NEW.cor
+        WHERE tipo_processo_id = NEW.id;
+    ELSE
+        UPDATE processos_resumo SET criado_por_nome = NEW.nome, criado_por_email = NEW.email
+        WHERE criado_por = NEW.id;
+        UPDATE processos_resumo SET responsavel_nome = NEW.nome, responsavel_email = NEW.email
+        WHERE usuario_responsavel_id = NEW.id;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_setor
+    AFTER UPDATE OF nome, sigla ON setores
+    FOR EACH ROW
+    WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.sigla IS DISTINCT FROM NEW.sigla)
+    EXECUTE FUNCTION propagar_nomes_resumo();
+
+CREATE TRIGGER trigger_resumo_tipo_processo
+    AFTER UPDATE OF nome, cor ON tipos_processo
+    FOR EACH ROW
+    WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.cor IS DISTINCT FROM NEW.cor)
+    EXECUTE FUNCTION propagar_nomes_resumo();
+
+-- usuarios é atualizado a cada login (ultimo_acesso): só dispara se nome/email mudarem
+CREATE TRIGGER trigger_resumo_usuario
+    AFTER UPDATE OF nome, email ON usuarios
+    FOR EACH ROW
+    WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.email IS DISTINCT FROM NEW.email)
+    EXECUTE FUNCTION propagar_nomes_resumo();
+
+-- Carga inicial a partir dos dados existentes (com as escritas bloqueadas
+-- até o COMMIT, para nenhuma alteração escapar entre a carga e os triggers)
+LOCK TABLE processos, documentos, tramitacoes IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO processos_resumo (
+        id, numero_protocolo, assunto, interessado, status, nivel_acesso, prioridade,
+        data_autuacao, data_conclusao, prazo_dias, data_prazo,
+        tipo_processo_id, tipo_processo, tipo_processo_cor,
+        setor_atual_id, setor_atual, setor_atual_sigla,
+        criado_por, criado_por_nome, criado_por_email,
+        usuario_responsavel_id, responsavel_nome, responsavel_email,
+        atualizado_em,
+        total_documentos, total_tramitacoes
+)
+SELECT
+        p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.nivel_acesso, p.prioridade,
+        p.data_autuacao, p.data_conclusao, p.prazo_dias, p.data_prazo,
+        p.tipo_processo_id, tp.nome, tp.cor,
+        p.setor_atual_id, sa.nome, sa.sigla,
+        p.criado_por, uc.nome, uc.email,
+        p.usuario_responsavel_id, ur.nome, ur.email,
+        p.atualizado_em,
+        COALESCE(d.total, 0), COALESCE(t.total, 0)
+FROM processos p
+LEFT JOIN tipos_processo tp ON tp.id = p.tipo_processo_id
+LEFT JOIN setores sa ON sa.id = p.setor_atual_id
+LEFT JOIN usuarios uc ON uc.id = p.criado_por
+LEFT JOIN usuarios ur ON ur.id = p.usuario_responsavel_id
+LEFT JOIN (
+    SELECT processo_id, COUNT(*) AS total FROM documentos WHERE status = 'ativo' GROUP BY processo_id
+) d ON d.processo_id = p.id
+LEFT JOIN (
+    SELECT processo_id, COUNT(*) AS total FROM tramitacoes GROUP BY processo_id
+) t ON t.processo_id = p.id
+ON CONFLICT (id) DO NOTHING;
+
+-- A view passa a ler do resumo (contadores deixam de ser BIGINT: recriar)
+DROP VIEW IF EXISTS vw_processos_completos;
+CREATE VIEW vw_processos_completos AS
+SELECT 
+    id,
+    numero_protocolo,
+    assunto,
+    interessado,
+    status,
+    nivel_acesso,
+    prioridade,
+    data_autuacao,
+    data_conclusao,
+    prazo_dias,
+    data_prazo,
+    tipo_processo,
+    tipo_processo_cor,
+    setor_atual,
+    setor_atual_sigla,
+    criado_por_nome,
+    criado_por_email,
+    responsavel_nome,
+    responsavel_email,
+    total_documentos,
+    total_tramitacoes
+FROM processos_resumo;
+
+COMMIT;
@@ -0,0 +1,27 @@
+-- Migração: o blob só é registrado depois que o arquivo foi gravado
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- Antes, reservar_blob tornava o registro visível antes da gravação: um upload
+-- concorrente do mesmo conteúdo recebia novo = false e apontava para um
+-- arquivo que ainda não existia (ou que nunca seria gravado, se a gravação falhasse).
+
+-- Registra mais uma referência a um blob existente (sem criá-lo).
+-- Nenhuma linha retornada: o conteúdo é novo e precisa ser gravado
+CREATE OR REPLACE FUNCTION referenciar_blob(p_hash VARCHAR)
+RETURNS TABLE (caminho TEXT, url TEXT) AS $$
+    UPDATE blobs SET referencias = referencias + 1
+    WHERE hash = p_hash
+    RETURNING blobs.caminho, blobs.url;
+$$ LANGUAGE sql VOLATILE;
+
+-- Registra o blob depois de o arquivo ter sido gravado em p_caminho.
+-- novo = false indica que outro upload do mesmo conteúdo registrou o blob
+-- antes: a referência foi contada no existente e o arquivo em p_caminho sobra
+CREATE OR REPLACE FUNCTION reservar_blob(
+    p_hash VARCHAR, p_caminho TEXT, p_url TEXT, p_tamanho BIGINT, p_tipo VARCHAR
+)
+RETURNS TABLE (caminho TEXT, url TEXT, novo BOOLEAN) AS $$
+    INSERT INTO blobs (hash, caminho, url, tamanho, tipo, referencias)
+    VALUES (p_hash, p_caminho, p_url, p_tamanho, p_tipo, 1)
+    ON CONFLICT (hash) DO UPDATE SET referencias = blobs.referencias + 1
+    RETURNING blobs.caminho, blobs.url, (xmax = 0);
+$$ LANGUAGE sql VOLATILE;
@@ -0,0 +1,26 @@
+-- Migração: datas de ordenação dos processos obrigatórias
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- As listagens paginam por keyset em (data_autuacao, id), e processos_relevantes
+-- também em (criado_em, id) e (atualizado_em, id). As colunas tinham só DEFAULT
+-- NOW(): um processo gravado com NULL explícito ia para o início da ordenação
+-- descendente e, como última linha da página, gerava um cursor que a API
+-- recusa com 400, interrompendo a paginação.
+
+-- O backfill não é uma modificação do processo: atualizado_em não deve mudar
+ALTER TABLE processos DISABLE TRIGGER trigger_atualizar_processo;
+
+-- O trigger de processos_resumo (por comando) propaga as datas para o resumo
+UPDATE processos SET
+    criado_em = COALESCE(criado_em, data_autuacao, atualizado_em, NOW()),
+    data_autuacao = COALESCE(data_autuacao, criado_em, NOW()),
+    atualizado_em = COALESCE(atualizado_em, criado_em, data_autuacao, NOW())
+WHERE criado_em IS NULL OR data_autuacao IS NULL OR atualizado_em IS NULL;
+
+ALTER TABLE processos ENABLE TRIGGER trigger_atualizar_processo;
+
+ALTER TABLE processos
+    ALTER COLUMN data_autuacao SET NOT NULL,
+    ALTER COLUMN criado_em SET NOT NULL,
+    ALTER COLUMN atualizado_em SET NOT NULL;
+
+ALTER TABLE processos_resumo ALTER COLUMN data_autuacao SET NOT NULL;
@@ -0,0 +1,68 @@
+-- Migração: termo da busca tratado como literal no filtro por protocolo
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- buscar_processos comparava numero_protocolo com ILIKE '%' || p_termo || '%'
+-- sem escapar o termo: "%" ou "_" viravam curingas (uma busca por "_" casava
+-- com todos os processos) e uma "\" solta fazia o ILIKE falhar com erro.
+
+-- Escapa os curingas do LIKE/ILIKE (escape padrão: barra invertida)
+CREATE OR REPLACE FUNCTION f_escapar_like(TEXT)
+RETURNS TEXT AS $$
+    SELECT replace(replace(replace($1, '\', '\\'), '%', '\%'), '_', '\_');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+-- Busca ranqueada de processos com trechos destacados (GET /api/processos/busca)
+CREATE OR REPLACE FUNCTION buscar_processos(p_termo TEXT, p_limite INTEGER DEFAULT 20, p_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER,
+    numero_protocolo VARCHAR,
+    assunto TEXT,
+    interessado VARCHAR,
+    status VARCHAR,
+    prioridade VARCHAR,
+    tipo_processo_id INTEGER,
+    setor_atual_id INTEGER,
+    data_autuacao TIMESTAMP,
+    relevancia REAL,
+    destaque_assunto TEXT,
+    destaque_interessado TEXT
+) AS $$
+    WITH consulta AS (
+        SELECT
+            websearch_to_tsquery('portugues_sem_acento', p_termo) AS q,
+            f_unaccent(lower(p_termo)) AS texto
+    ),
+    encontrados AS (
+        -- Primeiro só ids e relevância (usa os índices GIN); o destaque,
+        -- mais caro, é calculado apenas para a página retornada
+        SELECT
+            p.id,
+            (ts_rank_cd(processo_tsvector(p.numero_protocolo, p.assunto, p.interessado, p.especificacao), c.q)
+                + word_similarity(c.texto, processo_texto_busca(p.assunto, p.interessado)))::REAL AS relevancia
+        FROM processos p, consulta c
+        WHERE processo_tsvector(p.numero_protocolo, p.assunto, p.interessado, p.especificacao) @@ c.q
+           OR c.texto <% processo_texto_busca(p.assunto, p.interessado)
+           OR p.numero_protocolo ILIKE '%' || f_escapar_like(p_termo) || '%'
+        ORDER BY relevancia DESC, p.id DESC
+        LIMIT p_limite OFFSET p_offset
+    )
+    SELECT
+        p.id,
+        p.numero_protocolo,
+        p.assunto,
+        p.interessado,
+        p.status,
+        p.prioridade,
+        p.tipo_processo_id,
+        p.setor_atual_id,
+        p.data_autuacao,
+        e.relevancia,
+        -- Texto escapado antes de receber as marcas: o destaque é HTML seguro
+        ts_headline('portugues_sem_acento', f_escapar_html(p.assunto), c.q,
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true'),
+        ts_headline('portugues_sem_acento', f_escapar_html(COALESCE(p.interessado, '')), c.q,
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true')
+    FROM encontrados e
+    JOIN processos p ON p.id = e.id
+    CROSS JOIN consulta c
+    ORDER BY e.relevancia DESC, p.id DESC;
+$$ LANGUAGE sql STABLE;
@@ -0,0 +1,12 @@
+-- Migração: índices de trigramas em processos_resumo
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- Em tabelas grandes, prefira criar os índices com CREATE INDEX CONCURRENTLY fora de transação.
+-- As listagens leem de processos_resumo desde a 009, mas os índices GIN para os
+-- filtros ILIKE '%termo%' (protocolo, assunto, interessado) só existiam em
+-- processos: com um desses filtros a listagem varria o resumo inteiro.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_numero_trgm ON processos_resumo USING GIN (numero_protocolo gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_assunto_trgm ON processos_resumo USING GIN (assunto gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_interessado_trgm ON processos_resumo USING GIN (interessado gin_trgm_ops);
@@ -0,0 +1,87 @@
+-- Migração: caixa de entrada ordenada e limitada em cada ramo
+-- Executar no SQL Editor do Supabase em bancos criados antes desta versão.
+-- Em tabelas grandes, prefira criar os índices com CREATE INDEX CONCURRENTLY fora de transação.
+-- processos_relevantes reunia (UNION) todos os processos que o setor já recebeu
+-- e todos os criados pelo usuário antes de ordenar e paginar: o custo de cada
+-- página crescia com o histórico do setor. Agora cada ramo aplica o cursor,
+-- ORDER BY e LIMIT, apoiado nos índices abaixo.
+
+-- Ramo "criados pelo usuário": um índice por coluna de ordenação aceita
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por_criado_em ON processos(criado_por, criado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por_atualizado_em ON processos(criado_por, atualizado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por_autuacao ON processos(criado_por, data_autuacao DESC, id DESC);
+-- Ramo "tramitados para o setor": processos na ordem da página, cada um
+-- conferido em tramitacoes por (processo_id, setor_destino_id)
+CREATE INDEX IF NOT EXISTS idx_processos_criado_em ON processos(criado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_atualizado_em ON processos(atualizado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_autuacao_id ON processos(data_autuacao DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_processo_setor ON tramitacoes(processo_id, setor_destino_id);
+
+-- Caixa de entrada (GET /api/processos-relevantes): processos criados pelo
+-- usuário ou tramitados para o setor dele, em uma única consulta paginada
+-- por cursor (p_cursor_valor, p_cursor_id) sobre (p_ordenar, id)
+CREATE OR REPLACE FUNCTION processos_relevantes(
+    p_usuario_id INTEGER,
+    p_setor_id INTEGER,
+    p_status VARCHAR[] DEFAULT NULL,
+    p_ordenar TEXT DEFAULT 'criado_em',
+    p_crescente BOOLEAN DEFAULT false,
+    p_cursor_valor TIMESTAMP DEFAULT NULL,
+    p_cursor_id INTEGER DEFAULT NULL,
+    p_limite INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    numero_protocolo VARCHAR,
+    assunto TEXT,
+    interessado VARCHAR,
+    status VARCHAR,
+    prioridade VARCHAR,
+    setor_atual_id INTEGER,
+    data_autuacao TIMESTAMP,
+    criado_em TIMESTAMP,
+    atualizado_em TIMESTAMP
+) AS $$
+DECLARE
+    v_direcao TEXT := CASE WHEN p_crescente THEN 'ASC' ELSE 'DESC' END;
+    v_comparador TEXT := CASE WHEN p_crescente THEN '>' ELSE '<' END;
+BEGIN
+    IF p_ordenar NOT IN ('criado_em', 'atualizado_em', 'data_autuacao') THEN
+        RAISE EXCEPTION 'Ordenação inválida: %', p_ordenar;
+    END IF;
+    
+    -- SQL dinâmico só para a coluna/direção da ordenação (valores via USING).
+    -- Cada ramo já sai ordenado e limitado (percorrendo os índices por
+    -- (criado_por, ordenação, id) e (ordenação, id)): a página está entre as
+    -- $6 primeiras linhas de um dos ramos, sem reunir antes todos os processos
+    -- que o setor já recebeu
+    RETURN QUERY EXECUTE format($sql$
+        SELECT r.* FROM (
+            (SELECT
+                p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.prioridade,
+                p.setor_atual_id, p.data_autuacao, p.criado_em, p.atualizado_em
+            FROM processos p
+            WHERE p.criado_por = $1
+              AND ($3 IS NULL OR p.status = ANY($3))
+              AND ($4 IS NULL OR (p.%1$I, p.id) %2$s ($4, $5))
+            ORDER BY p.%1$I %3$s, p.id %3$s
+            LIMIT $6)
+            UNION
+            (SELECT
+                p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.prioridade,
+                p.setor_atual_id, p.data_autuacao, p.criado_em, p.atualizado_em
+            FROM processos p
+            WHERE EXISTS (
+                SELECT 1 FROM tramitacoes t WHERE t.processo_id = p.id AND t.setor_destino_id = $2
+            )
+              AND ($3 IS NULL OR p.status = ANY($3))
+              AND ($4 IS NULL OR (p.%1$I, p.id) %2$s ($4, $5))
+            ORDER BY p.%1$I %3$s, p.id %3$s
+            LIMIT $6)
+        ) r
+        ORDER BY r.%1$I %3$s, r.id %3$s
+        LIMIT $6
+    $sql$, p_ordenar, v_comparador, v_direcao)
+    USING p_usuario_id, p_setor_id, p_status, p_cursor_valor, p_cursor_id, p_limite;
+END;
+$$ LANGUAGE plpgsql STABLE;
@@ -10,6 +10,9 @@ DROP TABLE IF EXISTS processos CASCADE;
 DROP TABLE IF EXISTS usuarios CASCADE;
 DROP TABLE IF EXISTS setores CASCADE;
 DROP TABLE IF EXISTS tipos_processo CASCADE;
+DROP TABLE IF EXISTS protocolo_sequencias CASCADE;
+DROP TABLE IF EXISTS blobs CASCADE;
+DROP TABLE IF EXISTS processos_resumo CASCADE;
 
 -- Tipos de Processo
 CREATE TABLE tipos_processo (
@@ -75,15 +78,16 @@ CREATE TABLE processos (
     observacoes TEXT,
     
     -- Controle de datas
-    data_autuacao TIMESTAMP DEFAULT NOW(),
+    -- NOT NULL: as listagens paginam por keyset nestas datas (ver 012)
+    data_autuacao TIMESTAMP NOT NULL DEFAULT NOW(),
     data_conclusao TIMESTAMP,
     prazo_dias INTEGER,
     data_prazo TIMESTAMP,
     
     -- Auditoria
     criado_por INTEGER REFERENCES usuarios(id) NOT NULL,
-    criado_em TIMESTAMP DEFAULT NOW(),
-    atualizado_em TIMESTAMP DEFAULT NOW(),
+    criado_em TIMESTAMP NOT NULL DEFAULT NOW(),
+    atualizado_em TIMESTAMP NOT NULL DEFAULT NOW(),
     
     -- Bloqueio
     bloqueado BOOLEAN DEFAULT false,
@@ -92,6 +96,12 @@ CREATE TABLE processos (
     bloqueado_em TIMESTAMP
 );
 
+-- Contador de protocolos por ano (ver reservar_protocolos)
+CREATE TABLE protocolo_sequencias (
+    ano INTEGER PRIMARY KEY,
+    ultimo_numero INTEGER NOT NULL DEFAULT 0
+);
+
 -- Tramitações
 CREATE TABLE tramitacoes (
     id SERIAL PRIMARY KEY,
@@ -110,6 +120,12 @@ CREATE TABLE tramitacoes (
     data_recebimento TIMESTAMP,
     recebido_por INTEGER REFERENCES usuarios(id),
     
+    -- Decisão do setor de destino (aprovar/rejeitar)
+    status_aprovacao VARCHAR(20) DEFAULT 'pendente', -- pendente, aprovado, rejeitado
+    aprovado_por INTEGER REFERENCES usuarios(id),
+    data_aprovacao TIMESTAMP,
+    motivo_rejeicao TEXT,
+    
     -- Auditoria
     enviado_por INTEGER REFERENCES usuarios(id) NOT NULL,
     criado_em TIMESTAMP DEFAULT NOW()
@@ -161,6 +177,18 @@ CREATE TABLE documentos (
     atualizado_em TIMESTAMP DEFAULT NOW()
 );
 
+-- Arquivos armazenados por conteúdo (SHA-256): uploads repetidos compartilham
+-- um único blob; referencias conta os documentos que apontam para ele
+CREATE TABLE blobs (
+    hash VARCHAR(64) PRIMARY KEY,
+    caminho TEXT NOT NULL, -- caminho no backend de armazenamento
+    url TEXT NOT NULL, -- valor gravado em documentos.arquivo_url
+    tamanho BIGINT NOT NULL,
+    tipo VARCHAR(100),
+    referencias INTEGER NOT NULL DEFAULT 0,
+    criado_em TIMESTAMP DEFAULT NOW()
+);
+
 -- Aprovações (Workflow)
 CREATE TABLE aprovacoes (
     id SERIAL PRIMARY KEY,
@@ -218,6 +246,37 @@ CREATE TABLE assinaturas (
     assinado_em TIMESTAMP DEFAULT NOW()
 );
 
+-- Resumo dos processos para listagens: nomes desnormalizados e contadores
+-- mantidos por triggers (substitui as subconsultas de vw_processos_completos)
+CREATE TABLE processos_resumo (
+    id INTEGER PRIMARY KEY REFERENCES processos(id) ON DELETE CASCADE,
+    numero_protocolo VARCHAR(50) NOT NULL,
+    assunto TEXT NOT NULL,
+    interessado VARCHAR(200),
+    status VARCHAR(50),
+    nivel_acesso VARCHAR(20),
+    prioridade VARCHAR(20),
+    data_autuacao TIMESTAMP NOT NULL,
+    data_conclusao TIMESTAMP,
+    prazo_dias INTEGER,
+    data_prazo TIMESTAMP,
+    tipo_processo_id INTEGER,
+    tipo_processo VARCHAR(200),
+    tipo_processo_cor VARCHAR(7),
+    setor_atual_id INTEGER,
+    setor_atual VARCHAR(200),
+    setor_atual_sigla VARCHAR(20),
+    criado_por INTEGER,
+    criado_por_nome VARCHAR(200),
+    criado_por_email VARCHAR(255),
+    usuario_responsavel_id INTEGER,
+    responsavel_nome VARCHAR(200),
+    responsavel_email VARCHAR(255),
+    total_documentos INTEGER NOT NULL DEFAULT 0, -- documentos ativos
+    total_tramitacoes INTEGER NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP
+);
+
 -- Índices para performance
 CREATE INDEX idx_processos_numero ON processos(numero_protocolo);
 CREATE INDEX idx_processos_status ON processos(status);
@@ -228,10 +287,25 @@ CREATE INDEX idx_processos_data_autuacao ON processos(data_autuacao);
 CREATE INDEX idx_tramitacoes_processo ON tramitacoes(processo_id);
 CREATE INDEX idx_tramitacoes_setor_destino ON tramitacoes(setor_destino_id);
 CREATE INDEX idx_tramitacoes_data_envio ON tramitacoes(data_envio);
+CREATE INDEX idx_tramitacoes_setor_processo ON tramitacoes(setor_destino_id, processo_id);
+
+-- Caixa de entrada (processos_relevantes): cada ramo percorre um índice na
+-- ordem da página. Ramo "criados pelo usuário":
+CREATE INDEX idx_processos_criado_por_criado_em ON processos(criado_por, criado_em DESC, id DESC);
+CREATE INDEX idx_processos_criado_por_atualizado_em ON processos(criado_por, atualizado_em DESC, id DESC);
+CREATE INDEX idx_processos_criado_por_autuacao ON processos(criado_por, data_autuacao DESC, id DESC);
+-- Ramo "tramitados para o setor": processos na ordem da página, cada um
+-- conferido em tramitacoes por (processo_id, setor_destino_id)
+CREATE INDEX idx_processos_criado_em ON processos(criado_em DESC, id DESC);
+CREATE INDEX idx_processos_atualizado_em ON processos(atualizado_em DESC, id DESC);
+CREATE INDEX idx_processos_autuacao_id ON processos(data_autuacao DESC, id DESC);
+CREATE INDEX idx_tramitacoes_processo_setor ON tramitacoes(processo_id, setor_destino_id);
 
 CREATE INDEX idx_documentos_processo ON documentos(processo_id);
 CREATE INDEX idx_documentos_tipo ON documentos(tipo_documento);
 CREATE INDEX idx_documentos_status ON documentos(status);
+CREATE INDEX idx_documentos_pendentes_assinatura ON documentos(processo_id)
+    WHERE requer_assinatura AND NOT assinado AND status = 'ativo';
 
 CREATE INDEX idx_aprovacoes_aprovador ON aprovacoes(aprovador_id);
 CREATE INDEX idx_aprovacoes_status ON aprovacoes(status);
@@ -241,35 +315,110 @@ CREATE INDEX idx_aprovacoes_processo ON aprovacoes(processo_id);
 CREATE INDEX idx_assinaturas_documento ON assinaturas(documento_id);
 CREATE INDEX idx_assinaturas_usuario ON assinaturas(usuario_id);
 
+-- Listagens a partir de processos_resumo: keyset por (data_autuacao, id)
+CREATE INDEX idx_processos_resumo_autuacao ON processos_resumo(data_autuacao DESC, id DESC);
+CREATE INDEX idx_processos_resumo_setor ON processos_resumo(setor_atual_id, data_autuacao DESC, id DESC);
+CREATE INDEX idx_processos_resumo_criado_por ON processos_resumo(criado_por, data_autuacao DESC, id DESC);
+CREATE INDEX idx_processos_resumo_status ON processos_resumo(status, data_autuacao DESC, id DESC);
+
+-- ==================== BUSCA TEXTUAL ====================
+-- Full-text em português (com stemming, sem acentos) + trigramas para busca
+-- aproximada e para os filtros ILIKE '%termo%' de listar_processos
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public;
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public;
+
+-- unaccent() não é IMMUTABLE; o wrapper permite usá-lo em índices
+CREATE OR REPLACE FUNCTION f_unaccent(TEXT)
+RETURNS TEXT AS $$
+    SELECT public.unaccent('public.unaccent'::regdictionary, $1);
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+DROP TEXT SEARCH CONFIGURATION IF EXISTS portugues_sem_acento CASCADE;
+CREATE TEXT SEARCH CONFIGURATION portugues_sem_acento (COPY = portuguese);
+ALTER TEXT SEARCH CONFIGURATION portugues_sem_acento
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+
+-- Documento de busca do processo (pesos: protocolo/assunto > interessado > especificação)
+CREATE OR REPLACE FUNCTION processo_tsvector(
+    p_numero_protocolo TEXT, p_assunto TEXT, p_interessado TEXT, p_especificacao TEXT
+)
+RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('portugues_sem_acento', COALESCE(p_numero_protocolo, '')), 'A')
+        || setweight(to_tsvector('portugues_sem_acento', COALESCE(p_assunto, '')), 'A')
+        || setweight(to_tsvector('portugues_sem_acento', COALESCE(p_interessado, '')), 'B')
+        || setweight(to_tsvector('portugues_sem_acento', COALESCE(p_especificacao, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Texto normalizado para a busca aproximada (erros de digitação, nomes parciais)
+CREATE OR REPLACE FUNCTION processo_texto_busca(p_assunto TEXT, p_interessado TEXT)
+RETURNS TEXT AS $$
+    SELECT f_unaccent(lower(COALESCE(p_assunto, '') || ' ' || COALESCE(p_interessado, '')));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE INDEX IF NOT EXISTS idx_processos_busca_tsv ON processos
+    USING GIN (processo_tsvector(numero_protocolo, assunto, interessado, especificacao));
+CREATE INDEX IF NOT EXISTS idx_processos_busca_trgm ON processos
+    USING GIN (processo_texto_busca(assunto, interessado) gin_trgm_ops);
+
+-- Permitem usar índice nos filtros ILIKE '%termo%' de listar_processos
+CREATE INDEX IF NOT EXISTS idx_processos_numero_trgm ON processos USING GIN (numero_protocolo gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_assunto_trgm ON processos USING GIN (assunto gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_interessado_trgm ON processos USING GIN (interessado gin_trgm_ops);
+
+-- Os mesmos filtros nas listagens a partir de processos_resumo
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_numero_trgm ON processos_resumo USING GIN (numero_protocolo gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_assunto_trgm ON processos_resumo USING GIN (assunto gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_processos_resumo_interessado_trgm ON processos_resumo USING GIN (interessado gin_trgm_ops);
+
+-- Alocação de números de protocolo: um contador por ano, incrementado de forma
+-- atômica (O(1), sem varrer processos). Usado pela API e pelo trigger abaixo.
+CREATE OR REPLACE FUNCTION reservar_protocolos(p_ano INTEGER, p_quantidade INTEGER DEFAULT 1)
+RETURNS INTEGER AS $$
+    -- Reserva p_quantidade números consecutivos e retorna o primeiro deles
+    INSERT INTO protocolo_sequencias (ano, ultimo_numero)
+    VALUES (p_ano, p_quantidade)
+    ON CONFLICT (ano) DO UPDATE
+        SET ultimo_numero = protocolo_sequencias.ultimo_numero + EXCLUDED.ultimo_numero
+    RETURNING ultimo_numero - p_quantidade + 1;
+$$ LANGUAGE sql VOLATILE;
+
+-- Dígito verificador (módulo 11, pesos 2 a 9 da direita para a esquerda)
+CREATE OR REPLACE FUNCTION digito_verificador_protocolo(p_ano INTEGER, p_sequencial INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    digitos TEXT := p_ano::TEXT || LPAD(p_sequencial::TEXT, GREATEST(6, LENGTH(p_sequencial::TEXT)), '0');
+    soma INTEGER := 0;
+    peso INTEGER := 2;
+    resto INTEGER;
+BEGIN
+    FOR i IN REVERSE LENGTH(digitos)..1 LOOP
+        soma := soma + SUBSTRING(digitos FROM i FOR 1)::INTEGER * peso;
+        peso := CASE WHEN peso = 9 THEN 2 ELSE peso + 1 END;
+    END LOOP;
+    
+    resto := 11 - (soma % 11);
+    RETURN CASE WHEN resto >= 10 THEN 0 ELSE resto END;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Formato: AAAA.CBB.NNNNNN-D (onde D é o dígito verificador)
+CREATE OR REPLACE FUNCTION formatar_protocolo(p_ano INTEGER, p_sequencial INTEGER)
+RETURNS VARCHAR AS $$
+    SELECT p_ano || '.CBB.'
+        || LPAD(p_sequencial::TEXT, GREATEST(6, LENGTH(p_sequencial::TEXT)), '0')
+        || '-' || digito_verificador_protocolo(p_ano, p_sequencial);
+$$ LANGUAGE sql IMMUTABLE;
+
 -- Função para gerar número de protocolo automático
 CREATE OR REPLACE FUNCTION gerar_numero_protocolo()
 RETURNS TRIGGER AS $$
 DECLARE
     ano_atual INTEGER;
-    sequencial INTEGER;
-    novo_protocolo VARCHAR(50);
 BEGIN
     ano_atual := EXTRACT(YEAR FROM NOW());
     
-    -- Buscar o último sequencial do ano
-    SELECT COALESCE(MAX(
-        CAST(
-            SUBSTRING(numero_protocolo FROM '\d{4}\.CBB\.(\d+)-\d') 
-            AS INTEGER
-        )
-    ), 0) + 1
-    INTO sequencial
-    FROM processos
-    WHERE ano = ano_atual;
-    
-    -- Formato: AAAA.CBB.NNNNNN-D (onde D é o dígito verificador)
-    novo_protocolo := ano_atual || '.CBB.' || LPAD(sequencial::TEXT, 6, '0');
-    
-    -- Calcular dígito verificador simples (módulo 11)
-    -- Simplificado: usar último dígito do sequencial
-    novo_protocolo := novo_protocolo || '-' || (sequencial % 10)::TEXT;
-    
-    NEW.numero_protocolo := novo_protocolo;
+    NEW.numero_protocolo := formatar_protocolo(ano_atual, reservar_protocolos(ano_atual, 1));
     NEW.ano := ano_atual;
     
     RETURN NEW;
@@ -303,6 +452,606 @@ CREATE TRIGGER trigger_atualizar_documento
     FOR EACH ROW
     EXECUTE FUNCTION atualizar_data_modificacao();
 
+-- ==================== RESUMO DOS PROCESSOS (processos_resumo) ====================
+-- Triggers por comando (FOR EACH STATEMENT com tabelas de transição): inserções e
+-- atualizações em lote (importação, tramitação em lote) ajustam o resumo com um
+-- único comando, sem trabalho por linha.
+
+-- Copia os dados do processo e os nomes de tipo, setor e usuários
+CREATE OR REPLACE FUNCTION sincronizar_processos_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO processos_resumo (
+        id, numero_protocolo, assunto, interessado, status, nivel_acesso, prioridade,
+        data_autuacao, data_conclusao, prazo_dias, data_prazo,
+        tipo_processo_id, tipo_processo, tipo_processo_cor,
+        setor_atual_id, setor_atual, setor_atual_sigla,
+        criado_por, criado_por_nome, criado_por_email,
+        usuario_responsavel_id, responsavel_nome, responsavel_email,
+        atualizado_em
+    )
+    SELECT
+        p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.nivel_acesso, p.prioridade,
+        p.data_autuacao, p.data_conclusao, p.prazo_dias, p.data_prazo,
+        p.tipo_processo_id, tp.nome, tp.cor,
+        p.setor_atual_id, sa.nome, sa.sigla,
+        p.criado_por, uc.nome, uc.email,
+        p.usuario_responsavel_id, ur.nome, ur.email,
+        p.atualizado_em
+    FROM novos p
+    LEFT JOIN tipos_processo tp ON tp.id = p.tipo_processo_id
+    LEFT JOIN setores sa ON sa.id = p.setor_atual_id
+    LEFT JOIN usuarios uc ON uc.id = p.criado_por
+    LEFT JOIN usuarios ur ON ur.id = p.usuario_responsavel_id
+    ON CONFLICT (id) DO UPDATE SET
+        numero_protocolo = EXCLUDED.numero_protocolo,
+        assunto = EXCLUDED.assunto,
+        interessado = EXCLUDED.interessado,
+        status = EXCLUDED.status,
+        nivel_acesso = EXCLUDED.nivel_acesso,
+        prioridade = EXCLUDED.prioridade,
+        data_autuacao = EXCLUDED.data_autuacao,
+        data_conclusao = EXCLUDED.data_conclusao,
+        prazo_dias = EXCLUDED.prazo_dias,
+        data_prazo = EXCLUDED.data_prazo,
+        tipo_processo_id = EXCLUDED.tipo_processo_id,
+        tipo_processo = EXCLUDED.tipo_processo,
+        tipo_processo_cor = EXCLUDED.tipo_processo_cor,
+        setor_atual_id = EXCLUDED.setor_atual_id,
+        setor_atual = EXCLUDED.setor_atual,
+        setor_atual_sigla = EXCLUDED.setor_atual_sigla,
+        criado_por = EXCLUDED.criado_por,
+        criado_por_nome = EXCLUDED.criado_por_nome,
+        criado_por_email = EXCLUDED.criado_por_email,
+        usuario_responsavel_id = EXCLUDED.usuario_responsavel_id,
+        responsavel_nome = EXCLUDED.responsavel_nome,
+        responsavel_email = EXCLUDED.responsavel_email,
+        atualizado_em = EXCLUDED.atualizado_em;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_processo_insert
+    AFTER INSERT ON processos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sincronizar_processos_resumo();
+
+CREATE TRIGGER trigger_resumo_processo_update
+    AFTER UPDATE ON processos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION sincronizar_processos_resumo();
+
+-- Contador de documentos ativos por processo
+CREATE OR REPLACE FUNCTION contar_documentos_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE processos_resumo r SET total_documentos = r.total_documentos + d.delta
+        FROM (
+            SELECT processo_id, COUNT(*) AS delta FROM novos WHERE status = 'ativo' GROUP BY processo_id
+        ) d
+        WHERE r.id = d.processo_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE processos_resumo r SET total_documentos = r.total_documentos - d.delta
+        FROM (
+            SELECT processo_id, COUNT(*) AS delta FROM antigos WHERE status = 'ativo' GROUP BY processo_id
+        ) d
+        WHERE r.id = d.processo_id;
+    ELSE
+        -- Mudança de status (ex.: cancelamento) ou de processo
+        UPDATE processos_resumo r SET total_documentos = r.total_documentos + d.delta
+        FROM (
+            SELECT processo_id, SUM(delta) AS delta
+            FROM (
+                SELECT processo_id, 1 AS delta FROM novos WHERE status = 'ativo'
+                UNION ALL
+                SELECT processo_id, -1 FROM antigos WHERE status = 'ativo'
+            ) mudancas
+            GROUP BY processo_id
+            HAVING SUM(delta) <> 0
+        ) d
+        WHERE r.id = d.processo_id;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_documento_insert
+    AFTER INSERT ON documentos
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_documentos_resumo();
+
+CREATE TRIGGER trigger_resumo_documento_update
+    AFTER UPDATE ON documentos
+    REFERENCING OLD TABLE AS antigos NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_documentos_resumo();
+
+CREATE TRIGGER trigger_resumo_documento_delete
+    AFTER DELETE ON documentos
+    REFERENCING OLD TABLE AS antigos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_documentos_resumo();
+
+-- Contador de tramitações por processo
+CREATE OR REPLACE FUNCTION contar_tramitacoes_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE processos_resumo r SET total_tramitacoes = r.total_tramitacoes + t.delta
+        FROM (SELECT processo_id, COUNT(*) AS delta FROM novos GROUP BY processo_id) t
+        WHERE r.id = t.processo_id;
+    ELSE
+        UPDATE processos_resumo r SET total_tramitacoes = r.total_tramitacoes - t.delta
+        FROM (SELECT processo_id, COUNT(*) AS delta FROM antigos GROUP BY processo_id) t
+        WHERE r.id = t.processo_id;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_tramitacao_insert
+    AFTER INSERT ON tramitacoes
+    REFERENCING NEW TABLE AS novos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_tramitacoes_resumo();
+
+CREATE TRIGGER trigger_resumo_tramitacao_delete
+    AFTER DELETE ON tramitacoes
+    REFERENCING OLD TABLE AS antigos
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION contar_tramitacoes_resumo();
+
+-- Renomear setor, tipo de processo ou usuário atualiza os nomes copiados
+CREATE OR REPLACE FUNCTION propagar_nomes_resumo()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'setores' THEN
+        UPDATE processos_resumo SET setor_atual = NEW.nome, setor_atual_sigla = NEW.sigla
+        WHERE setor_atual_id = NEW.id;
+    ELSIF TG_TABLE_NAME = 'tipos_processo' THEN
+        UPDATE processos_resumo SET tipo_processo = NEW.nome, tipo_processo_cor = NEW.cor
+        WHERE tipo_processo_id = NEW.id;
+    ELSE
+        UPDATE processos_resumo SET criado_por_nome = NEW.nome, criado_por_email = NEW.email
+        WHERE criado_por = NEW.id;
+        UPDATE processos_resumo SET responsavel_nome = NEW.nome, responsavel_email = NEW.email
+        WHERE usuario_responsavel_id = NEW.id;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_resumo_setor
+    AFTER UPDATE OF nome, sigla ON setores
+    FOR EACH ROW
+    WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.sigla IS DISTINCT FROM NEW.sigla)
+    EXECUTE FUNCTION propagar_nomes_resumo();
+
+CREATE TRIGGER trigger_resumo_tipo_processo
+    AFTER UPDATE OF nome, cor ON tipos_processo
+    FOR EACH ROW
+    WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.cor IS DISTINCT FROM NEW.cor)
+    EXECUTE FUNCTION propagar_nomes_resumo();
+
+-- usuarios é atualizado a cada login (ultimo_acesso): só dispara se nome/email mudarem
+CREATE TRIGGER trigger_resumo_usuario
+    AFTER UPDATE OF nome, email ON usuarios
+    FOR EACH ROW
+    WHEN (OLD.nome IS DISTINCT FROM NEW.nome OR OLD.email IS DISTINCT FROM NEW.email)
+    EXECUTE FUNCTION propagar_nomes_resumo();
+
+-- ==================== FUNÇÕES RPC (chamadas via supabase.rpc) ====================
+
+-- Estatísticas do dashboard em um único round trip (ProcessoService.get_dashboard_stats)
+CREATE OR REPLACE FUNCTION dashboard_stats(p_usuario_id INTEGER, p_setor_id INTEGER DEFAULT NULL)
+RETURNS TABLE (
+    total_processos BIGINT,
+    processos_abertos BIGINT,
+    processos_em_tramite BIGINT,
+    processos_concluidos BIGINT,
+    meus_processos BIGINT,
+    processos_meu_setor BIGINT,
+    pendentes_aprovacao BIGINT,
+    pendentes_assinatura BIGINT
+) AS $$
+    SELECT
+        p.total_processos,
+        p.processos_abertos,
+        p.processos_em_tramite,
+        p.processos_concluidos,
+        p.meus_processos,
+        p.processos_meu_setor,
+        a.pendentes_aprovacao,
+        s.pendentes_assinatura
+    FROM (
+        SELECT
+            COUNT(*) AS total_processos,
+            COUNT(*) FILTER (WHERE status = 'aberto') AS processos_abertos,
+            COUNT(*) FILTER (WHERE status = 'em_tramite') AS processos_em_tramite,
+            COUNT(*) FILTER (WHERE status = 'concluido') AS processos_concluidos,
+            COUNT(*) FILTER (WHERE criado_por = p_usuario_id) AS meus_processos,
+            COUNT(*) FILTER (WHERE setor_atual_id = p_setor_id) AS processos_meu_setor
+        FROM processos
+    ) p
+    CROSS JOIN (
+        SELECT COUNT(*) AS pendentes_aprovacao
+        FROM aprovacoes
+        WHERE aprovador_id = p_usuario_id AND status = 'pendente'
+    ) a
+    CROSS JOIN (
+        -- Documentos dos processos que estão no meu setor e aguardam assinatura
+        SELECT COUNT(*) AS pendentes_assinatura
+        FROM documentos d
+        JOIN processos pr ON pr.id = d.processo_id
+        WHERE pr.setor_atual_id = p_setor_id
+          AND d.requer_assinatura
+          AND NOT d.assinado
+          AND d.status = 'ativo'
+    ) s;
+$$ LANGUAGE sql STABLE;
+
+-- Escapa o texto para HTML (os destaques da busca são exibidos como HTML)
+CREATE OR REPLACE FUNCTION f_escapar_html(TEXT)
+RETURNS TEXT AS $$
+    SELECT replace(replace(replace(replace(replace($1,
+        '&', '&amp;'), '<', '&lt;'), '>', '&gt;'), '"', '&quot;'), '''', '&#x27;');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+-- Escapa os curingas do LIKE/ILIKE (escape padrão: barra invertida)
+CREATE OR REPLACE FUNCTION f_escapar_like(TEXT)
+RETURNS TEXT AS $$
+    SELECT replace(replace(replace($1, '\', '\\'), '%', '\%'), '_', '\_');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+-- Busca ranqueada de processos com trechos destacados (GET /api/processos/busca)
+CREATE OR REPLACE FUNCTION buscar_processos(p_termo TEXT, p_limite INTEGER DEFAULT 20, p_offset INTEGER DEFAULT 0)
+RETURNS TABLE (
+    id INTEGER,
+    numero_protocolo VARCHAR,
+    assunto TEXT,
+    interessado VARCHAR,
+    status VARCHAR,
+    prioridade VARCHAR,
+    tipo_processo_id INTEGER,
+    setor_atual_id INTEGER,
+    data_autuacao TIMESTAMP,
+    relevancia REAL,
+    destaque_assunto TEXT,
+    destaque_interessado TEXT
+) AS $$
+    WITH consulta AS (
+        SELECT
+            websearch_to_tsquery('portugues_sem_acento', p_termo) AS q,
+            f_unaccent(lower(p_termo)) AS texto
+    ),
+    encontrados AS (
+        -- Primeiro só ids e relevância (usa os índices GIN); o destaque,
+        -- mais caro, é calculado apenas para a página retornada
+        SELECT
+            p.id,
+            (ts_rank_cd(processo_tsvector(p.numero_protocolo, p.assunto, p.interessado, p.especificacao), c.q)
+                + word_similarity(c.texto, processo_texto_busca(p.assunto, p.interessado)))::REAL AS relevancia
+        FROM processos p, consulta c
+        WHERE processo_tsvector(p.numero_protocolo, p.assunto, p.interessado, p.especificacao) @@ c.q
+           OR c.texto <% processo_texto_busca(p.assunto, p.interessado)
+           OR p.numero_protocolo ILIKE '%' || f_escapar_like(p_termo) || '%'
+        ORDER BY relevancia DESC, p.id DESC
+        LIMIT p_limite OFFSET p_offset
+    )
+    SELECT
+        p.id,
+        p.numero_protocolo,
+        p.assunto,
+        p.interessado,
+        p.status,
+        p.prioridade,
+        p.tipo_processo_id,
+        p.setor_atual_id,
+        p.data_autuacao,
+        e.relevancia,
+        -- Texto escapado antes de receber as marcas: o destaque é HTML seguro
+        ts_headline('portugues_sem_acento', f_escapar_html(p.assunto), c.q,
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true'),
+        ts_headline('portugues_sem_acento', f_escapar_html(COALESCE(p.interessado, '')), c.q,
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true')
+    FROM encontrados e
+    JOIN processos p ON p.id = e.id
+    CROSS JOIN consulta c
+    ORDER BY e.relevancia DESC, p.id DESC;
+$$ LANGUAGE sql STABLE;
+
+-- Registra mais uma referência a um blob existente (sem criá-lo).
+-- Nenhuma linha retornada: o conteúdo é novo e precisa ser gravado
+CREATE OR REPLACE FUNCTION referenciar_blob(p_hash VARCHAR)
+RETURNS TABLE (caminho TEXT, url TEXT) AS $$
+    UPDATE blobs SET referencias = referencias + 1
+    WHERE hash = p_hash
+    RETURNING blobs.caminho, blobs.url;
+$$ LANGUAGE sql VOLATILE;
+
+-- Registra o blob depois de o arquivo ter sido gravado em p_caminho.
+-- novo = false indica que outro upload do mesmo conteúdo registrou o blob
+-- antes: a referência foi contada no existente e o arquivo em p_caminho sobra
+CREATE OR REPLACE FUNCTION reservar_blob(
+    p_hash VARCHAR, p_caminho TEXT, p_url TEXT, p_tamanho BIGINT, p_tipo VARCHAR
+)
+RETURNS TABLE (caminho TEXT, url TEXT, novo BOOLEAN) AS $$
+    INSERT INTO blobs (hash, caminho, url, tamanho, tipo, referencias)
+    VALUES (p_hash, p_caminho, p_url, p_tamanho, p_tipo, 1)
+    ON CONFLICT (hash) DO UPDATE SET referencias = blobs.referencias + 1
+    RETURNING blobs.caminho, blobs.url, (xmax = 0);
+$$ LANGUAGE sql VOLATILE;
+
+-- Remove uma referência; ao chegar a zero apaga o registro e retorna o
+-- caminho do arquivo para a API removê-lo do armazenamento
+CREATE OR REPLACE FUNCTION liberar_blob(p_hash VARCHAR, p_url TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    v_referencias INTEGER;
+    v_caminho TEXT;
+BEGIN
+    UPDATE blobs SET referencias = referencias - 1
+    WHERE hash = p_hash AND url = p_url
+    RETURNING referencias, caminho INTO v_referencias, v_caminho;
+    
+    IF v_referencias IS NOT NULL AND v_referencias <= 0 THEN
+        DELETE FROM blobs WHERE hash = p_hash;
+        RETURN v_caminho;
+    END IF;
+    
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Aplica a nova ordem da árvore de documentos em um único UPDATE (a posição no
+-- array vira documentos.ordem). Se algum id não pertence ao processo, nada é
+-- alterado e os ids inválidos são retornados.
+CREATE OR REPLACE FUNCTION reordenar_documentos(p_processo_id INTEGER, p_ids INTEGER[])
+RETURNS TABLE (atualizados INTEGER, invalidos INTEGER[]) AS $$
+DECLARE
+    v_invalidos INTEGER[];
+    v_atualizados INTEGER;
+BEGIN
+    SELECT COALESCE(array_agg(i.id), '{}') INTO v_invalidos
+    FROM unnest(p_ids) AS i(id)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM documentos d WHERE d.id = i.id AND d.processo_id = p_processo_id
+    );
+    
+    IF cardinality(v_invalidos) > 0 THEN
+        RETURN QUERY SELECT 0, v_invalidos;
+        RETURN;
+    END IF;
+    
+    UPDATE documentos d SET ordem = n.posicao - 1
+    FROM unnest(p_ids) WITH ORDINALITY AS n(id, posicao)
+    WHERE d.id = n.id AND d.processo_id = p_processo_id;
+    
+    GET DIAGNOSTICS v_atualizados = ROW_COUNT;
+    RETURN QUERY SELECT v_atualizados, v_invalidos;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Caixa de entrada (GET /api/processos-relevantes): processos criados pelo
+-- usuário ou tramitados para o setor dele, em uma única consulta paginada
+-- por cursor (p_cursor_valor, p_cursor_id) sobre (p_ordenar, id)
+CREATE OR REPLACE FUNCTION processos_relevantes(
+    p_usuario_id INTEGER,
+    p_setor_id INTEGER,
+    p_status VARCHAR[] DEFAULT NULL,
+    p_ordenar TEXT DEFAULT 'criado_em',
+    p_crescente BOOLEAN DEFAULT false,
+    p_cursor_valor TIMESTAMP DEFAULT NULL,
+    p_cursor_id INTEGER DEFAULT NULL,
+    p_limite INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id INTEGER,
+    numero_protocolo VARCHAR,
+    assunto TEXT,
+    interessado VARCHAR,
+    status VARCHAR,
+    prioridade VARCHAR,
+    setor_atual_id INTEGER,
+    data_autuacao TIMESTAMP,
+    criado_em TIMESTAMP,
+    atualizado_em TIMESTAMP
+) AS $$
+DECLARE
+    v_direcao TEXT := CASE WHEN p_crescente THEN 'ASC' ELSE 'DESC' END;
+    v_comparador TEXT := CASE WHEN p_crescente THEN '>' ELSE '<' END;
+BEGIN
+    IF p_ordenar NOT IN ('criado_em', 'atualizado_em', 'data_autuacao') THEN
+        RAISE EXCEPTION 'Ordenação inválida: %', p_ordenar;
+    END IF;
+    
+    -- SQL dinâmico só para a coluna/direção da ordenação (valores via USING).
+    -- Cada ramo já sai ordenado e limitado (percorrendo os índices por
+    -- (criado_por, ordenação, id) e (ordenação, id)): a página está entre as
+    -- $6 primeiras linhas de um dos ramos, sem reunir antes todos os processos
+    -- que o setor já recebeu
+    RETURN QUERY EXECUTE format($sql$
+        SELECT r.* FROM (
+            (SELECT
+                p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.prioridade,
+                p.setor_atual_id, p.data_autuacao, p.criado_em, p.atualizado_em
+            FROM processos p
+            WHERE p.criado_por = $1
+              AND ($3 IS NULL OR p.status = ANY($3))
+              AND ($4 IS NULL OR (p.%1$I, p.id) %2$s ($4, $5))
+            ORDER BY p.%1$I %3$s, p.id %3$s
+            LIMIT $6)
+            UNION
+            (SELECT
+                p.id, p.numero_protocolo, p.assunto, p.interessado, p.status, p.prioridade,
+                p.setor_atual_id, p.data_autuacao, p.criado_em, p.atualizado_em
+            FROM processos p
+            WHERE EXISTS (
+                SELECT 1 FROM tramitacoes t WHERE t.processo_id = p.id AND t.setor_destino_id = $2
+            )
+              AND ($3 IS NULL OR p.status = ANY($3))
+              AND ($4 IS NULL OR (p.%1$I, p.id) %2$s ($4, $5))
+            ORDER BY p.%1$I %3$s, p.id %3$s
+            LIMIT $6)
+        ) r
+        ORDER BY r.%1$I %3$s, r.id %3$s
+        LIMIT $6
+    $sql$, p_ordenar, v_comparador, v_direcao)
+    USING p_usuario_id, p_setor_id, p_status, p_cursor_valor, p_cursor_id, p_limite;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Tramitação em lote (POST /api/processos/tramitar-lote): um único comando
+-- insere as tramitações e atualiza os processos. Processos bloqueados ou
+-- inexistentes ficam de fora e são informados em resultado.
+CREATE OR REPLACE FUNCTION tramitar_processos(
+    p_processo_ids INTEGER[],
+    p_setor_origem_id INTEGER,
+    p_setor_destino_id INTEGER,
+    p_usuario_id INTEGER,
+    p_observacao TEXT DEFAULT NULL,
+    p_tipo_tramitacao VARCHAR DEFAULT 'despacho'
+)
+RETURNS TABLE (processo_id INTEGER, resultado TEXT, tramitacao_id INTEGER) AS $$
+    WITH pedidos AS (
+        SELECT u.id, MIN(u.posicao) AS posicao
+        FROM unnest(p_processo_ids) WITH ORDINALITY AS u(id, posicao)
+        GROUP BY u.id
+    ),
+    alvos AS (
+        SELECT p.id
+        FROM processos p
+        JOIN pedidos pe ON pe.id = p.id
+        WHERE NOT COALESCE(p.bloqueado, false)
+        FOR UPDATE OF p
+    ),
+    inseridas AS (
+        INSERT INTO tramitacoes (processo_id, setor_origem_id, setor_destino_id, observacao, tipo_tramitacao, enviado_por)
+        SELECT a.id, p_setor_origem_id, p_setor_destino_id, p_observacao, p_tipo_tramitacao, p_usuario_id
+        FROM alvos a
+        RETURNING tramitacoes.id, tramitacoes.processo_id
+    ),
+    atualizados AS (
+        UPDATE processos p
+        SET setor_atual_id = p_setor_destino_id, status = 'em_tramite'
+        FROM alvos a
+        WHERE p.id = a.id
+        RETURNING p.id
+    )
+    SELECT
+        pe.id,
+        CASE
+            WHEN i.id IS NOT NULL THEN 'tramitado'
+            WHEN p.id IS NULL THEN 'nao_encontrado'
+            ELSE 'bloqueado'
+        END,
+        i.id
+    FROM pedidos pe
+    LEFT JOIN processos p ON p.id = pe.id
+    LEFT JOIN inseridas i ON i.processo_id = pe.id
+    ORDER BY pe.posicao;
+$$ LANGUAGE sql VOLATILE;
+
+-- Tramitação de um processo em uma transação: registra a tramitação e move o
+-- processo para o setor de destino. Retorna {tramitacao, processo} ou {erro}.
+CREATE OR REPLACE FUNCTION tramitar_processo(
+    p_processo_id INTEGER,
+    p_setor_origem_id INTEGER,
+    p_setor_destino_id INTEGER,
+    p_usuario_id INTEGER,
+    p_observacao TEXT DEFAULT NULL,
+    p_tipo_tramitacao VARCHAR DEFAULT 'despacho'
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_processo processos;
+    v_tramitacao tramitacoes;
+BEGIN
+    SELECT * INTO v_processo FROM processos WHERE id = p_processo_id FOR UPDATE;
+    
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('erro', 'processo_nao_encontrado');
+    END IF;
+    
+    IF v_processo.bloqueado THEN
+        RETURN jsonb_build_object('erro', 'processo_bloqueado');
+    END IF;
+    
+    INSERT INTO tramitacoes (processo_id, setor_origem_id, setor_destino_id, observacao, tipo_tramitacao, enviado_por)
+    VALUES (p_processo_id, p_setor_origem_id, p_setor_destino_id, p_observacao, p_tipo_tramitacao, p_usuario_id)
+    RETURNING * INTO v_tramitacao;
+    
+    UPDATE processos SET setor_atual_id = p_setor_destino_id, status = 'em_tramite'
+    WHERE id = p_processo_id
+    RETURNING * INTO v_processo;
+    
+    RETURN jsonb_build_object('tramitacao', to_jsonb(v_tramitacao), 'processo', to_jsonb(v_processo));
+END;
+$$ LANGUAGE plpgsql;
+
+-- Rejeição pelo setor de destino em uma transação: marca a tramitação como
+-- rejeitada, cria a devolução ao setor de origem e move o processo de volta.
+-- Retorna {tramitacao (a devolução), processo} ou {erro}.
+CREATE OR REPLACE FUNCTION rejeitar_tramitacao(
+    p_tramitacao_id INTEGER,
+    p_usuario_id INTEGER,
+    p_setor_id INTEGER,
+    p_motivo TEXT
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_rejeitada tramitacoes;
+    v_devolucao tramitacoes;
+    v_processo processos;
+BEGIN
+    SELECT * INTO v_rejeitada FROM tramitacoes WHERE id = p_tramitacao_id FOR UPDATE;
+    
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('erro', 'tramitacao_nao_encontrada');
+    END IF;
+    
+    IF v_rejeitada.setor_destino_id IS DISTINCT FROM p_setor_id THEN
+        RETURN jsonb_build_object('erro', 'sem_permissao');
+    END IF;
+    
+    -- O lock acima serializa cliques repetidos: só a primeira rejeição devolve
+    IF v_rejeitada.status_aprovacao = 'rejeitado' THEN
+        RETURN jsonb_build_object('erro', 'tramitacao_ja_rejeitada');
+    END IF;
+    
+    UPDATE tramitacoes SET
+        status_aprovacao = 'rejeitado',
+        aprovado_por = p_usuario_id,
+        data_aprovacao = NOW(),
+        motivo_rejeicao = p_motivo
+    WHERE id = p_tramitacao_id;
+    
+    INSERT INTO tramitacoes (
+        processo_id, setor_origem_id, setor_destino_id, observacao,
+        tipo_tramitacao, enviado_por, status_aprovacao
+    )
+    VALUES (
+        v_rejeitada.processo_id, v_rejeitada.setor_destino_id, v_rejeitada.setor_origem_id,
+        'REJEITADO: ' || p_motivo, 'despacho', p_usuario_id, 'pendente'
+    )
+    RETURNING * INTO v_devolucao;
+    
+    UPDATE processos SET setor_atual_id = v_rejeitada.setor_origem_id, status = 'em_tramite'
+    WHERE id = v_rejeitada.processo_id
+    RETURNING * INTO v_processo;
+    
+    RETURN jsonb_build_object('tramitacao', to_jsonb(v_devolucao), 'processo', to_jsonb(v_processo));
+END;
+$$ LANGUAGE plpgsql;
+
 -- Seeds de dados iniciais
 
 -- Tipos de Processo
@@ -341,35 +1090,31 @@ INSERT INTO usuarios (nome, email, senha_hash, setor_id, cargo, cpf) VALUES
 
 -- Views úteis para consultas
 
--- View: Processos com informações completas
+-- View: Processos com informações completas (lida do resumo mantido por triggers)
 CREATE OR REPLACE VIEW vw_processos_completos AS
 SELECT 
-    p.id,
-    p.numero_protocolo,
-    p.assunto,
-    p.interessado,
-    p.status,
-    p.nivel_acesso,
-    p.prioridade,
-    p.data_autuacao,
-    p.data_conclusao,
-    p.prazo_dias,
-    p.data_prazo,
-    tp.nome as tipo_processo,
-    tp.cor as tipo_processo_cor,
-    sa.nome as setor_atual,
-    sa.sigla as setor_atual_sigla,
-    uc.nome as criado_por_nome,
-    uc.email as criado_por_email,
-    ur.nome as responsavel_nome,
-    ur.email as responsavel_email,
-    (SELECT COUNT(*) FROM documentos WHERE processo_id = p.id AND status = 'ativo') as total_documentos,
-    (SELECT COUNT(*) FROM tramitacoes WHERE processo_id = p.id) as total_tramitacoes
-FROM processos p
-LEFT JOIN tipos_processo tp ON p.tipo_processo_id = tp.id
-LEFT JOIN setores sa ON p.setor_atual_id = sa.id
-LEFT JOIN usuarios uc ON p.criado_por = uc.id
-LEFT JOIN usuarios ur ON p.usuario_responsavel_id = ur.id;
+    id,
+    numero_protocolo,
+    assunto,
+    interessado,
+    status,
+    nivel_acesso,
+    prioridade,
+    data_autuacao,
+    data_conclusao,
+    prazo_dias,
+    data_prazo,
+    tipo_processo,
+    tipo_processo_cor,
+    setor_atual,
+    setor_atual_sigla,
+    criado_por_nome,
+    criado_por_email,
+    responsavel_nome,
+    responsavel_email,
+    total_documentos,
+    total_tramitacoes
+FROM processos_resumo;
 
 -- View: Documentos com informações completas
 CREATE OR REPLACE VIEW vw_documentos_completos AS
@@ -428,6 +1173,7 @@ LEFT JOIN processos p ON t.processo_id = p.id;
 
 -- Comentários nas tabelas
 COMMENT ON TABLE processos IS 'Processos eletrônicos da CBB';
+COMMENT ON TABLE processos_resumo IS 'Resumo dos processos para listagens (mantido por triggers)';
 COMMENT ON TABLE documentos IS 'Documentos anexados aos processos';
 COMMENT ON TABLE tramitacoes IS 'Histórico de tramitação dos processos';
 COMMENT ON TABLE aprovacoes IS 'Workflow de aprovações';
@@ -0,0 +1,287 @@
+-- Schema SQLite para o backend local (Settings.banco_backend = "sqlite")
+-- Mesmas tabelas e colunas de schema.sql, para rodar a API e os benchmarks
+-- sem um projeto Supabase. Diferenças em relação ao Postgres:
+--   * BOOLEAN é guardado como 0/1 e TIMESTAMP como texto ISO 8601;
+--   * agora() é registrada pelo backend (backend/app/database_sqlite.py), que
+--     também faz o papel dos triggers de protocolo e de atualizado_em;
+--   * processos_resumo é uma view (no Postgres é uma tabela mantida por triggers);
+--   * as funções RPC (dashboard_stats, tramitar_processo...) estão em Python
+--     no backend, sobre estas tabelas.
+
+-- Tipos de Processo
+CREATE TABLE IF NOT EXISTS tipos_processo (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(200) NOT NULL,
+    descricao TEXT,
+    cor VARCHAR(7) DEFAULT '#3B82F6',
+    ativo BOOLEAN DEFAULT 1,
+    criado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Setores
+CREATE TABLE IF NOT EXISTS setores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(200) NOT NULL,
+    sigla VARCHAR(20) NOT NULL UNIQUE,
+    descricao TEXT,
+    email VARCHAR(255),
+    responsavel VARCHAR(200),
+    ativo BOOLEAN DEFAULT 1,
+    criado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Usuários
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nome VARCHAR(200) NOT NULL,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    senha_hash VARCHAR(255) NOT NULL,
+    setor_id INTEGER REFERENCES setores(id),
+    cargo VARCHAR(100),
+    cpf VARCHAR(14),
+    telefone VARCHAR(20),
+    foto_url TEXT,
+    ativo BOOLEAN DEFAULT 1,
+    ultimo_acesso TIMESTAMP,
+    criado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Processos
+CREATE TABLE IF NOT EXISTS processos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    numero_protocolo VARCHAR(50) NOT NULL UNIQUE,
+    ano INTEGER NOT NULL,
+    tipo_processo_id INTEGER NOT NULL REFERENCES tipos_processo(id),
+    assunto TEXT NOT NULL,
+    interessado VARCHAR(200),
+    cpf_cnpj_interessado VARCHAR(18),
+    especificacao TEXT,
+    status VARCHAR(50) DEFAULT 'aberto',
+    nivel_acesso VARCHAR(20) DEFAULT 'publico',
+    prioridade VARCHAR(20) DEFAULT 'normal',
+    setor_atual_id INTEGER REFERENCES setores(id),
+    usuario_responsavel_id INTEGER REFERENCES usuarios(id),
+    observacoes TEXT,
+    data_autuacao TIMESTAMP NOT NULL DEFAULT (agora()),
+    data_conclusao TIMESTAMP,
+    prazo_dias INTEGER,
+    data_prazo TIMESTAMP,
+    criado_por INTEGER NOT NULL REFERENCES usuarios(id),
+    criado_em TIMESTAMP NOT NULL DEFAULT (agora()),
+    atualizado_em TIMESTAMP NOT NULL DEFAULT (agora()),
+    bloqueado BOOLEAN DEFAULT 0,
+    motivo_bloqueio TEXT,
+    bloqueado_por INTEGER REFERENCES usuarios(id),
+    bloqueado_em TIMESTAMP
+);
+
+-- Contador de protocolos por ano (ver reservar_protocolos)
+CREATE TABLE IF NOT EXISTS protocolo_sequencias (
+    ano INTEGER PRIMARY KEY,
+    ultimo_numero INTEGER NOT NULL DEFAULT 0
+);
+
+-- Tramitações
+CREATE TABLE IF NOT EXISTS tramitacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    processo_id INTEGER NOT NULL REFERENCES processos(id),
+    setor_origem_id INTEGER NOT NULL REFERENCES setores(id),
+    setor_destino_id INTEGER NOT NULL REFERENCES setores(id),
+    observacao TEXT,
+    tipo_tramitacao VARCHAR(50) DEFAULT 'normal',
+    data_envio TIMESTAMP DEFAULT (agora()),
+    data_recebimento TIMESTAMP,
+    recebido_por INTEGER REFERENCES usuarios(id),
+    status_aprovacao VARCHAR(20) DEFAULT 'pendente',
+    aprovado_por INTEGER REFERENCES usuarios(id),
+    data_aprovacao TIMESTAMP,
+    motivo_rejeicao TEXT,
+    enviado_por INTEGER NOT NULL REFERENCES usuarios(id),
+    criado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Documentos
+CREATE TABLE IF NOT EXISTS documentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    processo_id INTEGER NOT NULL REFERENCES processos(id),
+    numero_documento VARCHAR(50),
+    tipo_documento VARCHAR(50) NOT NULL,
+    nome VARCHAR(255) NOT NULL,
+    descricao TEXT,
+    arquivo_url TEXT,
+    arquivo_nome VARCHAR(255),
+    arquivo_tamanho BIGINT,
+    arquivo_tipo VARCHAR(100),
+    arquivo_hash VARCHAR(64),
+    conteudo_html TEXT,
+    data_documento DATE,
+    numero_externo VARCHAR(100),
+    remetente VARCHAR(200),
+    ordem INTEGER DEFAULT 0,
+    nivel_acesso VARCHAR(20) DEFAULT 'publico',
+    status VARCHAR(50) DEFAULT 'ativo',
+    motivo_cancelamento TEXT,
+    cancelado_por INTEGER REFERENCES usuarios(id),
+    cancelado_em TIMESTAMP,
+    requer_assinatura BOOLEAN DEFAULT 0,
+    assinado BOOLEAN DEFAULT 0,
+    criado_por INTEGER NOT NULL REFERENCES usuarios(id),
+    criado_em TIMESTAMP DEFAULT (agora()),
+    atualizado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Arquivos armazenados por conteúdo (SHA-256)
+CREATE TABLE IF NOT EXISTS blobs (
+    hash VARCHAR(64) PRIMARY KEY,
+    caminho TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tamanho BIGINT NOT NULL,
+    tipo VARCHAR(100),
+    referencias INTEGER NOT NULL DEFAULT 0,
+    criado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Aprovações (Workflow)
+CREATE TABLE IF NOT EXISTS aprovacoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    documento_id INTEGER REFERENCES documentos(id),
+    processo_id INTEGER REFERENCES processos(id),
+    tipo_aprovacao VARCHAR(50) NOT NULL,
+    aprovador_id INTEGER NOT NULL REFERENCES usuarios(id),
+    nivel_aprovacao INTEGER DEFAULT 1,
+    status VARCHAR(50) DEFAULT 'pendente',
+    observacao TEXT,
+    data_solicitacao TIMESTAMP DEFAULT (agora()),
+    data_resposta TIMESTAMP,
+    solicitado_por INTEGER NOT NULL REFERENCES usuarios(id),
+    criado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Assinaturas
+CREATE TABLE IF NOT EXISTS assinaturas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    documento_id INTEGER NOT NULL REFERENCES documentos(id),
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+    nome_assinante VARCHAR(200) NOT NULL,
+    cpf_assinante VARCHAR(14),
+    cargo_funcao VARCHAR(200),
+    tipo_assinatura VARCHAR(50) DEFAULT 'eletronica',
+    hash_documento VARCHAR(64) NOT NULL,
+    hash_assinatura VARCHAR(255),
+    certificado_digital TEXT,
+    ip_assinante VARCHAR(45),
+    localizacao TEXT,
+    valido BOOLEAN DEFAULT 1,
+    motivo_invalidacao TEXT,
+    assinado_em TIMESTAMP DEFAULT (agora())
+);
+
+-- Resumo para listagens: no SQLite é calculado na consulta
+CREATE VIEW IF NOT EXISTS processos_resumo AS
+SELECT
+    p.id,
+    p.numero_protocolo,
+    p.assunto,
+    p.interessado,
+    p.status,
+    p.nivel_acesso,
+    p.prioridade,
+    p.data_autuacao,
+    p.data_conclusao,
+    p.prazo_dias,
+    p.data_prazo,
+    p.tipo_processo_id,
+    tp.nome AS tipo_processo,
+    tp.cor AS tipo_processo_cor,
+    p.setor_atual_id,
+    s.nome AS setor_atual,
+    s.sigla AS setor_atual_sigla,
+    p.criado_por,
+    u.nome AS criado_por_nome,
+    u.email AS criado_por_email,
+    p.usuario_responsavel_id,
+    r.nome AS responsavel_nome,
+    r.email AS responsavel_email,
+    (SELECT COUNT(*) FROM documentos d WHERE d.processo_id = p.id AND d.status = 'ativo') AS total_documentos,
+    (SELECT COUNT(*) FROM tramitacoes t WHERE t.processo_id = p.id) AS total_tramitacoes,
+    p.atualizado_em
+FROM processos p
+LEFT JOIN tipos_processo tp ON tp.id = p.tipo_processo_id
+LEFT JOIN setores s ON s.id = p.setor_atual_id
+LEFT JOIN usuarios u ON u.id = p.criado_por
+LEFT JOIN usuarios r ON r.id = p.usuario_responsavel_id;
+
+-- Índices (os mesmos de schema.sql que se aplicam ao SQLite)
+CREATE INDEX IF NOT EXISTS idx_processos_numero ON processos(numero_protocolo);
+CREATE INDEX IF NOT EXISTS idx_processos_status ON processos(status);
+CREATE INDEX IF NOT EXISTS idx_processos_setor_atual ON processos(setor_atual_id);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por ON processos(criado_por);
+CREATE INDEX IF NOT EXISTS idx_processos_data_autuacao ON processos(data_autuacao);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por_criado_em ON processos(criado_por, criado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por_atualizado_em ON processos(criado_por, atualizado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_por_autuacao ON processos(criado_por, data_autuacao DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_criado_em ON processos(criado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_atualizado_em ON processos(atualizado_em DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_processos_autuacao_id ON processos(data_autuacao DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_processo ON tramitacoes(processo_id);
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_setor_destino ON tramitacoes(setor_destino_id);
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_data_envio ON tramitacoes(data_envio);
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_setor_processo ON tramitacoes(setor_destino_id, processo_id);
+CREATE INDEX IF NOT EXISTS idx_tramitacoes_processo_setor ON tramitacoes(processo_id, setor_destino_id);
+
+CREATE INDEX IF NOT EXISTS idx_documentos_processo ON documentos(processo_id);
+CREATE INDEX IF NOT EXISTS idx_documentos_tipo ON documentos(tipo_documento);
+CREATE INDEX IF NOT EXISTS idx_documentos_status ON documentos(status);
+CREATE INDEX IF NOT EXISTS idx_documentos_pendentes_assinatura ON documentos(processo_id)
+    WHERE requer_assinatura AND NOT assinado AND status = 'ativo';
+
+CREATE INDEX IF NOT EXISTS idx_aprovacoes_aprovador ON aprovacoes(aprovador_id);
+CREATE INDEX IF NOT EXISTS idx_aprovacoes_status ON aprovacoes(status);
+CREATE INDEX IF NOT EXISTS idx_aprovacoes_documento ON aprovacoes(documento_id);
+CREATE INDEX IF NOT EXISTS idx_aprovacoes_processo ON aprovacoes(processo_id);
+
+CREATE INDEX IF NOT EXISTS idx_assinaturas_documento ON assinaturas(documento_id);
+CREATE INDEX IF NOT EXISTS idx_assinaturas_usuario ON assinaturas(usuario_id);
+
+-- Seeds de dados iniciais (só em banco vazio)
+
+INSERT INTO tipos_processo (nome, descricao, cor)
+SELECT * FROM (VALUES
+    ('Compras com Recursos Próprios', 'Processo de aquisição de bens e serviços com recursos próprios da CBB', '#10B981'),
+    ('Processo Administrativo', 'Processos administrativos gerais', '#3B82F6'),
+    ('Contrato', 'Elaboração e gestão de contratos', '#8B5CF6'),
+    ('Convocação', 'Convocações de atletas e comissões técnicas', '#F59E0B'),
+    ('Licitação', 'Processos licitatórios', '#EF4444'),
+    ('Recursos Humanos', 'Processos relacionados a RH', '#06B6D4'),
+    ('Jurídico', 'Processos e pareceres jurídicos', '#EC4899')
+)
+WHERE NOT EXISTS (SELECT 1 FROM tipos_processo);
+
+INSERT INTO setores (nome, sigla, descricao, email)
+SELECT * FROM (VALUES
+    ('Presidência', 'PRES', 'Presidência da CBB', 'presidencia@cbb.com.br'),
+    ('Diretoria Administrativa', 'DIRADM', 'Diretoria Administrativa e Financeira', 'administrativa@cbb.com.br'),
+    ('Tecnologia da Informação', 'TI', 'Setor de Tecnologia e Inovação', 'ti@cbb.com.br'),
+    ('Compras e Contratações', 'COMPRAS', 'Setor de Compras e Contratações', 'compras@cbb.com.br'),
+    ('Financeiro', 'FIN', 'Setor Financeiro e Contabilidade', 'financeiro@cbb.com.br'),
+    ('Jurídico', 'JUR', 'Assessoria Jurídica', 'juridico@cbb.com.br'),
+    ('Recursos Humanos', 'RH', 'Departamento de Recursos Humanos', 'rh@cbb.com.br'),
+    ('Marketing', 'MKT', 'Marketing e Comunicação', 'marketing@cbb.com.br'),
+    ('Competições', 'COMP', 'Departamento de Competições', 'competicoes@cbb.com.br'),
+    ('Seleções', 'SEL', 'Departamento de Seleções Nacionais', 'selecoes@cbb.com.br'),
+    ('Protocolo', 'PROT', 'Setor de Protocolo e Arquivo', 'protocolo@cbb.com.br')
+)
+WHERE NOT EXISTS (SELECT 1 FROM setores);
+
+-- Usuários de teste (senha: senha123)
+INSERT INTO usuarios (nome, email, senha_hash, setor_id, cargo, cpf)
+SELECT * FROM (VALUES
+    ('Roberto Santos', 'roberto@cbb.com.br', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqVMp5qHWa', 3, 'Gerente de TI', '123.456.789-00'),
+    ('Maria Silva', 'maria@cbb.com.br', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqVMp5qHWa', 2, 'Diretora Administrativa', '987.654.321-00'),
+    ('João Compras', 'compras@cbb.com.br', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqVMp5qHWa', 4, 'Coordenador de Compras', '111.222.333-44'),
+    ('Ana Financeiro', 'financeiro@cbb.com.br', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqVMp5qHWa', 5, 'Gerente Financeiro', '555.666.777-88'),
+    ('Carlos Presidente', 'presidente@cbb.com.br', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqVMp5qHWa', 1, 'Presidente', '999.888.777-66'),
+    ('Paula Jurídico', 'juridico@cbb.com.br', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYqVMp5qHWa', 6, 'Assessora Jurídica', '444.333.222-11')
+)
+WHERE NOT EXISTS (SELECT 1 FROM usuarios);
@@ -9,7 +9,7 @@ import UploadDocumentoModal from '@/components/UploadDocumentoModal';
 import AprovarModal from '@/components/AprovarModal';
 import RejeitarModal from '@/components/RejeitarModal';
 import { useAuthStore } from '@/lib/store';
-import { processosAPI, documentosAPI } from '@/lib/api';
+import { processosAPI } from '@/lib/api';
 import { 
   FiArrowLeft, FiSend, FiUpload, FiDownload, FiFile, 
   FiClock, FiUser, FiCalendar, FiAlertCircle, FiCheckCircle,
@@ -52,15 +52,18 @@ export default function DetalhesProcessoPage() {
   const loadProcesso = async () => {
     try {
       const id = parseInt(params.id as string);
-      const [processoData, docsData, tramData] = await Promise.all([
-        processosAPI.buscar(id),
-        documentosAPI.listar(id).catch(() => []),
-        processosAPI.tramitacoes(id).catch(() => []),
-      ]);
+      // Processo, documentos, tramitações e nomes citados em uma única requisição
+      const detalhe = await processosAPI.detalhe(id);
+      const tramData = detalhe.tramitacoes;
       
-      setProcesso(processoData);
-      setDocumentos(docsData);
+      setProcesso(detalhe.processo);
+      setDocumentos(detalhe.documentos);
       setTramitacoes(tramData);
+      setUsuarios(detalhe.usuarios);
+      setSetores(detalhe.setores);
+      if (detalhe.tipo_processo) {
+        setTiposProcesso({ [detalhe.tipo_processo.id]: detalhe.tipo_processo });
+      }
       
       // Verificar se há tramitação pendente para o setor do usuário
       const pendente = tramData.find((t: any) => 
@@ -68,9 +71,6 @@ export default function DetalhesProcessoPage() {
         t.status_aprovacao === 'pendente'
       );
       setTramitacaoPendente(pendente);
-      
-      // Carregar dados relacionados
-      await loadRelatedData(processoData, tramData);
     } catch (error) {
       console.error('Erro ao carregar processo:', error);
       alert('Processo não encontrado');
@@ -80,51 +80,6 @@ export default function DetalhesProcessoPage() {
     }
   };
   
-  const loadRelatedData = async (processo: any, tramitacoes: any[]) => {
-    try {
-      const response = await fetch('http://localhost:8000/api/setores', {
-        headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-      });
-      const setoresData = await response.json();
-      const setoresMap: any = {};
-      setoresData.forEach((s: any) => setoresMap[s.id] = s);
-      setSetores(setoresMap);
-      
-      const userIds = new Set([
-        processo.criado_por,
-        ...tramitacoes.map((t: any) => t.enviado_por).filter(Boolean)
-      ]);
-      
-      const usersMap: any = {};
-      for (const userId of userIds) {
-        try {
-          const userRes = await fetch(`http://localhost:8000/api/usuarios/${userId}`, {
-            headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-          });
-          if (userRes.ok) {
-            const userData = await userRes.json();
-            usersMap[userId] = userData;
-          }
-        } catch (e) {
-          console.error(`Erro ao carregar usuário ${userId}:`, e);
-        }
-      }
-      setUsuarios(usersMap);
-      
-      const tiposRes = await fetch('http://localhost:8000/api/tipos-processo', {
-        headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-      });
-      if (tiposRes.ok) {
-        const tiposData = await tiposRes.json();
-        const tiposMap: any = {};
-        tiposData.forEach((t: any) => tiposMap[t.id] = t);
-        setTiposProcesso(tiposMap);
-      }
-    } catch (error) {
-      console.error('Erro ao carregar dados relacionados:', error);
-    }
-  };
-  
   const handleConcluir = async () => {
     if (!confirm('Deseja realmente concluir este processo?')) return;
     
@@ -62,6 +62,11 @@ export const processosAPI = {
     return response.data;
   },
   
+  detalhe: async (id: number) => {
+    const response = await api.get(`/api/processos/${id}/detalhe`);
+    return response.data;
+  },
+  
   buscarPorProtocolo: async (protocolo: string) => {
     const response = await api.get(`/api/processos/protocolo/${protocolo}`);
     return response.data;